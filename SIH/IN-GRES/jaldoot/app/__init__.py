@@ -18,11 +18,17 @@ cors = CORS()
 
 def create_app(config_name='development'):
     """Application factory pattern"""
+    from jaldoot.config.settings import config
+    from jaldoot.app.core.runtime_config import configure
+    
     app = Flask(__name__, 
                 template_folder='../templates',
                 static_folder='../static')
     
     # Configuration
+    settings = config.get(config_name, config['default'])
+    settings.validate()
+    app.config.from_object(settings)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'jaldoot-secret-key-2024')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///jaldoot.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -31,6 +37,10 @@ def create_app(config_name='development'):
     app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
     app.config['INGRES_CONNSTR'] = os.getenv('INGRES_CONNSTR')
     
+    # Core services read their settings from app.config; the blueprints
+    # below create them on import
+    configure(app.config)
+    
     # Initialize extensions
     cors.init_app(app)
     socketio.init_app(app, cors_allowed_origins="*")
@@ -0,0 +1,196 @@
+"""
+JalDoot Analytics Engine
+Cross-region aggregate queries, optionally executed by DuckDB
+
+The aggregate SQL here is written to run unchanged on SQLite and DuckDB.
+GroundwaterService sends it to DuckDB when ANALYTICS_BACKEND=duckdb and to
+its own SQLite pool otherwise; point lookups always stay on SQLite.
+DuckDB reads the SQLite file directly through its sqlite extension when that
+is available, or else a Parquet mirror written from SQLite.
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jaldoot.app.core.exporters import iter_parquet
+
+try:
+    import duckdb
+    HAVE_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAVE_DUCKDB = False
+
+ANALYTICS_SOURCES = ('auto', 'attach', 'parquet')
+
+
+def _where(clauses: List[Tuple[str, Any]]) -> Tuple[str, List[Any]]:
+    active = [(sql, value) for sql, value in clauses if value not in (None, '')]
+    if not active:
+        return "", []
+    return " WHERE " + " AND ".join(sql for sql, _ in active), [value for _, value in active]
+
+
+def regional_comparison_sql(year: int = None, state: str = None) -> Tuple[str, List[Any]]:
+    """Per-region measurement summary, optionally for one year and/or state"""
+    where, params = _where([("year = ?", year), ("LOWER(state) = LOWER(?)", state)])
+    return f"""
+        SELECT region, state, COUNT(*) AS record_count, COUNT(measurement) AS measurement_count,
+               AVG(measurement) AS average, MIN(measurement) AS minimum, MAX(measurement) AS maximum
+        FROM groundwater_records{where}
+        GROUP BY region, state
+        ORDER BY region, state
+    """, params
+
+
+def yearly_trends_sql(region: str = None, state: str = None) -> Tuple[str, List[Any]]:
+    """Per-region, per-year measurement summary"""
+    where, params = _where([("region = ?", region), ("LOWER(state) = LOWER(?)", state)])
+    return f"""
+        SELECT region, year, COUNT(*) AS record_count, AVG(measurement) AS average,
+               MIN(measurement) AS minimum, MAX(measurement) AS maximum
+        FROM groundwater_records{where}
+        GROUP BY region, year
+        ORDER BY region, year
+    """, params
+
+
+def state_rollup_sql(year: int = None) -> Tuple[str, List[Any]]:
+    """Per-state, per-year summary with the sums needed for a standard deviation"""
+    where, params = _where([("year = ?", year)])
+    return f"""
+        SELECT state, year, COUNT(DISTINCT region) AS regions, COUNT(*) AS record_count,
+               COUNT(measurement) AS measurement_count, AVG(measurement) AS average,
+               MIN(measurement) AS minimum, MAX(measurement) AS maximum,
+               SUM(measurement) AS measurement_sum,
+               SUM(measurement * measurement) AS measurement_sumsq
+        FROM groundwater_records{where}
+        GROUP BY state, year
+        ORDER BY state, year
+    """, params
+
+
+def finish_state_rollup(rows: List[Dict]) -> List[Dict]:
+    """Replace the raw sums with a sample standard deviation"""
+    for row in rows:
+        n = row.pop('measurement_count') or 0
+        total = row.pop('measurement_sum') or 0.0
+        total_sq = row.pop('measurement_sumsq') or 0.0
+        variance = max(total_sq - total * total / n, 0.0) / (n - 1) if n > 1 else 0.0
+        row['std_dev'] = math.sqrt(variance) if n else None
+    return rows
+
+
+class AnalyticsEngine:
+    """In-process DuckDB over the groundwater database"""
+
+    def __init__(self, sqlite_db_path: str, row_source: Callable = None,
+                 parquet_path: str = None, source: str = 'auto'):
+        if not HAVE_DUCKDB:
+            raise RuntimeError("The DuckDB analytics backend requires duckdb (pip install duckdb)")
+        if source not in ANALYTICS_SOURCES:
+            raise ValueError(f"source must be one of {ANALYTICS_SOURCES}")
+
+        self.sqlite_db_path = sqlite_db_path
+        self.row_source = row_source
+        self.parquet_path = parquet_path or os.path.splitext(sqlite_db_path)[0] + '.analytics.parquet'
+
+        self._conn = duckdb.connect(':memory:')
+        self._refresh_lock = threading.Lock()
+        self._refreshing = None
+        self._stale = True
+        self._stats = {'queries': 0, 'mirror_refreshes': 0, 'last_refresh_seconds': None}
+        self.source = self._attach(source)
+
+    def _attach(self, source: str) -> str:
+        if source in ('auto', 'attach'):
+            try:
+                try:
+                    self._conn.execute("LOAD sqlite")
+                except duckdb.Error:
+                    self._conn.execute("INSTALL sqlite")
+                    self._conn.execute("LOAD sqlite")
+                path = self.sqlite_db_path.replace("'", "''")
+                self._conn.execute(f"ATTACH '{path}' AS groundwater (TYPE SQLITE, READ_ONLY)")
+                self._conn.execute("""CREATE OR REPLACE VIEW groundwater_records AS
+                                      SELECT * FROM groundwater.groundwater_records""")
+                self._stale = False
+                return 'attach'
+            except duckdb.Error as e:
+                if source == 'attach':
+                    raise
+                print(f"DuckDB sqlite extension unavailable ({e}), using a Parquet mirror")
+        return 'parquet'
+
+    def invalidate(self):
+        """Mark the Parquet mirror out of date after a write"""
+        if self.source == 'parquet':
+            self._stale = True
+
+    def refresh_mirror(self) -> float:
+        """Rewrite the Parquet mirror from SQLite and swap it in atomically"""
+        if self.row_source is None:
+            raise RuntimeError("No row source configured for the Parquet mirror")
+        with self._refresh_lock:
+            started = time.perf_counter()
+            self._stale = False
+            columns, batches = self.row_source()
+            temp_path = self.parquet_path + '.tmp'
+            with open(temp_path, 'wb') as out:
+                for chunk in iter_parquet(columns, batches):
+                    out.write(chunk)
+            os.replace(temp_path, self.parquet_path)
+
+            path = self.parquet_path.replace("'", "''")
+            self._conn.execute(f"""CREATE OR REPLACE VIEW groundwater_records AS
+                                   SELECT * FROM read_parquet('{path}')""")
+            elapsed = time.perf_counter() - started
+            self._stats['mirror_refreshes'] += 1
+            self._stats['last_refresh_seconds'] = elapsed
+            return elapsed
+
+    def _ensure_mirror(self):
+        if self.source != 'parquet' or not self._stale:
+            return
+        if self._stats['mirror_refreshes'] == 0:
+            # Nothing to serve yet, so the first refresh blocks
+            self.refresh_mirror()
+        elif self._refreshing is None or not self._refreshing.is_alive():
+            # Serve the previous mirror while a new one is written
+            self._refreshing = threading.Thread(target=self._refresh_quietly,
+                                                name='analytics-mirror', daemon=True)
+            self._refreshing.start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh_mirror()
+        except Exception as e:
+            self._stale = True
+            print(f"Analytics mirror refresh failed: {e}")
+
+    def query(self, sql: str, params: List[Any] = None) -> List[Dict]:
+        """Run a query and return rows as dicts"""
+        self._ensure_mirror()
+        # DuckDB connections are not shared across threads; cursors are
+        with self._conn.cursor() as cursor:
+            cursor.execute(sql, params or [])
+            names = [d[0] for d in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        self._stats['queries'] += 1
+        return rows
+
+    def close(self):
+        self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update({
+            'backend': 'duckdb',
+            'source': self.source,
+            'parquet_path': self.parquet_path if self.source == 'parquet' else None,
+            'mirror_stale': self._stale if self.source == 'parquet' else None,
+        })
+        return stats
@@ -0,0 +1,264 @@
+"""
+JalDoot Bulk Loader
+Chunked, resumable ingestion of IN-GRES exports into groundwater_records
+"""
+
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from jaldoot.app.core.migrations import upsert_records_sql
+
+try:
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except ImportError:
+    pq = None
+    HAVE_PYARROW = False
+
+RECORD_COLUMNS = [
+    'region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+    'well_type', 'aquifer_type', 'notes', 'source_url', 'data_quality', 'recorded_at'
+]
+REQUIRED_COLUMNS = ['region', 'state', 'year']
+TEXT_COLUMNS = [
+    'region', 'district', 'state', 'unit', 'well_type', 'aquifer_type',
+    'notes', 'source_url', 'data_quality', 'recorded_at'
+]
+
+# Re-loading a reading updates it in place (see NATURAL_KEY) instead of duplicating it
+INSERT_SQL = upsert_records_sql(
+    RECORD_COLUMNS,
+    "VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, 'm'), ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))"
+)
+
+# Fast-load settings; in WAL mode synchronous=NORMAL only syncs at
+# checkpoints, and a power loss can at most roll back the latest chunks,
+# which the checkpoint table then replays
+LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',
+}
+
+
+class BulkLoadError(Exception):
+    """Raised when an input file cannot be ingested"""
+
+
+class BulkLoader:
+    """Streams CSV, JSON-lines or Parquet exports into SQLite in chunks.
+
+    Each chunk is validated with vectorized pandas checks and written with
+    ``executemany`` in its own transaction together with a checkpoint row, so
+    an interrupted load resumes after the last committed chunk.
+    """
+
+    FORMATS = ('csv', 'jsonl', 'parquet')
+
+    def __init__(self, db_path: str, chunk_size: int = 50000,
+                 min_year: int = 1900, max_year: int = 2100,
+                 min_measurement: float = -100.0, max_measurement: float = 1000.0,
+                 state: str = None):
+        self.db_path = db_path
+        # Only rows for this state are loaded (one shard's slice of an export)
+        self.state = state
+        self.chunk_size = max(1, int(chunk_size))
+        self.min_year = min_year
+        self.max_year = max_year
+        self.min_measurement = min_measurement
+        self.max_measurement = max_measurement
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        """Infer the input format from the file extension"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.csv', '.txt'):
+            return 'csv'
+        if ext in ('.jsonl', '.ndjson', '.json'):
+            return 'jsonl'
+        if ext in ('.parquet', '.pq'):
+            return 'parquet'
+        raise BulkLoadError(f"Cannot infer input format from '{path}'")
+
+    def iter_chunks(self, path: str, fmt: str) -> Iterator[pd.DataFrame]:
+        """Yield the input as DataFrames of at most ``chunk_size`` rows"""
+        if fmt == 'csv':
+            yield from pd.read_csv(path, chunksize=self.chunk_size, dtype=str,
+                                   keep_default_na=True)
+        elif fmt == 'jsonl':
+            yield from pd.read_json(path, lines=True, chunksize=self.chunk_size,
+                                    dtype=False)
+        elif fmt == 'parquet':
+            if not HAVE_PYARROW:
+                raise BulkLoadError("Parquet input requires pyarrow (pip install pyarrow)")
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+        else:
+            raise BulkLoadError(f"Unsupported format '{fmt}', expected one of {self.FORMATS}")
+
+    def validate_chunk(self, df: pd.DataFrame):
+        """Normalize a chunk and split it into (valid, rejected) frames"""
+        df = df.rename(columns=lambda c: str(c).strip().lower())
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise BulkLoadError(f"Input is missing required columns: {', '.join(missing)}")
+
+        for column in RECORD_COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+        df = df[RECORD_COLUMNS].copy()
+
+        for column in TEXT_COLUMNS:
+            text = df[column].astype('string').str.strip()
+            df[column] = text.mask(text == '')
+
+        year = pd.to_numeric(df['year'], errors='coerce')
+        month = pd.to_numeric(df['month'], errors='coerce')
+        measurement = pd.to_numeric(df['measurement'], errors='coerce')
+
+        valid = df['region'].notna() & df['state'].notna()
+        valid &= year.between(self.min_year, self.max_year) & (np.floor(year) == year)
+        valid &= df['month'].isna() | (month.between(1, 12) & (np.floor(month) == month))
+        valid &= df['measurement'].isna() | (
+            np.isfinite(measurement) & measurement.between(self.min_measurement, self.max_measurement)
+        )
+
+        df['year'] = year.astype('Int64')
+        df['month'] = month.astype('Int64')
+        df['measurement'] = measurement
+        return df[valid], df[~valid]
+
+    @staticmethod
+    def _rows(df: pd.DataFrame):
+        """Convert a validated frame to DB-API parameter tuples"""
+        values = df.astype(object).where(df.notna(), None)
+        return list(values.itertuples(index=False, name=None))
+
+    @staticmethod
+    def _fingerprint(path: str) -> str:
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def _read_checkpoint(self, conn, source: str, fingerprint: str):
+        """Return (chunks, rows) already committed for this exact file"""
+        row = conn.execute("""
+            SELECT fingerprint, chunk_size, chunks_committed, rows_committed
+            FROM ingest_checkpoints WHERE source = ?
+        """, (source,)).fetchone()
+        if not row:
+            return 0, 0
+        if row[0] != fingerprint or row[1] != self.chunk_size:
+            print(f"Checkpoint for {source} does not match this file/chunk size; starting over")
+            return 0, 0
+        return row[2], row[3]
+
+    def _apply_pragmas(self, conn) -> Dict[str, Any]:
+        previous = {}
+        for name, value in LOAD_PRAGMAS.items():
+            previous[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+            conn.execute(f"PRAGMA {name} = {value}")
+        return previous
+
+    @staticmethod
+    def _restore_pragmas(conn, previous: Dict[str, Any]):
+        for name, value in previous.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error as e:
+                print(f"Could not restore PRAGMA {name}: {e}")
+
+    def load(self, path: str, fmt: str = None, resume: bool = True,
+             rejects_path: Optional[str] = None, progress: bool = True) -> Dict[str, Any]:
+        """Load a file into groundwater_records and return throughput stats"""
+        if not os.path.exists(path):
+            raise BulkLoadError(f"Input file not found: {path}")
+        fmt = fmt or self.detect_format(path)
+        source = os.path.abspath(path)
+        fingerprint = self._fingerprint(path)
+
+        # isolation_level=None: transactions are managed explicitly per chunk
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        previous_pragmas = self._apply_pragmas(conn)
+        skip_chunks, committed_rows = (
+            self._read_checkpoint(conn, source, fingerprint) if resume else (0, 0)
+        )
+
+        stats = {
+            'source': source,
+            'format': fmt,
+            'chunk_size': self.chunk_size,
+            'chunks_skipped': skip_chunks,
+            'chunks_committed': 0,
+            'rows_inserted': 0,
+            'rows_rejected': 0,
+            'rows_filtered': 0,
+            'rows_unchanged': 0,
+        }
+        if skip_chunks:
+            print(f"Resuming {source} after chunk {skip_chunks}")
+
+        started = time.perf_counter()
+        # A resumed load appends to the rejects of the runs before it
+        write_rejects_header = not (skip_chunks and rejects_path and os.path.exists(rejects_path)
+                                    and os.path.getsize(rejects_path) > 0)
+        try:
+            for index, chunk in enumerate(self.iter_chunks(path, fmt)):
+                if index < skip_chunks:
+                    continue
+
+                valid, rejected = self.validate_chunk(chunk)
+                if self.state:
+                    keep = valid['state'].str.lower() == self.state.strip().lower()
+                    stats['rows_filtered'] += int((~keep).sum())
+                    valid = valid[keep]
+                rows = self._rows(valid)
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    written = conn.executemany(INSERT_SQL, rows).rowcount
+                    # Checkpoint commits atomically with the chunk it describes
+                    conn.execute("""
+                        INSERT OR REPLACE INTO ingest_checkpoints
+                        (source, fingerprint, chunk_size, chunks_committed, rows_committed, updated_at)
+                        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """, (source, fingerprint, self.chunk_size, index + 1,
+                          committed_rows + len(rows)))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                if rejects_path and len(rejected):
+                    rejected.to_csv(rejects_path, mode='w' if write_rejects_header else 'a',
+                                    header=write_rejects_header, index=False)
+                    write_rejects_header = False
+
+                committed_rows += len(rows)
+                stats['chunks_committed'] += 1
+                stats['rows_inserted'] += len(rows)
+                stats['rows_rejected'] += len(rejected)
+                # Readings already stored with identical values
+                stats['rows_unchanged'] += len(rows) - max(written, 0)
+
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    rate = stats['rows_inserted'] / elapsed if elapsed else 0.0
+                    print(f"chunk {index + 1}: {stats['rows_inserted']} rows "
+                          f"({stats['rows_rejected']} rejected), {rate:,.0f} rows/s")
+
+            conn.execute("PRAGMA optimize")
+        finally:
+            self._restore_pragmas(conn, previous_pragmas)
+            conn.close()
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_seconds'] = elapsed
+        stats['rows_per_second'] = stats['rows_inserted'] / elapsed if elapsed else 0.0
+        return stats
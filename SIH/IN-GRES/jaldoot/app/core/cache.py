@@ -0,0 +1,110 @@
+"""
+JalDoot Result Cache
+Thread-safe TTL + LRU cache for read-mostly groundwater lookups
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, enabled: bool = True):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'stale_loads': 0,
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` when missing or expired"""
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats['misses'] += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int = None):
+        """Store a value, evicting the least recently used entries if full
+
+        With ``generation`` (from ``generation()`` before the value was read),
+        the value is dropped if the cache was invalidated in between.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stats['stale_loads'] += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Read-through lookup: call ``loader`` on a miss and cache its result"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            # A write during the load makes the result stale already; return
+            # it to this caller but do not cache it
+            generation = self.generation()
+            value = loader()
+            self.set(key, value, generation)
+        return value
+
+    def generation(self) -> int:
+        """Counter bumped by every ``invalidate()``"""
+        with self._lock:
+            return self._generation
+
+    def invalidate(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['misses']
+            stats.update({
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+            })
+        return stats
@@ -0,0 +1,327 @@
+"""
+JalDoot Chart Cache
+Content-addressed cache of rendered chart images
+
+A chart is identified by a hash of everything that determines its pixels:
+chart type, the values it plots, region/year and the render options.
+Identical requests therefore share one rendering no matter which route or
+process asked for it. Encoded bytes are kept in memory under a byte budget
+with LRU eviction; with a disk directory configured, evicted charts are
+spilled there (under their own byte budget) and promoted back on a hit.
+
+Keys double as chart URLs, so the cache also remembers, for a bounded
+number of recent keys, what was rendered under them. A URL whose image
+has since been evicted can then be drawn again instead of going stale.
+With a disk directory these recipes are also written to its ``recipes``
+subdirectory, so any process sharing the directory can serve the URL.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from jaldoot.app.core.runtime_config import setting
+
+# Bump when chart drawing code changes so spilled renders are not reused
+KEY_VERSION = 1
+
+RECIPE_DIR = 'recipes'
+
+# Trim the shared recipe directory after this many new recipes per process
+RECIPE_TRIM_INTERVAL = 256
+
+MIME_TYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+}
+
+_KEY_PATTERN = re.compile(r'[0-9a-f]{64}\.(%s)' % '|'.join(MIME_TYPES))
+
+
+def chart_key(chart_type: str, inputs: Dict[str, Any], options: Dict[str, Any]) -> str:
+    """Content address of a chart: ``<sha256 hex>.<format>``
+
+    ``inputs`` are the prepared values the chart plots (aggregates and
+    labels), so any request whose data reduces to the same figure shares it.
+    """
+    payload = json.dumps([KEY_VERSION, chart_type, inputs, options], sort_keys=True, default=str)
+    return f"{hashlib.sha256(payload.encode()).hexdigest()}.{options['format']}"
+
+
+def is_chart_key(key: str) -> bool:
+    """Whether ``key`` is a well-formed chart address (safe to use as a file name)"""
+    return bool(_KEY_PATTERN.fullmatch(key))
+
+
+def mime_type(key: str) -> str:
+    return MIME_TYPES.get(key.rsplit('.', 1)[-1], 'application/octet-stream')
+
+
+class ChartCache:
+    """LRU byte-budgeted store of encoded charts with optional disk spill"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: str = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024, enabled: bool = True,
+                 max_recipes: int = 4096):
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        self.enabled = enabled
+        self.max_recipes = max(0, int(max_recipes))
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._recipes = OrderedDict()
+        self._recipes_written = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'spills': 0,
+            'disk_evictions': 0,
+        }
+
+        if self.enabled and self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+        if self.disk_dir and self.max_recipes:
+            os.makedirs(os.path.join(self.disk_dir, RECIPE_DIR), exist_ok=True)
+
+    def _scan_disk(self):
+        """Index charts spilled by earlier runs, oldest first"""
+        spilled = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if name.endswith('.tmp') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            spilled.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(spilled):
+            self._disk[name] = size
+            self._disk_bytes += size
+        self._trim_disk()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the encoded chart, or None when it has to be rendered"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return data
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), 'rb') as handle:
+                    data = handle.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                self.put(key, data)
+                return data
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        """Store an encoded chart, spilling least recently used ones past the budget"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            evicted = []
+            while self._bytes > self.max_bytes:
+                old_key, old_data = self._entries.popitem(last=False)
+                self._bytes -= len(old_data)
+                self._stats['evictions'] += 1
+                evicted.append((old_key, old_data))
+
+        if self.disk_dir:
+            for old_key, old_data in evicted:
+                self._spill(old_key, old_data)
+
+    def remember(self, key: str, chart_type: str, inputs: Dict[str, Any], options: Dict[str, Any]):
+        """Record what ``key`` renders so it can be redrawn after eviction
+
+        Recipes are kept even with the image cache disabled, as served chart
+        URLs depend on them.
+        """
+        if not self.max_recipes:
+            return
+        with self._lock:
+            known = key in self._recipes
+            self._recipes[key] = (chart_type, inputs, options)
+            self._recipes.move_to_end(key)
+            while len(self._recipes) > self.max_recipes:
+                self._recipes.popitem(last=False)
+        if self.disk_dir and not known:
+            self._write_recipe(key, (chart_type, inputs, options))
+
+    def recipe(self, key: str) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """(chart type, inputs, options) last rendered under ``key``, if still known"""
+        with self._lock:
+            recipe = self._recipes.get(key)
+        if recipe is not None or not self.disk_dir or not self.max_recipes:
+            return recipe
+        # Possibly rendered by another process sharing the directory
+        try:
+            with open(self._recipe_path(key), encoding='utf-8') as handle:
+                chart_type, inputs, options = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return chart_type, inputs, options
+
+    def _recipe_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, RECIPE_DIR, f"{key}.json")
+
+    def _write_recipe(self, key: str, recipe):
+        path = self._recipe_path(key)
+        if os.path.exists(path):
+            return
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as handle:
+                json.dump(recipe, handle, default=str)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing chart recipe {key}: {e}")
+            return
+        with self._lock:
+            self._recipes_written += 1
+            trim = self._recipes_written % RECIPE_TRIM_INTERVAL == 0
+        if trim:
+            self._trim_recipes()
+
+    def _trim_recipes(self):
+        """Keep only the newest ``max_recipes`` recipe files in the shared directory"""
+        directory = os.path.join(self.disk_dir, RECIPE_DIR)
+        recipes = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                recipes.append((os.stat(path).st_mtime, path))
+            except OSError:
+                continue
+        recipes.sort()
+        for _, path in recipes[:max(0, len(recipes) - self.max_recipes)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _spill(self, key: str, data: bytes):
+        with self._lock:
+            if key in self._disk:
+                # Promoted from disk earlier; the file is still there
+                self._disk.move_to_end(key)
+                return
+        if len(data) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error spilling chart {key}: {e}")
+            return
+        with self._lock:
+            self._forget_disk(key)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            self._stats['spills'] += 1
+            self._trim_disk()
+
+    def _forget_disk(self, key: str):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _trim_disk(self):
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._stats['disk_evictions'] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def invalidate(self):
+        """Drop every cached chart, including spilled ones"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            spilled = list(self._disk)
+            self._disk.clear()
+            self._disk_bytes = 0
+        for key in spilled:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and bytes held in memory and on disk"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+            stats.update({
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes_in_use': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_dir': self.disk_dir,
+                'disk_entries': len(self._disk),
+                'disk_bytes_in_use': self._disk_bytes,
+                'disk_max_bytes': self.disk_max_bytes,
+                'recipes': len(self._recipes),
+                'hit_rate': (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0,
+            })
+        return stats
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> ChartCache:
+    """Return the process-wide chart cache shared by every VisualizationService"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ChartCache(
+                max_bytes=setting('CHART_CACHE_MAX_BYTES', 64 * 1024 * 1024, int),
+                disk_dir=setting('CHART_CACHE_DIR') or None,
+                disk_max_bytes=setting('CHART_CACHE_DISK_MAX_BYTES', 512 * 1024 * 1024, int),
+                enabled=setting('CHART_CACHE_ENABLED', True, bool),
+                max_recipes=setting('CHART_CACHE_MAX_RECIPES', 4096, int)
+            )
+        return _shared_cache
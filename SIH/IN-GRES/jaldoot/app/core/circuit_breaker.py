@@ -0,0 +1,175 @@
+"""
+JalDoot Circuit Breaker
+Fail fast on an unreachable upstream instead of waiting out driver timeouts
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Classic three-state circuit breaker.
+
+    closed    -- calls pass; ``failure_threshold`` consecutive failures open it
+    open      -- calls are refused until ``recovery_timeout`` seconds pass
+    half_open -- up to ``half_open_max_calls`` probe calls are let through;
+                 a success closes the breaker, a failure re-opens it
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._stats = {
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'times_opened': 0,
+        }
+        self._last_error = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """Promote open -> half_open once the recovery timeout has elapsed"""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def cancel_request(self):
+        """Hand back a half-open probe slot that never reached the upstream"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._stats['successes'] += 1
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+            self._state = CLOSED
+
+    def record_failure(self, error: Exception = None):
+        with self._lock:
+            self._stats['failures'] += 1
+            self._consecutive_failures += 1
+            if error is not None:
+                self._last_error = str(error)
+            state = self._current_state()
+            if state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if state != OPEN:
+                    self._stats['times_opened'] += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probes_in_flight = 0
+
+    def reset(self):
+        """Force the breaker closed (e.g. after an operator fixes the upstream)"""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return state and counters for monitoring"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+            stats = dict(self._stats)
+            stats.update({
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout': self.recovery_timeout,
+                'retry_in_seconds': retry_in,
+                'last_error': self._last_error,
+            })
+        return stats
+
+
+class BreakerCursor:
+    """Cursor proxy that reports each statement's round trip to the breaker"""
+
+    def __init__(self, cursor, connection: 'BreakerConnection'):
+        self._cursor = cursor
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, *args):
+        self._connection.round_trip(self._cursor.execute, *args)
+        return self
+
+    def executemany(self, *args):
+        self._connection.round_trip(self._cursor.executemany, *args)
+        return self
+
+
+class BreakerConnection:
+    """Connection proxy whose statements record success or failure on a breaker.
+
+    Only real round trips count: a pooled connection handed out again says
+    nothing about the upstream until it runs a statement. Errors listed in
+    ``ignore`` (bad SQL, constraint violations) come from the statement, not
+    the server, and leave the breaker alone.
+    """
+
+    def __init__(self, conn, breaker: CircuitBreaker, ignore: tuple = ()):
+        self._conn = conn
+        self._breaker = breaker
+        self._ignore = ignore
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return BreakerCursor(self._conn.cursor(*args, **kwargs), self)
+
+    def round_trip(self, call, *args):
+        try:
+            result = call(*args)
+        except self._ignore:
+            raise
+        except Exception as e:
+            self._breaker.record_failure(e)
+            raise
+        self._breaker.record_success()
+        return result
@@ -0,0 +1,313 @@
+"""
+JalDoot Column Store
+In-memory columnar copy of groundwater_records for read-heavy serving
+
+Rows are held sorted by (region, year, month, recorded_at DESC) as NumPy
+columns. region, state, district, well_type and aquifer_type are
+dictionary-encoded (int32 codes into a category array, -1 for NULL), and a
+(region, year) -> row range index turns the common lookups into slices.
+The store is a snapshot: writers call invalidate() and the next read
+reloads it from the database.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from jaldoot.app.core.query_builder import RECORD_FIELDS
+
+DICTIONARY_COLUMNS = ('region', 'state', 'district', 'well_type', 'aquifer_type')
+NUMERIC_COLUMNS = {'id': np.int64, 'year': np.int64, 'month': np.float64, 'measurement': np.float64}
+
+LOAD_SQL = f"""
+    SELECT {', '.join(RECORD_FIELDS)} FROM groundwater_records
+    ORDER BY region, year, month, recorded_at DESC, id
+"""
+
+
+class _Snapshot:
+    """Immutable columns plus the (region, year) range index"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.categories = categories
+        self.size = len(columns['id'])
+        self.loaded_at = time.time()
+
+        # Category arrays with a trailing None so code -1 decodes to NULL
+        self._decode = {name: np.append(cats, None) for name, cats in categories.items()}
+        self._build_index()
+
+    def _build_index(self):
+        regions = self.columns['region']
+        years = self.columns['year']
+        self.region_ranges: Dict[str, Tuple[int, int]] = {}
+        self.region_year_ranges: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        if not self.size:
+            return
+        change = np.flatnonzero((regions[1:] != regions[:-1]) | (years[1:] != years[:-1])) + 1
+        starts = np.concatenate(([0], change))
+        stops = np.concatenate((change, [self.size]))
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            region = self.categories['region'][regions[start]]
+            self.region_year_ranges[(region, int(years[start]))] = (start, stop)
+            first = self.region_ranges.get(region, (start, stop))[0]
+            self.region_ranges[region] = (first, stop)
+
+    def decoded(self, name: str, indices=None) -> np.ndarray:
+        """Column values for ``indices`` with dictionary codes decoded"""
+        column = self.columns[name]
+        if indices is not None:
+            column = column[indices]
+        if name in self._decode:
+            return self._decode[name][column]
+        return column
+
+    def codes_matching(self, name: str, value: str, ignore_case: bool = False) -> np.ndarray:
+        categories = self.categories[name]
+        if ignore_case:
+            value = value.lower()
+            return np.array([i for i, c in enumerate(categories) if c.lower() == value], dtype=np.int32)
+        return np.flatnonzero(categories == value).astype(np.int32)
+
+
+class ColumnStore:
+    """Lazily (re)loaded columnar snapshot of groundwater_records"""
+
+    def __init__(self, connection_factory, ttl: float = 3600):
+        self.connection_factory = connection_factory
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'invalidations': 0, 'last_load_seconds': None}
+
+    def load(self) -> _Snapshot:
+        """Read the whole table into columns and swap it in"""
+        started = time.perf_counter()
+        generation = self._generation
+        with self.connection_factory() as conn:
+            cursor = conn.cursor()
+            cursor.execute(LOAD_SQL)
+            rows = cursor.fetchall()
+
+        values = list(zip(*rows)) if rows else [()] * len(RECORD_FIELDS)
+        columns, categories = {}, {}
+        for name, column in zip(RECORD_FIELDS, values):
+            if name in DICTIONARY_COLUMNS:
+                codes, uniques = pd.factorize(pd.Series(column, dtype=object), use_na_sentinel=True)
+                columns[name] = codes.astype(np.int32)
+                categories[name] = np.asarray(uniques, dtype=object)
+            elif name in NUMERIC_COLUMNS:
+                columns[name] = np.array(column, dtype=NUMERIC_COLUMNS[name])
+            else:
+                columns[name] = np.array([None if v is None else str(v) for v in column]
+                                         if name == 'recorded_at' else column, dtype=object)
+        for array in list(columns.values()) + list(categories.values()):
+            array.flags.writeable = False
+
+        snapshot = _Snapshot(columns, categories)
+        # A write during the load makes this snapshot stale already; serve it
+        # to this caller but do not keep it
+        if generation == self._generation:
+            self._snapshot = snapshot
+        self._stats['loads'] += 1
+        self._stats['last_load_seconds'] = time.perf_counter() - started
+        return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot after a write; the next read reloads it"""
+        self._generation += 1
+        self._snapshot = None
+        self._stats['invalidations'] += 1
+
+    def snapshot(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - snapshot.loaded_at < self.ttl:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.time() - snapshot.loaded_at >= self.ttl:
+                snapshot = self.load()
+            return snapshot
+
+    # Lookups
+
+    def _region_year_slice(self, snap: _Snapshot, region: str = None, year: int = None):
+        if region is not None and year is not None:
+            return slice(*snap.region_year_ranges.get((region, int(year)), (0, 0)))
+        if region is not None:
+            return slice(*snap.region_ranges.get(region, (0, 0)))
+        return slice(0, snap.size)
+
+    def fetch_indices(self, region: str, year: int, district: str = None) -> Tuple[_Snapshot, np.ndarray]:
+        """Row positions for a region/year (and district) in fetch order"""
+        snap = self.snapshot()
+        window = self._region_year_slice(snap, region, year)
+        indices = np.arange(window.start, window.stop)
+        if district:
+            codes = snap.codes_matching('district', district)
+            indices = indices[np.isin(snap.columns['district'][window], codes)]
+        return snap, indices
+
+    def rows(self, snap: _Snapshot, indices: np.ndarray) -> List[tuple]:
+        """Materialize rows as tuples in RECORD_FIELDS order"""
+        columns = []
+        for name in RECORD_FIELDS:
+            values = snap.decoded(name, indices)
+            if name in ('month', 'measurement'):
+                values = [None if v != v else (int(v) if name == 'month' else v)
+                          for v in values.tolist()]
+            else:
+                values = values.tolist()
+            columns.append(values)
+        return list(zip(*columns))
+
+    def columns(self, snap: _Snapshot, indices: np.ndarray) -> Dict[str, np.ndarray]:
+        """Read-only typed columns for ``indices`` with strings decoded"""
+        result = {}
+        for name in RECORD_FIELDS:
+            array = snap.decoded(name, indices)
+            array.flags.writeable = False
+            result[name] = array
+        return result
+
+    def fetch_rows(self, region: str, year: int, district: str = None) -> List[tuple]:
+        snap, indices = self.fetch_indices(region, year, district)
+        return self.rows(snap, indices)
+
+    def fetch_columns(self, region: str, year: int, district: str = None) -> Dict[str, np.ndarray]:
+        snap, indices = self.fetch_indices(region, year, district)
+        return self.columns(snap, indices)
+
+    def available_regions(self) -> List[str]:
+        return sorted(self.snapshot().region_ranges)
+
+    def available_years(self, region: str = None) -> List[int]:
+        snap = self.snapshot()
+        if region is not None:
+            years = [y for (r, y) in snap.region_year_ranges if r == region]
+        else:
+            years = {y for (_, y) in snap.region_year_ranges}
+        return sorted(years, reverse=True)
+
+    # Search
+
+    def _sort_key(self, snap: _Snapshot, name: str, indices: np.ndarray):
+        """(non-null flag, orderable key) arrays matching SQLite ordering"""
+        column = snap.columns[name][indices]
+        if name in NUMERIC_COLUMNS:
+            values = column.astype(np.float64)
+            present = ~np.isnan(values)
+            return present.astype(np.int8), np.where(present, values, 0.0), None
+
+        if name in DICTIONARY_COLUMNS:
+            categories = snap.categories[name]
+            order = np.argsort(categories.astype(str), kind='stable')
+            sorted_values = categories[order]
+            rank = np.empty(len(categories) + 1, dtype=np.float64)
+            rank[order] = np.arange(len(categories))
+            rank[-1] = 0.0
+            present = column >= 0
+            return present.astype(np.int8), rank[column], sorted_values
+
+        present = np.array([v is not None for v in column], dtype=bool)
+        sorted_values = np.array(sorted({v for v in column if v is not None}), dtype=object)
+        keys = np.zeros(len(column), dtype=np.float64)
+        if present.any():
+            keys[present] = np.searchsorted(sorted_values, column[present])
+        return present.astype(np.int8), keys, sorted_values
+
+    @staticmethod
+    def _cursor_key(value, sorted_values) -> Tuple[int, float]:
+        if value is None:
+            return 0, 0.0
+        if sorted_values is None:
+            return 1, float(value)
+        position = int(np.searchsorted(sorted_values, value))
+        exact = position < len(sorted_values) and sorted_values[position] == value
+        return 1, float(position) if exact else position - 0.5
+
+    def search(self, query, region: str = None, year: int = None, district: str = None,
+               state: str = None, well_type: str = None, aquifer_type: str = None,
+               min_level: float = None, max_level: float = None,
+               include_total: bool = False) -> Tuple[List[tuple], Optional[int]]:
+        """Answer a search with the same filters and keyset order as SQL
+
+        ``query`` is the GroundwaterQuery built for the request; its sort,
+        direction, page size and cursor position are honoured. Returns the
+        page rows (plus one look-ahead row) and the optional total.
+        """
+        snap = self.snapshot()
+        year = None if year == '' else year
+        window = self._region_year_slice(snap, region or None, year if region else None)
+        indices = np.arange(window.start, window.stop)
+        mask = np.ones(len(indices), dtype=bool)
+
+        if year is not None and not region:
+            mask &= snap.columns['year'][indices] == int(year)
+        if district:
+            mask &= np.isin(snap.columns['district'][indices], snap.codes_matching('district', district))
+        for name, value in (('state', state), ('well_type', well_type), ('aquifer_type', aquifer_type)):
+            if value:
+                mask &= np.isin(snap.columns[name][indices], snap.codes_matching(name, value, ignore_case=True))
+        measurement = snap.columns['measurement'][indices]
+        if min_level is not None:
+            mask &= measurement >= float(min_level)
+        if max_level is not None:
+            mask &= measurement <= float(max_level)
+        indices = indices[mask]
+        total = len(indices) if include_total else None
+
+        ids = snap.columns['id'][indices]
+        if query.sort == 'id':
+            present, keys, sorted_values = np.ones(len(indices), dtype=np.int8), ids.astype(np.float64), None
+        else:
+            present, keys, sorted_values = self._sort_key(snap, query.sort, indices)
+
+        if query.position is not None:
+            value, last_id = query.position
+            flag, key = (1, float(last_id)) if query.sort == 'id' else self._cursor_key(value, sorted_values)
+            if query.descending:
+                after = (present < flag) | ((present == flag) & ((keys < key) | ((keys == key) & (ids < last_id))))
+            else:
+                after = (present > flag) | ((present == flag) & ((keys > key) | ((keys == key) & (ids > last_id))))
+            indices, present, keys, ids = indices[after], present[after], keys[after], ids[after]
+
+        order = np.lexsort((ids, keys, present))
+        if query.descending:
+            order = order[::-1]
+        if query.page_size is not None:
+            order = order[:query.page_size + 1]
+        return self.rows(snap, indices[order]), total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row count, load timings and memory footprint per column"""
+        snap = self._snapshot
+        stats = dict(self._stats)
+        stats['ttl'] = self.ttl
+        if snap is None:
+            stats.update({'loaded': False, 'rows': 0, 'memory_bytes': 0})
+            return stats
+
+        columns = {}
+        for name, array in snap.columns.items():
+            size = array.nbytes
+            if array.dtype == object:
+                size += sum(sys.getsizeof(v) for v in {id(v): v for v in array}.values())
+            if name in snap.categories:
+                size += snap.categories[name].nbytes + sum(sys.getsizeof(v) for v in snap.categories[name])
+            columns[name] = size
+        stats.update({
+            'loaded': True,
+            'rows': snap.size,
+            'region_year_groups': len(snap.region_year_ranges),
+            'loaded_at': snap.loaded_at,
+            'memory_bytes': sum(columns.values()),
+            'memory_by_column': columns,
+        })
+        return stats
@@ -0,0 +1,260 @@
+"""
+JalDoot Connection Pool
+Thread-aware connection pooling for the SQLite and IN-GRES (pyodbc) backends
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Mapping, Optional
+
+from jaldoot.app.core.runtime_config import setting
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class PooledConnection:
+    """Proxy around a DB-API connection that returns itself to the pool on close()"""
+
+    def __init__(self, pool: 'ConnectionPool', conn):
+        self._pool = pool
+        self._conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.depth = 0
+
+    @property
+    def raw(self):
+        """Underlying driver connection"""
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        """Release the connection back to the pool instead of closing it"""
+        self._pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Like ``with sqlite3_conn:``, commit on success and roll back on
+        # error, then return the connection to the pool. A nested block on
+        # the same thread shares the outer caller's transaction, so only the
+        # outermost exit ends it
+        if self.depth > 1:
+            self.close()
+            return False
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self.close()
+        return False
+
+
+class ConnectionPool:
+    """Bounded connection pool with per-thread reuse, health checks and recycling.
+
+    A thread that acquires a connection while it already holds one gets the
+    same connection back, so nested service calls share a single connection.
+    Idle connections are pinged before reuse and closed once they exceed
+    ``recycle`` seconds of age.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], size: int = 5,
+                 timeout: float = 30.0, recycle: float = 3600.0,
+                 health_check_interval: float = 30.0,
+                 health_check_sql: str = "SELECT 1"):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_check_interval = health_check_interval
+        self.health_check_sql = health_check_sql
+
+        self._idle = deque()
+        self._open = 0
+        self._local = threading.local()
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'thread_reused': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connect_errors': 0,
+        }
+
+    def acquire(self) -> PooledConnection:
+        """Check out a connection, reusing the one already held by this thread"""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            held.depth += 1
+            with self._cond:
+                self._stats['thread_reused'] += 1
+            return held
+
+        pooled = self._checkout()
+        pooled.depth = 1
+        self._local.conn = pooled
+        return pooled
+
+    def release(self, pooled: PooledConnection):
+        """Return a connection to the pool once the outermost holder closes it"""
+        if pooled.depth > 1:
+            pooled.depth -= 1
+            return
+
+        pooled.depth = 0
+        if getattr(self._local, 'conn', None) is pooled:
+            self._local.conn = None
+
+        conn = pooled.raw
+        healthy = True
+        try:
+            # Never hand an open transaction to the next borrower
+            if getattr(conn, 'in_transaction', False):
+                conn.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            if self._closed or not healthy or self._expired(pooled):
+                self._discard(pooled, recycled=healthy)
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    def _checkout(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            candidate = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout(f"{self.name} pool is closed")
+
+                    while self._idle:
+                        # LIFO keeps the hottest connections in use
+                        pooled = self._idle.pop()
+                        if self._expired(pooled):
+                            self._discard(pooled, recycled=True)
+                            continue
+                        if not self._needs_health_check(pooled):
+                            self._stats['reused'] += 1
+                            return pooled
+                        candidate = pooled
+                        break
+                    if candidate is not None:
+                        break
+
+                    if self._open < self.size:
+                        self._open += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"{self.name} pool exhausted ({self.size} connections in use)")
+                    self._stats['waits'] += 1
+                    self._cond.wait(remaining)
+
+            if candidate is None:
+                break
+
+            # Ping outside the lock so a hung driver does not block other
+            # threads; the candidate keeps its slot meanwhile
+            healthy = self._is_healthy(candidate)
+            with self._cond:
+                if healthy:
+                    self._stats['reused'] += 1
+                    return candidate
+                self._stats['health_check_failures'] += 1
+                self._discard(candidate)
+                self._cond.notify()
+
+        # Connect outside the lock so a slow driver does not block releases
+        try:
+            conn = self.factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._stats['connect_errors'] += 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats['created'] += 1
+        return PooledConnection(self, conn)
+
+    def _expired(self, pooled: PooledConnection) -> bool:
+        return bool(self.recycle) and time.monotonic() - pooled.created_at > self.recycle
+
+    def _needs_health_check(self, pooled: PooledConnection) -> bool:
+        return time.monotonic() - pooled.last_used >= self.health_check_interval
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        """Ping the connection; called without the pool lock held"""
+        try:
+            cursor = pooled.raw.cursor()
+            cursor.execute(self.health_check_sql)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledConnection, recycled: bool = False):
+        """Close a connection and free its slot; caller must hold the lock"""
+        self._open -= 1
+        if recycled:
+            self._stats['recycled'] += 1
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close idle connections and refuse new checkouts"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool occupancy and lifetime counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'name': self.name,
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            })
+        return stats
+
+
+def pool_settings_from_env(prefix: str = 'DB_POOL', size: int = 5,
+                           config: Mapping[str, Any] = None) -> Dict[str, float]:
+    """Read pool sizing knobs from ``config``/the app config, else the environment"""
+    return {
+        'size': setting(f'{prefix}_SIZE', size, int, config),
+        'timeout': setting(f'{prefix}_TIMEOUT', 30.0, float, config),
+        'recycle': setting(f'{prefix}_RECYCLE', 3600.0, float, config),
+        'health_check_interval': setting(f'{prefix}_HEALTH_CHECK_INTERVAL', 30.0, float, config),
+    }
@@ -0,0 +1,174 @@
+"""
+JalDoot Exporters
+Serialize streamed row batches for download without buffering the result
+
+Every exporter takes the projected column names and an iterable of row
+batches (sequences of tuples, as returned by cursor.fetchmany()) and yields
+encoded chunks, so the output is produced batch by batch.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except ImportError:
+    pa = None
+    pq = None
+    HAVE_PYARROW = False
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+TEXT_FORMATS = ('ndjson', 'csv')
+
+# Arrow types per column; anything unlisted is exported as a string
+ARROW_TYPES = {
+    'id': 'int64',
+    'year': 'int32',
+    'month': 'int32',
+    'measurement': 'float64',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'population': 'int64',
+    'area_sqkm': 'float64',
+    'recorded_at': 'timestamp',
+    'updated_at': 'timestamp',
+    'created_at': 'timestamp',
+}
+
+# Rows buffered into each Parquet row group
+PARQUET_ROW_GROUP_SIZE = 128 * 1024
+
+Batches = Iterable[Sequence[tuple]]
+
+
+def iter_ndjson(columns: List[str], batches: Batches) -> Iterator[str]:
+    """One JSON object per line, one chunk per batch"""
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in rows)
+
+
+def iter_csv(columns: List[str], batches: Batches) -> Iterator[str]:
+    """Header row first, then one chunk of CSV rows per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def iter_gzip(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained as they are written"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def arrow_schema(columns: List[str]):
+    """Arrow schema for the projected columns"""
+    fields = []
+    for name in columns:
+        kind = ARROW_TYPES.get(name, 'string')
+        fields.append(pa.field(name, pa.timestamp('us') if kind == 'timestamp' else pa.type_for_alias(kind)))
+    return pa.schema(fields)
+
+
+def _to_arrow_array(values, arrow_type):
+    if pa.types.is_timestamp(arrow_type):
+        # SQLite returns timestamps as text, pyodbc as datetime
+        return pa.array(values).cast(arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def to_record_batch(rows: Sequence[tuple], schema):
+    """Transpose one fetchmany() batch into an Arrow RecordBatch"""
+    values = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [_to_arrow_array(list(column), field.type) for column, field in zip(values, schema)],
+        schema=schema
+    )
+
+
+def iter_arrow(columns: List[str], batches: Batches) -> Iterator[bytes]:
+    """Arrow IPC stream, one record batch per cursor batch"""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for rows in batches:
+        writer.write_batch(to_record_batch(rows, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(columns: List[str], batches: Batches,
+                 row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Iterator[bytes]:
+    """Parquet file, emitted one row group at a time"""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    pending, pending_rows = [], 0
+    for rows in batches:
+        pending.append(to_record_batch(rows, schema))
+        pending_rows += len(rows)
+        if pending_rows >= row_group_size:
+            writer.write_table(pa.Table.from_batches(pending, schema=schema))
+            pending, pending_rows = [], 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(columns: List[str], batches: Batches, fmt: str, compress: bool = False) -> Iterator:
+    """Serialize row batches as ``fmt``; ``compress`` gzips the text formats"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {sorted(EXPORT_FORMATS)}")
+    if fmt in TEXT_FORMATS:
+        chunks = iter_ndjson(columns, batches) if fmt == 'ndjson' else iter_csv(columns, batches)
+        return iter_gzip(chunks) if compress else chunks
+    if not HAVE_PYARROW:
+        raise ValueError(f"{fmt} export requires pyarrow (pip install pyarrow)")
+    return iter_arrow(columns, batches) if fmt == 'arrow' else iter_parquet(columns, batches)
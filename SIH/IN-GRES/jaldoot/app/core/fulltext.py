@@ -0,0 +1,105 @@
+"""
+JalDoot Full-Text Index
+FTS5 index over groundwater_records notes and source metadata
+
+groundwater_fts is an external-content FTS5 table: it stores only the
+inverted index and reads column values back from groundwater_records by
+rowid (= id). Triggers keep it current on every insert, update and delete.
+Queries rank matches with bm25, weighting notes above the location and
+source columns.
+"""
+
+import re
+from typing import Optional
+
+FTS_TABLE = 'groundwater_fts'
+
+# Indexed columns and their bm25 weights
+FTS_COLUMNS = {
+    'notes': 10.0,
+    'region': 4.0,
+    'district': 4.0,
+    'state': 2.0,
+    'well_type': 2.0,
+    'aquifer_type': 2.0,
+    'source_url': 1.0,
+}
+
+_COLUMN_LIST = ', '.join(FTS_COLUMNS)
+
+CREATE_TABLE = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_COLUMN_LIST},
+        content='groundwater_records',
+        content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+"""
+
+
+def _values(ref: str) -> str:
+    return ', '.join(f"{ref}.{column}" for column in FTS_COLUMNS)
+
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_fts_insert
+        AFTER INSERT ON groundwater_records BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, {_COLUMN_LIST}) VALUES (NEW.id, {_values('NEW')});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_fts_delete
+        AFTER DELETE ON groundwater_records BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {_COLUMN_LIST})
+            VALUES ('delete', OLD.id, {_values('OLD')});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_fts_update
+        AFTER UPDATE OF {_COLUMN_LIST} ON groundwater_records BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {_COLUMN_LIST})
+            VALUES ('delete', OLD.id, {_values('OLD')});
+            INSERT INTO {FTS_TABLE} (rowid, {_COLUMN_LIST}) VALUES (NEW.id, {_values('NEW')});
+        END""",
+]
+
+# FTS5 query syntax characters are stripped; everything else is a search term
+_TERM = re.compile(r'[^\s"\'()*:^+\-.,;!?{}\[\]]+')
+
+# bm25() is lower-is-better; relevance flips it so larger means a better match
+RELEVANCE_SQL = f"-bm25({FTS_TABLE}, {', '.join(str(w) for w in FTS_COLUMNS.values())})"
+
+
+def rebuild(cursor):
+    """Re-index every row of groundwater_records (repair / first install)"""
+    cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def optimize(cursor):
+    """Merge the index b-trees into one for faster queries"""
+    cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+def install(cursor):
+    """Create the FTS table and triggers, then index existing rows"""
+    cursor.execute(CREATE_TABLE)
+    for statement in CREATE_TRIGGERS:
+        cursor.execute(statement)
+    rebuild(cursor)
+
+
+def match_expression(text: str, prefix: bool = True) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression requiring every term
+
+    Terms are quoted so user input is never parsed as FTS5 syntax. With
+    ``prefix`` the last term also matches as a prefix (search-as-you-type).
+    Returns None when the text has no searchable terms.
+    """
+    terms = _TERM.findall(text or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if prefix:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def matching_ids_sql() -> str:
+    """(id, relevance) of rows matching a bound MATCH expression"""
+    return f"SELECT rowid AS id, {RELEVANCE_SQL} AS relevance FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
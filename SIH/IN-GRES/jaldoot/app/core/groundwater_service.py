@@ -5,19 +5,44 @@ Enhanced service for IN-GRES platform integration
 
 import os
 import json
+import atexit
+import heapq
 import sqlite3
+import threading
+from itertools import chain
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from jaldoot.app.core.connection_pool import ConnectionPool, PoolTimeout, pool_settings_from_env
+from jaldoot.app.core.runtime_config import setting
+from jaldoot.app.core.circuit_breaker import CircuitBreaker, BreakerConnection, CLOSED
+from jaldoot.app.core.migrations import (run_migrations, get_schema_version, dedupe_records,
+                                        upsert_records_sql, GROUNDWATER_RECORDS_TABLE,
+                                        NATURAL_KEY_COLUMNS)
+from jaldoot.app.core.cache import TTLCache
+from jaldoot.app.core.column_store import ColumnStore
+from jaldoot.app.core.spatial_index import SpatialIndex
+from jaldoot.app.core import analytics
+from jaldoot.app.core.query_logger import QueryLogWriter
+from jaldoot.app.core.bulk_loader import BulkLoader, BulkLoadError
+from jaldoot.app.core.query_builder import GroundwaterQuery, InvalidQuery, RECORD_FIELDS, EXPORT_TABLES
+from jaldoot.app.core.sync_service import IngresSyncService
+from jaldoot.app.core.sharding import ShardRouter
+from jaldoot.app.core import rollups
+from jaldoot.app.core import fulltext
+
 try:
     import pyodbc
     HAVE_PYODBC = True
+    # Errors in the statement itself; they say nothing about IN-GRES being reachable
+    INGRES_STATEMENT_ERRORS = (pyodbc.ProgrammingError, pyodbc.IntegrityError, pyodbc.DataError)
 except ImportError:
     pyodbc = None
     HAVE_PYODBC = False
+    INGRES_STATEMENT_ERRORS = ()
 
 try:
     import openai
@@ -29,42 +54,169 @@ except ImportError:
 class GroundwaterService:
     """Enhanced groundwater data service with IN-GRES integration"""
     
-    def __init__(self):
-        self.sqlite_db_path = "jaldoot/data/groundwater.db"
-        self.ingres_connstr = os.getenv('INGRES_CONNSTR')
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.ingres_base_url = os.getenv('INGRES_BASE_URL', 'https://ingres.iith.ac.in')
+    # Upper bound on rows returned per search page
+    MAX_SEARCH_PAGE_SIZE = 1000
+    
+    # Stay well below SQLite's bound-parameter limit in IN (...) lists
+    BATCH_PARAM_LIMIT = 500
+    
+    # Typed columns for columnar fetches; everything else is kept as object
+    COLUMN_DTYPES = {
+        'id': np.int64,
+        'year': np.int64,
+        'month': np.float64,
+        'measurement': np.float64,
+    }
+    COLUMNAR_MODES = ('dataframe', 'numpy')
+    
+    # Default rows per fetchmany() round trip when streaming
+    DEFAULT_STREAM_ARRAYSIZE = 1000
+    
+    def __init__(self, sqlite_db_path: str = None, config: Mapping[str, Any] = None):
+        # Settings come from ``config``, else the app config, else the environment
+        self.config = config
+        self.sqlite_db_path = sqlite_db_path or self._setting('GROUNDWATER_DB_PATH', "jaldoot/data/groundwater.db")
+        self.ingres_connstr = self._setting('INGRES_CONNSTR')
+        self.openai_api_key = self._setting('OPENAI_API_KEY')
+        self.ingres_base_url = self._setting('INGRES_BASE_URL', 'https://ingres.iith.ac.in')
+        
+        # Connection pools (SQLite fallback and IN-GRES)
+        self.sqlite_pool = ConnectionPool(
+            'sqlite', self._connect_sqlite, **pool_settings_from_env('DB_POOL', config=config)
+        )
+        self.ingres_pool = None
+        if HAVE_PYODBC and self.ingres_connstr:
+            self.ingres_pool = ConnectionPool(
+                'ingres', self._connect_ingres_pooled, **pool_settings_from_env('INGRES_POOL', config=config)
+            )
+        
+        # Skip IN-GRES entirely while it is known to be unreachable
+        self.ingres_connect_timeout = self._setting('INGRES_CONNECT_TIMEOUT', 5, int)
+        self.ingres_breaker = CircuitBreaker(
+            'ingres',
+            failure_threshold=self._setting('INGRES_BREAKER_FAILURE_THRESHOLD', 3, int),
+            recovery_timeout=self._setting('INGRES_BREAKER_RECOVERY_TIMEOUT', 30.0, float),
+            half_open_max_calls=self._setting('INGRES_BREAKER_HALF_OPEN_CALLS', 1, int)
+        )
+        
+        self.stream_arraysize = self._setting('STREAM_ARRAYSIZE', self.DEFAULT_STREAM_ARRAYSIZE, int)
+        
+        # Delta sync from IN-GRES into the local SQLite mirror; with
+        # INGRES_SERVE_FROM_MIRROR requests never query IN-GRES directly
+        self.serve_from_mirror = self._setting('INGRES_SERVE_FROM_MIRROR', False, bool)
+        self.ingres_sync = None
+        if HAVE_PYODBC and self.ingres_connstr:
+            self.ingres_sync = IngresSyncService(
+                self._connect_ingres, self.sqlite_db_path,
+                batch_size=self._setting('INGRES_SYNC_BATCH_SIZE', 5000, int),
+                breaker=self.ingres_breaker
+            )
+        
+        # Read-through cache for lookups; cleared whenever records are written
+        self.cache = TTLCache(
+            max_entries=self._setting('CACHE_MAX_ENTRIES', 1024, int),
+            ttl=self._setting('CACHE_TTL', 3600.0, float),
+            enabled=self._setting('CACHE_ENABLED', True, bool)
+        )
+        
+        # Per-state shards for groundwater_records; the main database keeps
+        # metadata, query history and the shard catalog
+        self.sharding_enabled = self._setting('SHARDING_ENABLED', False, bool)
+        self.shards = None
+        
+        # Optional in-memory columnar copy of groundwater_records that serves
+        # lookups and searches; reloaded after writes
+        self.column_store = None
+        if self._setting('COLUMN_STORE_ENABLED', False, bool) and self.sharding_enabled:
+            print("Column store is not available with sharded storage, serving from the shards")
+        elif self._setting('COLUMN_STORE_ENABLED', False, bool):
+            self.column_store = ColumnStore(
+                self.sqlite_pool.acquire,
+                ttl=self._setting('COLUMN_STORE_TTL', 3600.0, float)
+            )
+        
+        # Nearest-region and area lookups over regional_metadata coordinates
+        self.spatial_index = SpatialIndex(
+            self.get_connection,
+            ttl=self._setting('SPATIAL_INDEX_TTL', 3600.0, float)
+        )
+        
+        # Aggregate queries go to DuckDB when ANALYTICS_BACKEND=duckdb
+        self.analytics = None
+        if self._setting('ANALYTICS_BACKEND', 'sqlite').lower() == 'duckdb':
+            try:
+                self.analytics = analytics.AnalyticsEngine(
+                    self.sqlite_db_path,
+                    row_source=lambda: self.iter_table_rows(
+                        columns=EXPORT_TABLES['groundwater_records'][1], batch_size=50000),
+                    parquet_path=self._setting('ANALYTICS_PARQUET_PATH'),
+                    # An attached main database would not see the shards
+                    source='parquet' if self.sharding_enabled else self._setting('ANALYTICS_SOURCE', 'auto')
+                )
+            except RuntimeError as e:
+                print(f"Analytics backend unavailable: {e}, using SQLite")
+        
+        # Write-behind query logging, flushed in batches off the request path
+        self.query_log = QueryLogWriter(
+            self.get_connection,
+            max_queue=self._setting('QUERY_LOG_QUEUE_SIZE', 10000, int),
+            batch_size=self._setting('QUERY_LOG_BATCH_SIZE', 100, int),
+            flush_interval=self._setting('QUERY_LOG_FLUSH_INTERVAL', 1.0, float)
+        )
+        atexit.register(self.query_log.close)
         
         # Initialize database
         self._init_database()
+        if self.sharding_enabled:
+            self.shards = ShardRouter(
+                self.sqlite_pool,
+                self._setting('SHARD_DIR') or os.path.join(os.path.dirname(self.sqlite_db_path), 'shards'),
+                self._init_shard,
+                pool_settings=pool_settings_from_env('SHARD_POOL', size=2, config=self.config),
+                max_workers=self._setting('SHARD_FANOUT_WORKERS', 4, int)
+            )
+            # Synced rows go straight to their state shards
+            if self.ingres_sync:
+                self.ingres_sync.shards = self.shards
+        if self.column_store:
+            self.column_store.load()
+    
+    def _setting(self, name: str, default: Any = None, cast=None) -> Any:
+        return setting(name, default, cast, self.config)
+    
+    def _connect_sqlite(self):
+        """Open a raw SQLite connection for the pool"""
+        # Pooled connections move between request threads, one owner at a time
+        return sqlite3.connect(self.sqlite_db_path, check_same_thread=False)
+    
+    def _connect_ingres(self):
+        """Open a raw IN-GRES connection"""
+        return pyodbc.connect(self.ingres_connstr, autocommit=True,
+                              timeout=self.ingres_connect_timeout)
+    
+    def _connect_ingres_pooled(self):
+        """Open an IN-GRES connection for the pool that reports to the breaker
+        
+        The connect attempt and every statement run on the connection are
+        real round trips, so they are what opens and closes the breaker.
+        """
+        try:
+            conn = self._connect_ingres()
+        except Exception as e:
+            self.ingres_breaker.record_failure(e)
+            raise
+        self.ingres_breaker.record_success()
+        return BreakerConnection(conn, self.ingres_breaker, ignore=INGRES_STATEMENT_ERRORS)
     
     def _init_database(self):
         """Initialize SQLite database with enhanced schema"""
         os.makedirs(os.path.dirname(self.sqlite_db_path), exist_ok=True)
         
-        conn = sqlite3.connect(self.sqlite_db_path)
+        conn = self.sqlite_pool.acquire()
         cursor = conn.cursor()
         
         # Enhanced groundwater records table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS groundwater_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                region TEXT NOT NULL,
-                district TEXT,
-                state TEXT NOT NULL,
-                year INTEGER NOT NULL,
-                month INTEGER,
-                measurement REAL,
-                unit TEXT DEFAULT 'm',
-                well_type TEXT,
-                aquifer_type TEXT,
-                notes TEXT,
-                source_url TEXT,
-                data_quality TEXT,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        cursor.execute(GROUNDWATER_RECORDS_TABLE)
         
         # Regional metadata table
         cursor.execute("""
@@ -100,12 +252,52 @@ class GroundwaterService:
         conn.commit()
         conn.close()
         
-        # Insert sample data if empty
-        self._insert_sample_data()
+        # Bring indexes and later schema changes up to date; the sample data
+        # upserts on the natural key index a migration creates
+        with self.sqlite_pool.acquire() as conn:
+            run_migrations(conn)
+        
+        # Insert sample data if empty (shards are filled by split or bulk load)
+        if not self.sharding_enabled:
+            self._insert_sample_data()
+    
+    @staticmethod
+    def _init_shard(conn):
+        """Create the records schema in a new state shard"""
+        conn.execute(GROUNDWATER_RECORDS_TABLE)
+        conn.commit()
+        run_migrations(conn)
+    
+    def _shard_targets(self, region: str = None, state: str = None) -> List:
+        """Shards that can hold records for ``region`` / ``state`` (all if neither)"""
+        if region:
+            shard = self.shards.shard_for_region(region)
+            return [shard] if shard else []
+        if state:
+            shard = self.shards.shard_for_state(state)
+            return [shard] if shard else []
+        self.shards.reload_catalog()
+        return self.shards.shards
+    
+    def _on_record_stores(self, fn, region: str = None, state: str = None,
+                          local_only: bool = False) -> List[Any]:
+        """Run ``fn(conn)`` on every database that can hold matching records
+        
+        Unsharded that is the one database; sharded it is the shard routed to
+        by region or state, or every shard in parallel.
+        """
+        if self.shards is None:
+            with (self.sqlite_pool.acquire() if local_only else self.get_connection()) as conn:
+                return [fn(conn)]
+        
+        def run(shard):
+            with shard.pool.acquire() as conn:
+                return fn(conn)
+        return self.shards.fan_out(run, self._shard_targets(region, state))
     
     def _insert_sample_data(self):
         """Insert comprehensive sample data for testing"""
-        conn = sqlite3.connect(self.sqlite_db_path)
+        conn = self.sqlite_pool.acquire()
         cursor = conn.cursor()
         
         # Check if data exists
@@ -139,11 +331,10 @@ class GroundwaterService:
             ("Karnataka", "Mysore", "Karnataka", 2024, 1, 14.2, "m", "Borewell", "Granite", "Heritage city", "https://ingres.iith.ac.in/karnataka/mysore/2024/01", "High"),
         ]
         
-        cursor.executemany("""
-            INSERT INTO groundwater_records 
-            (region, district, state, year, month, measurement, unit, well_type, aquifer_type, notes, source_url, data_quality)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, sample_data)
+        cursor.executemany(upsert_records_sql([
+            'region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+            'well_type', 'aquifer_type', 'notes', 'source_url', 'data_quality'
+        ]), sample_data)
         
         # Regional metadata
         regional_metadata = [
@@ -162,105 +353,788 @@ class GroundwaterService:
         
         conn.commit()
         conn.close()
+        self.invalidate_cache()
+    
+    def bulk_load(self, path: str, fmt: str = None, chunk_size: int = 50000,
+                  resume: bool = True, rejects_path: str = None, progress: bool = True,
+                  state: str = None) -> Dict[str, Any]:
+        """Bulk load a CSV, JSON-lines or Parquet export into groundwater_records
+        
+        With ``state`` only that state's rows are loaded. Sharded storage
+        requires it and loads into that state's shard alone.
+        """
+        db_path = self.sqlite_db_path
+        if self.shards is not None:
+            if not state:
+                raise BulkLoadError("Sharded storage loads one state at a time; pass the state")
+            db_path = self.shards.ensure_shard(state).path
+        
+        loader = BulkLoader(db_path, chunk_size=chunk_size, state=state)
+        try:
+            return loader.load(path, fmt=fmt, resume=resume,
+                               rejects_path=rejects_path, progress=progress)
+        finally:
+            # Committed chunks are visible even if the load failed part way
+            if self.shards is not None:
+                self.shards.refresh_regions()
+            self.invalidate_cache()
+    
+    def split_into_shards(self, delete: bool = False) -> Dict[str, int]:
+        """Copy records from the main database into their state shards"""
+        if self.shards is None:
+            raise RuntimeError("Sharded storage is not enabled (set SHARDING_ENABLED=True)")
+        
+        with self.sqlite_pool.acquire() as conn:
+            states = [row[0] for row in conn.execute(
+                "SELECT DISTINCT state FROM groundwater_records ORDER BY state").fetchall()]
+        
+        columns = [c for c in EXPORT_TABLES['groundwater_records'][1] if c != 'id']
+        upsert = upsert_records_sql(
+            columns,
+            f"SELECT {', '.join(columns)} FROM main_db.groundwater_records WHERE state = ? ORDER BY id",
+            update_columns=[c for c in columns if c not in NATURAL_KEY_COLUMNS and c != 'updated_at']
+        )
+        copied = {}
+        for state in states:
+            shard = self.shards.ensure_shard(state)
+            conn = sqlite3.connect(shard.path, isolation_level=None)
+            try:
+                conn.execute("ATTACH DATABASE ? AS main_db", (self.sqlite_db_path,))
+                conn.execute("BEGIN IMMEDIATE")
+                # Rows already in the shard (e.g. re-synced readings) are updated in place
+                copied[state] = conn.execute(upsert, (state,)).rowcount
+                if delete:
+                    conn.execute("DELETE FROM main_db.groundwater_records WHERE state = ?", (state,))
+                conn.execute("COMMIT")
+                conn.execute("DETACH DATABASE main_db")
+            finally:
+                conn.close()
+        
+        self.shards.refresh_regions()
+        self.invalidate_cache()
+        return copied
+    
+    def dedupe(self, dry_run: bool = False) -> Dict[str, int]:
+        """Remove duplicate readings (same natural key), keeping the latest of each
+        
+        Migration 9 does this once before adding the unique key; afterwards
+        every write path upserts, so this only finds rows that bypassed it.
+        Returns duplicates found per database file.
+        """
+        def dedupe_store(conn):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                count = dedupe_records(cursor, dry_run=dry_run)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return count
+        
+        names = ([shard.state for shard in self._shard_targets()] if self.shards is not None
+                 else [os.path.basename(self.sqlite_db_path)])
+        counts = dict(zip(names, self._on_record_stores(dedupe_store, local_only=True)))
+        if not dry_run and any(counts.values()):
+            self.invalidate_cache()
+        return counts
+    
+    def vacuum(self, state: str = None) -> List[str]:
+        """VACUUM and ANALYZE the database, or one/every shard when sharded"""
+        if self.shards is not None:
+            return self.shards.vacuum(state)
+        conn = sqlite3.connect(self.sqlite_db_path, isolation_level=None)
+        try:
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        return [os.path.basename(self.sqlite_db_path)]
+    
+    def sync_from_ingres(self, source_factory=None, progress: bool = False) -> Dict[str, Any]:
+        """Pull IN-GRES rows changed since the last sync into the local mirror
+        
+        ``source_factory`` overrides the IN-GRES connection, e.g. with a
+        sqlite3 connection to another database standing in for IN-GRES.
+        """
+        syncer = self.ingres_sync
+        if source_factory is not None:
+            syncer = IngresSyncService(source_factory, self.sqlite_db_path,
+                                       batch_size=self._setting('INGRES_SYNC_BATCH_SIZE', 5000, int),
+                                       shards=self.shards)
+        if syncer is None:
+            raise RuntimeError("IN-GRES is not configured (set INGRES_CONNSTR and install pyodbc)")
+        try:
+            return syncer.run_once(progress=progress)
+        finally:
+            self.invalidate_cache()
+    
+    def start_ingres_sync(self, interval: float):
+        """Sync from IN-GRES every ``interval`` seconds in the background"""
+        if self.ingres_sync is None:
+            print("IN-GRES sync not started: IN-GRES is not configured")
+            return
+        self.ingres_sync.start_scheduler(interval, on_synced=lambda result: self.invalidate_cache())
+    
+    def get_sync_status(self) -> Optional[Dict[str, Any]]:
+        """Get the IN-GRES sync watermark and last run for monitoring"""
+        return self.ingres_sync.get_status() if self.ingres_sync else None
+    
+    def _ingres_serves_reads(self) -> bool:
+        """Whether get_connection() may hand out IN-GRES connections"""
+        return self.ingres_pool is not None and not self.serve_from_mirror
     
     def get_connection(self):
-        """Get database connection (INGRES or SQLite fallback)"""
-        if HAVE_PYODBC and self.ingres_connstr:
+        """Get pooled database connection (INGRES or SQLite fallback)
+        
+        Callers close() the connection as before; that returns it to its pool.
+        While the IN-GRES circuit breaker is open, or when serving from the
+        synced mirror, this goes straight to SQLite. Connects and statements
+        on IN-GRES connections record their outcome on the breaker.
+        """
+        if self._ingres_serves_reads() and self.ingres_breaker.allow_request():
+            probing = self.ingres_breaker.state != CLOSED
             try:
-                return pyodbc.connect(self.ingres_connstr, autocommit=True)
+                conn = self.ingres_pool.acquire()
+            except PoolTimeout as e:
+                # A busy pool says nothing about IN-GRES, so give back any probe slot
+                self.ingres_breaker.cancel_request()
+                print(f"INGRES pool busy: {e}, falling back to SQLite")
             except Exception as e:
                 print(f"INGRES connection failed: {e}, falling back to SQLite")
+            else:
+                if not probing:
+                    return conn
+                # A reused idle connection has not talked to IN-GRES yet; the
+                # half-open probe must be a real round trip
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(self.ingres_pool.health_check_sql)
+                    cursor.fetchall()
+                    return conn
+                except Exception as e:
+                    conn.close()
+                    print(f"INGRES probe failed: {e}, falling back to SQLite")
         
-        return sqlite3.connect(self.sqlite_db_path)
+        return self.sqlite_pool.acquire()
     
-    def fetch_groundwater_data(self, region: str, year: int, district: str = None) -> List[Dict]:
-        """Fetch groundwater data for a specific region and year"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_ingres_status(self) -> Dict[str, Any]:
+        """Get IN-GRES configuration and circuit breaker state for monitoring"""
+        return {
+            'configured': self.ingres_pool is not None,
+            'circuit_breaker': self.ingres_breaker.get_state()
+        }
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics for monitoring"""
+        return {
+            'sqlite': self.sqlite_pool.get_stats(),
+            'ingres': self.ingres_pool.get_stats() if self.ingres_pool else None
+        }
+    
+    def get_schema_version(self) -> int:
+        """Get the applied schema migration version of the SQLite database"""
+        with self.sqlite_pool.acquire() as conn:
+            return get_schema_version(conn)
+    
+    def invalidate_cache(self):
+        """Drop cached lookups after groundwater records or metadata change"""
+        self.cache.invalidate()
+        self.spatial_index.invalidate()
+        if self.column_store:
+            self.column_store.invalidate()
+        if self.analytics:
+            self.analytics.invalidate()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get result cache statistics for monitoring"""
+        return self.cache.get_stats()
+    
+    def get_column_store_stats(self) -> Optional[Dict[str, Any]]:
+        """Get column store size and memory footprint for monitoring"""
+        return self.column_store.get_stats() if self.column_store else None
+    
+    def get_spatial_index_stats(self) -> Dict[str, Any]:
+        """Get spatial index size and build timings for monitoring"""
+        return self.spatial_index.get_stats()
+    
+    def get_shard_stats(self) -> Optional[Dict[str, Any]]:
+        """Get shard files and pool statistics for monitoring"""
+        return self.shards.get_stats() if self.shards else None
+    
+    def get_analytics_status(self) -> Dict[str, Any]:
+        """Get the aggregate query backend and its statistics for monitoring"""
+        return self.analytics.get_stats() if self.analytics else {'backend': 'sqlite'}
+    
+    def close(self):
+        """Flush pending query logs and close all pooled connections"""
+        if self.ingres_sync:
+            self.ingres_sync.stop_scheduler()
+        self.query_log.close()
+        self.sqlite_pool.close_all()
+        if self.shards:
+            self.shards.close_all()
+        if self.analytics:
+            self.analytics.close()
+        if self.ingres_pool:
+            self.ingres_pool.close_all()
+    
+    def fetch_groundwater_data(self, region: str, year: int, district: str = None,
+                               columnar: str = None):
+        """Fetch groundwater data for a specific region and year
         
-        # Build query based on available parameters
-        if district:
-            query = """
-                SELECT id, region, district, state, year, month, measurement, unit, 
-                       well_type, aquifer_type, notes, source_url, data_quality, recorded_at
-                FROM groundwater_records 
-                WHERE region = ? AND year = ? AND district = ?
-                ORDER BY month, recorded_at DESC
-            """
-            cursor.execute(query, (region, year, district))
-        else:
-            query = """
-                SELECT id, region, district, state, year, month, measurement, unit, 
-                       well_type, aquifer_type, notes, source_url, data_quality, recorded_at
-                FROM groundwater_records 
-                WHERE region = ? AND year = ?
-                ORDER BY month, recorded_at DESC
-            """
-            cursor.execute(query, (region, year))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        By default returns a list of record dicts. With ``columnar='numpy'`` a
+        dict of typed NumPy arrays is returned, and with ``columnar='dataframe'``
+        a pandas DataFrame built from those arrays, skipping per-row dicts.
+        """
+        if columnar is None:
+            return list(self.cache.get_or_load(
+                ('groundwater_data', region, year, district),
+                lambda: [self._row_to_record(row)
+                         for row in self._query_groundwater_rows(region, year, district)]
+            ))
         
-        # Convert to list of dictionaries
-        data = []
-        for row in rows:
-            data.append({
-                'id': row[0],
-                'region': row[1],
-                'district': row[2],
-                'state': row[3],
-                'year': row[4],
-                'month': row[5],
-                'measurement': row[6],
-                'unit': row[7],
-                'well_type': row[8],
-                'aquifer_type': row[9],
-                'notes': row[10],
-                'source_url': row[11],
-                'data_quality': row[12],
-                'recorded_at': str(row[13])
-            })
-        
-        return data
+        if columnar not in self.COLUMNAR_MODES:
+            raise ValueError(f"columnar must be one of {self.COLUMNAR_MODES}")
+        
+        columns = self.cache.get_or_load(
+            ('groundwater_columns', region, year, district),
+            lambda: (self.column_store.fetch_columns(region, year, district) if self.column_store
+                     else self._rows_to_columns(self._query_groundwater_rows(region, year, district)))
+        )
+        if columnar == 'dataframe':
+            # DataFrame construction copies, so callers may mutate it freely
+            return pd.DataFrame(columns, columns=RECORD_FIELDS)
+        return dict(columns)
     
-    def get_regional_metadata(self, region: str) -> Optional[Dict]:
-        """Get regional metadata for a specific region"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    @classmethod
+    def _rows_to_columns(cls, rows) -> Dict[str, np.ndarray]:
+        """Transpose driver rows into read-only typed NumPy columns"""
+        values = list(zip(*rows)) if rows else [()] * len(RECORD_FIELDS)
+        columns = {}
+        for name, column in zip(RECORD_FIELDS, values):
+            dtype = cls.COLUMN_DTYPES.get(name, object)
+            if name == 'recorded_at':
+                column = [str(v) for v in column]
+            # float columns turn NULL into NaN
+            array = np.array(column, dtype=dtype)
+            array.flags.writeable = False
+            columns[name] = array
+        return columns
+    
+    def _query_groundwater_rows(self, region: str, year: int, district: str = None) -> List[tuple]:
+        """Read groundwater rows for a region and year from the database"""
+        if self.column_store:
+            return self.column_store.fetch_rows(region, year, district)
         
-        cursor.execute("""
-            SELECT region, state, district, latitude, longitude, population, 
-                   area_sqkm, climate_zone, aquifer_types
-            FROM regional_metadata 
-            WHERE region = ?
-        """, (region,))
+        def query_rows(conn):
+            cursor = conn.cursor()
+            
+            # Build query based on available parameters
+            if district:
+                query = """
+                    SELECT id, region, district, state, year, month, measurement, unit, 
+                           well_type, aquifer_type, notes, source_url, data_quality, recorded_at
+                    FROM groundwater_records 
+                    WHERE region = ? AND year = ? AND district = ?
+                    ORDER BY month, recorded_at DESC
+                """
+                cursor.execute(query, (region, year, district))
+            else:
+                query = """
+                    SELECT id, region, district, state, year, month, measurement, unit, 
+                           well_type, aquifer_type, notes, source_url, data_quality, recorded_at
+                    FROM groundwater_records 
+                    WHERE region = ? AND year = ?
+                    ORDER BY month, recorded_at DESC
+                """
+                cursor.execute(query, (region, year))
+            
+            return cursor.fetchall()
         
-        row = cursor.fetchone()
-        conn.close()
+        results = self._on_record_stores(query_rows, region=region)
+        return results[0] if results else []
+    
+    @staticmethod
+    def _row_to_record(row) -> Dict:
+        """Convert a groundwater_records row (RECORD_FIELDS order) to a dict"""
+        return {
+            'id': row[0],
+            'region': row[1],
+            'district': row[2],
+            'state': row[3],
+            'year': row[4],
+            'month': row[5],
+            'measurement': row[6],
+            'unit': row[7],
+            'well_type': row[8],
+            'aquifer_type': row[9],
+            'notes': row[10],
+            'source_url': row[11],
+            'data_quality': row[12],
+            'recorded_at': str(row[13])
+        }
+    
+    def iter_query_batches(self, sql: str, params=(), arraysize: int = None, connect=None):
+        """Execute a query and yield its rows in fetchmany() batches
         
-        if row:
+        Works with both sqlite3 and pyodbc cursors. The pooled connection is
+        held until the generator is exhausted or closed, so consume it fully
+        or close() it. ``connect`` overrides where the connection comes from.
+        """
+        arraysize = max(1, int(arraysize or self.stream_arraysize))
+        with (connect or self.get_connection)() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = arraysize
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                yield rows
+    
+    def _iter_record_batches(self, sql: str, params, batch_size: int = None,
+                             region: str = None, state: str = None):
+        """iter_query_batches() over groundwater_records, shard by shard when sharded
+        
+        Shards are read in index order, which is also id order.
+        """
+        if self.shards is None:
+            return self.iter_query_batches(sql, params, batch_size)
+        return chain.from_iterable(
+            self.iter_query_batches(sql, params, batch_size, connect=shard.pool.acquire)
+            for shard in self._shard_targets(region, state)
+        )
+    
+    def _streaming_query(self, region: str = None, year: int = None, district: str = None,
+                         state: str = None, min_year: int = None, max_year: int = None,
+                         table: str = 'groundwater_records', fields: List[str] = None) -> GroundwaterQuery:
+        """Unpaginated query over ``table`` in id order"""
+        return (GroundwaterQuery(table, fields)
+                .equals('region', region)
+                .equals('year', year)
+                .equals('district', district)
+                .equals('state', state, ignore_case=True)
+                .between('year', min_year, max_year)
+                .order_by('id'))
+    
+    def iter_table_rows(self, table: str = 'groundwater_records', columns: List[str] = None,
+                        region: str = None, state: str = None, district: str = None,
+                        year: int = None, min_year: int = None, max_year: int = None,
+                        batch_size: int = None):
+        """Stream raw row batches of a table for export
+        
+        ``columns`` projects the output (default: the usual record or
+        metadata fields). Year filters apply to groundwater_records only.
+        Returns ``(columns, batches)``.
+        """
+        if table not in EXPORT_TABLES:
+            raise InvalidQuery(f"Cannot export '{table}'; choose one of {sorted(EXPORT_TABLES)}")
+        default_columns, allowed = EXPORT_TABLES[table]
+        columns = list(columns or default_columns)
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise InvalidQuery(f"Unknown columns for {table}: {unknown}")
+        if table != 'groundwater_records' and any(v is not None for v in (year, min_year, max_year)):
+            raise InvalidQuery("Year filters apply to groundwater_records only")
+        
+        sql, params = self._streaming_query(region, year, district, state, min_year, max_year,
+                                            table=table, fields=columns).build()
+        if table == 'groundwater_records':
+            return columns, self._iter_record_batches(sql, params, batch_size, region, state)
+        return columns, self.iter_query_batches(sql, params, batch_size)
+    
+    def iter_groundwater_batches(self, region: str = None, year: int = None, district: str = None,
+                                 state: str = None, min_year: int = None, max_year: int = None,
+                                 batch_size: int = None, columnar: str = None):
+        """Stream matching groundwater records in batches of ``batch_size``
+        
+        Each batch is a list of record dicts, or with ``columnar='numpy'`` /
+        ``'dataframe'`` a dict of arrays / DataFrame. Memory stays bounded by
+        one batch however large the result is; nothing is cached.
+        """
+        if columnar is not None and columnar not in self.COLUMNAR_MODES:
+            raise ValueError(f"columnar must be one of {self.COLUMNAR_MODES}")
+        sql, params = self._streaming_query(region, year, district, state, min_year, max_year).build()
+        
+        def batches():
+            for rows in self._iter_record_batches(sql, params, batch_size, region, state):
+                if columnar is None:
+                    yield [self._row_to_record(row) for row in rows]
+                elif columnar == 'dataframe':
+                    yield pd.DataFrame(self._rows_to_columns(rows), columns=RECORD_FIELDS)
+                else:
+                    yield self._rows_to_columns(rows)
+        
+        return batches()
+    
+    def iter_groundwater_records(self, region: str = None, year: int = None, district: str = None,
+                                 state: str = None, min_year: int = None, max_year: int = None,
+                                 batch_size: int = None):
+        """Stream matching groundwater records one dict at a time"""
+        for batch in self.iter_groundwater_batches(region, year, district, state,
+                                                   min_year, max_year, batch_size):
+            yield from batch
+    
+    def get_region_statistics(self, region: str, year: int, district: str = None) -> Optional[Dict]:
+        """Get summary statistics and distributions for a region and year
+        
+        Answered from the rollup tables of the local SQLite database. While
+        IN-GRES serves reads (configured, and INGRES_SERVE_FROM_MIRROR off)
+        the rollups do not cover its rows, so the statistics are computed from
+        the records fetch_groundwater_data returns instead.
+        """
+        if self._ingres_serves_reads():
+            return rollups.statistics_from_records(self.fetch_groundwater_data(region, year, district))
+        
+        result = self.cache.get_or_load(
+            ('region_statistics', region, year, district),
+            lambda: self._query_region_statistics(region, year, district)
+        )
+        return dict(result) if result else None
+    
+    def _query_region_statistics(self, region: str, year: int, district: str = None) -> Optional[Dict]:
+        """Read region statistics from the rollup tables"""
+        results = self._on_record_stores(
+            lambda conn: rollups.region_statistics(conn, region, year, district),
+            region=region, local_only=True
+        )
+        return results[0] if results else None
+    
+    def rebuild_rollups(self):
+        """Recompute all statistics rollups from groundwater_records"""
+        def rebuild(conn):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rollups.rebuild(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        
+        self._on_record_stores(rebuild, local_only=True)
+        self.invalidate_cache()
+    
+    def rebuild_search_index(self):
+        """Re-index notes and source metadata for full-text search"""
+        def rebuild(conn):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                fulltext.rebuild(cursor)
+                fulltext.optimize(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        
+        self._on_record_stores(rebuild, local_only=True)
+        self.invalidate_cache()
+    
+    def search_groundwater_data(self, region: str = None, year: int = None, district: str = None,
+                                state: str = None, well_type: str = None, aquifer_type: str = None,
+                                min_level: float = None, max_level: float = None,
+                                sort: str = 'id', descending: bool = False, limit: int = 100,
+                                cursor: str = None, include_total: bool = False,
+                                text: str = None) -> Dict[str, Any]:
+        """Search groundwater records with all filters evaluated in SQL
+        (or in memory when the column store is enabled)
+        
+        ``text`` runs a full-text match over notes and source metadata; the
+        matching records carry a ``relevance`` score and can be sorted by it.
+        Returns one keyset-paginated page; pass the returned ``next_cursor``
+        back as ``cursor`` to fetch the following page.
+        """
+        query = (GroundwaterQuery()
+                 .matching(text)
+                 .equals('region', region)
+                 .equals('year', year)
+                 .equals('district', district)
+                 .equals('state', state, ignore_case=True)
+                 .equals('well_type', well_type, ignore_case=True)
+                 .equals('aquifer_type', aquifer_type, ignore_case=True)
+                 .between('measurement', min_level, max_level)
+                 .order_by(sort, descending)
+                 .limit(min(int(limit), self.MAX_SEARCH_PAGE_SIZE))
+                 .after(cursor))
+        
+        # The column store has no text index, so full-text searches use SQL
+        if self.column_store and not text and sort != 'relevance':
+            rows, total = self.column_store.search(
+                query, region=region, year=year, district=district, state=state,
+                well_type=well_type, aquifer_type=aquifer_type,
+                min_level=min_level, max_level=max_level, include_total=include_total
+            )
+            page = query.paginate([self._row_to_record(row) for row in rows])
             return {
-                'region': row[0],
-                'state': row[1],
-                'district': row[2],
-                'latitude': row[3],
-                'longitude': row[4],
-                'population': row[5],
-                'area_sqkm': row[6],
-                'climate_zone': row[7],
-                'aquifer_types': row[8]
+                'data': page['rows'],
+                'next_cursor': page['next_cursor'],
+                'has_more': page['has_more'],
+                'total_records': total
             }
         
+        def search_store(conn):
+            db_cursor = conn.cursor()
+            
+            sql, params = query.build()
+            db_cursor.execute(sql, params)
+            rows = []
+            for row in db_cursor.fetchall():
+                record = self._row_to_record(row)
+                if len(row) > len(RECORD_FIELDS):
+                    record['relevance'] = row[len(RECORD_FIELDS)]
+                rows.append(record)
+            
+            count = None
+            if include_total:
+                sql, params = query.build_count()
+                db_cursor.execute(sql, params)
+                count = db_cursor.fetchone()[0]
+            return rows, count
+        
+        results = self._on_record_stores(search_store, region=region, state=state)
+        if len(results) == 1:
+            rows, total = results[0]
+        else:
+            # Each shard returns its own page in keyset order; ids are unique
+            # across shards, so merging them gives the global page
+            def sort_key(record):
+                value = record[query.sort]
+                # NULLs sort first, as in SQLite; the flag keeps them from being
+                # compared with real values, so '' and 0 keep their own type
+                return (value is not None, value if value is not None else 0, record['id'])
+            merged = heapq.merge(*(rows for rows, _ in results), key=sort_key, reverse=query.descending)
+            limit = None if query.page_size is None else query.page_size + 1
+            rows = list(merged)[:limit]
+            total = sum(count for _, count in results) if include_total else None
+        page = query.paginate(rows)
+        
+        return {
+            'data': page['rows'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'total_records': total
+        }
+    
+    def _run_aggregate(self, sql: str, params: List[Any], order_by: tuple) -> List[Dict]:
+        """Run an aggregate query on DuckDB if enabled, else on SQLite
+        
+        Sharded, each group (a region or state) lives in one shard, so the
+        per-shard results are concatenated and re-sorted by ``order_by``.
+        """
+        if self.analytics:
+            return self.analytics.query(sql, params)
+        
+        def run(conn):
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        
+        results = self._on_record_stores(run, local_only=True)
+        if len(results) == 1:
+            return results[0]
+        return sorted(chain.from_iterable(results), key=lambda row: tuple(row[k] for k in order_by))
+    
+    def get_regional_comparison(self, year: int = None, state: str = None) -> List[Dict]:
+        """Average, min and max measurement per region"""
+        return list(self.cache.get_or_load(
+            ('regional_comparison', year, state),
+            lambda: self._run_aggregate(*analytics.regional_comparison_sql(year, state),
+                                        order_by=('region', 'state'))
+        ))
+    
+    def get_yearly_trends(self, region: str = None, state: str = None) -> List[Dict]:
+        """Average, min and max measurement per region and year"""
+        return list(self.cache.get_or_load(
+            ('yearly_trends', region, state),
+            lambda: self._run_aggregate(*analytics.yearly_trends_sql(region, state),
+                                        order_by=('region', 'year'))
+        ))
+    
+    def get_state_rollups(self, year: int = None) -> List[Dict]:
+        """Record counts and measurement summary per state and year"""
+        return list(self.cache.get_or_load(
+            ('state_rollups', year),
+            lambda: analytics.finish_state_rollup(
+                self._run_aggregate(*analytics.state_rollup_sql(year), order_by=('state', 'year')))
+        ))
+    
+    def get_regional_metadata(self, region: str) -> Optional[Dict]:
+        """Get regional metadata for a specific region"""
+        metadata = self.cache.get_or_load(
+            ('regional_metadata', region),
+            lambda: self._query_regional_metadata(region)
+        )
+        return dict(metadata) if metadata else None
+    
+    def _query_regional_metadata(self, region: str) -> Optional[Dict]:
+        """Read regional metadata for a region from the database"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT region, state, district, latitude, longitude, population, 
+                       area_sqkm, climate_zone, aquifer_types
+                FROM regional_metadata 
+                WHERE region = ?
+            """, (region,))
+            
+            row = cursor.fetchone()
+        
+        if row:
+            return self._row_to_metadata(row)
+        
         return None
     
-    def search_ingres_platform(self, query: str) -> Dict:
-        """Search IN-GRES platform for additional data"""
+    def find_nearest_regions(self, latitude: float, longitude: float, limit: int = 5) -> List[Dict]:
+        """Regions closest to a point, nearest first, with distance_km"""
+        return self.spatial_index.nearest(latitude, longitude, limit)
+    
+    def find_regions_within(self, latitude: float, longitude: float, radius_km: float) -> List[Dict]:
+        """Regions within ``radius_km`` of a point, nearest first"""
+        return self.spatial_index.within_radius(latitude, longitude, radius_km)
+    
+    def find_regions_in_bbox(self, min_latitude: float, min_longitude: float,
+                             max_latitude: float, max_longitude: float) -> List[Dict]:
+        """Regions inside a latitude/longitude bounding box"""
+        return self.spatial_index.within_bbox(min_latitude, min_longitude, max_latitude, max_longitude)
+    
+    def resolve_nearest_region(self, latitude: float, longitude: float) -> Optional[Dict]:
+        """Nearest region to a point that has groundwater records"""
+        monitored = set(self.get_available_regions())
+        limit = 8
+        while True:
+            candidates = self.find_nearest_regions(latitude, longitude, limit)
+            for candidate in candidates:
+                if candidate['region'] in monitored:
+                    return candidate
+            if len(candidates) < limit:
+                return None
+            limit *= 4
+    
+    @staticmethod
+    def _row_to_metadata(row) -> Dict:
+        """Convert a regional_metadata row to a dict"""
+        return {
+            'region': row[0],
+            'state': row[1],
+            'district': row[2],
+            'latitude': row[3],
+            'longitude': row[4],
+            'population': row[5],
+            'area_sqkm': row[6],
+            'climate_zone': row[7],
+            'aquifer_types': row[8]
+        }
+    
+    def get_regional_metadata_batch(self, regions: List[str]) -> Dict[str, Optional[Dict]]:
+        """Get regional metadata for many regions with one IN (...) query per batch"""
+        result = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            regions = list(dict.fromkeys(regions))
+            for start in range(0, len(regions), self.BATCH_PARAM_LIMIT):
+                batch = regions[start:start + self.BATCH_PARAM_LIMIT]
+                placeholders = ', '.join('?' * len(batch))
+                cursor.execute(f"""
+                    SELECT region, state, district, latitude, longitude, population, 
+                           area_sqkm, climate_zone, aquifer_types
+                    FROM regional_metadata 
+                    WHERE region IN ({placeholders})
+                """, batch)
+                for row in cursor.fetchall():
+                    result[row[0]] = self._row_to_metadata(row)
+        
+        return {region: result.get(region) for region in regions}
+    
+    def get_available_years_batch(self, regions: List[str] = None) -> Dict[str, List[int]]:
+        """Get available years for many regions (or all) with one grouped query"""
+        if regions is not None:
+            regions = list(dict.fromkeys(regions))
+        
+        def query_years(conn):
+            cursor = conn.cursor()
+            rows = []
+            if regions is None:
+                cursor.execute("""
+                    SELECT region, year FROM groundwater_records
+                    GROUP BY region, year ORDER BY region, year DESC
+                """)
+                rows = cursor.fetchall()
+            else:
+                for start in range(0, len(regions), self.BATCH_PARAM_LIMIT):
+                    batch = regions[start:start + self.BATCH_PARAM_LIMIT]
+                    placeholders = ', '.join('?' * len(batch))
+                    cursor.execute(f"""
+                        SELECT region, year FROM groundwater_records
+                        WHERE region IN ({placeholders})
+                        GROUP BY region, year ORDER BY region, year DESC
+                    """, batch)
+                    rows.extend(cursor.fetchall())
+            return rows
+        
+        # A region lives in exactly one shard, so shard results never overlap
+        rows = chain.from_iterable(self._on_record_stores(query_years))
+        years = {region: [] for region in regions} if regions is not None else {}
+        for region, year in rows:
+            years.setdefault(region, []).append(year)
+        return years
+    
+    def get_regions_overview(self) -> List[Dict]:
+        """Get every region with its metadata and available years in one round trip"""
+        return [dict(entry) for entry in
+                self.cache.get_or_load(('regions_overview',), self._query_regions_overview)]
+    
+    def _query_regions_overview(self) -> List[Dict]:
+        """Join distinct region/year pairs with regional metadata in a single query"""
+        if self.shards is not None:
+            # Records and metadata live in different files when sharded
+            years = self.get_available_years_batch()
+            regions = sorted(years)
+            metadata = self.get_regional_metadata_batch(regions)
+            return [{'region': region, 'metadata': metadata[region], 'available_years': years[region]}
+                    for region in regions]
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT g.region, g.year,
+                       m.region, m.state, m.district, m.latitude, m.longitude, m.population,
+                       m.area_sqkm, m.climate_zone, m.aquifer_types
+                FROM (SELECT region, year FROM groundwater_records GROUP BY region, year) g
+                LEFT JOIN regional_metadata m ON m.region = g.region
+                ORDER BY g.region, g.year DESC
+            """)
+            rows = cursor.fetchall()
+        
+        overview = []
+        for row in rows:
+            if not overview or overview[-1]['region'] != row[0]:
+                overview.append({
+                    'region': row[0],
+                    'metadata': self._row_to_metadata(row[2:]) if row[2] is not None else None,
+                    'available_years': []
+                })
+            overview[-1]['available_years'].append(row[1])
+        return overview
+    
+    def search_ingres_platform(self, query: str, limit: int = 20) -> Dict:
+        """Search IN-GRES platform for additional data
+        
+        Until the IN-GRES search API is wired up, results come from the local
+        full-text index, best matches first.
+        """
         try:
             # This would be the actual API call to IN-GRES platform
             # For now, we'll simulate the response
+            matches = self.search_groundwater_data(text=query, sort='relevance',
+                                                   descending=True, limit=limit)
             response = {
                 'status': 'success',
-                'data': [],
+                'data': matches['data'],
+                'source': 'local full-text index',
                 'message': 'IN-GRES platform integration simulated'
             }
             
@@ -279,40 +1153,74 @@ class GroundwaterService:
     
     def log_query(self, user_query: str, language: str, response: str, 
                   region: str = None, year: int = None, response_time: float = None):
-        """Log user query for analytics and improvement"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Log user query for analytics and improvement
         
-        cursor.execute("""
-            INSERT INTO query_history 
-            (user_query, language, response, region, year, response_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_query, language, response, region, year, response_time))
-        
-        conn.commit()
-        conn.close()
+        The row is queued and written in a later batch by the background writer.
+        """
+        self.query_log.log((user_query, language, response, region, year, response_time))
+    
+    def get_query_log_stats(self) -> Dict[str, Any]:
+        """Get query log writer statistics for monitoring"""
+        return self.query_log.get_stats()
     
     def get_available_regions(self) -> List[str]:
         """Get list of available regions in the database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return list(self.cache.get_or_load(('available_regions',), self._query_available_regions))
+    
+    def _query_available_regions(self) -> List[str]:
+        """Read the distinct regions from the database"""
+        if self.column_store:
+            return self.column_store.available_regions()
         
-        cursor.execute("SELECT DISTINCT region FROM groundwater_records ORDER BY region")
-        regions = [row[0] for row in cursor.fetchall()]
+        def query_regions(conn):
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT DISTINCT region FROM groundwater_records ORDER BY region")
+            return [row[0] for row in cursor.fetchall()]
         
-        conn.close()
-        return regions
+        return sorted(set(chain.from_iterable(self._on_record_stores(query_regions))))
     
     def get_available_years(self, region: str = None) -> List[int]:
         """Get list of available years for a region or all regions"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return list(self.cache.get_or_load(
+            ('available_years', region),
+            lambda: self._query_available_years(region)
+        ))
+    
+    def _query_available_years(self, region: str = None) -> List[int]:
+        """Read the distinct years for a region (or all regions) from the database"""
+        if self.column_store:
+            return self.column_store.available_years(region or None)
         
-        if region:
-            cursor.execute("SELECT DISTINCT year FROM groundwater_records WHERE region = ? ORDER BY year DESC", (region,))
-        else:
-            cursor.execute("SELECT DISTINCT year FROM groundwater_records ORDER BY year DESC")
+        def query_years(conn):
+            cursor = conn.cursor()
+            
+            if region:
+                cursor.execute("SELECT DISTINCT year FROM groundwater_records WHERE region = ? ORDER BY year DESC", (region,))
+            else:
+                cursor.execute("SELECT DISTINCT year FROM groundwater_records ORDER BY year DESC")
+            
+            return [row[0] for row in cursor.fetchall()]
         
-        years = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return years
+        results = self._on_record_stores(query_years, region=region or None)
+        return sorted(set(chain.from_iterable(results)), reverse=True)
+
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_groundwater_service() -> GroundwaterService:
+    """Return the process-wide service shared by the route blueprints
+    
+    One instance means one cache, one set of pools and one sync scheduler,
+    so a write or sync invalidates what every route reads.
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = GroundwaterService()
+            interval = setting('INGRES_SYNC_INTERVAL', 0.0, float)
+            if interval > 0:
+                _shared_service.start_ingres_sync(interval)
+        return _shared_service
@@ -0,0 +1,227 @@
+"""
+JalDoot Schema Migrations
+Versioned, in-place upgrades for the local SQLite groundwater database
+"""
+
+from typing import Callable, List, Optional, Sequence
+
+from jaldoot.app.core import fulltext, rollups
+
+# Base table shared by the main database and every state shard
+GROUNDWATER_RECORDS_TABLE = """
+    CREATE TABLE IF NOT EXISTS groundwater_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        region TEXT NOT NULL,
+        district TEXT,
+        state TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER,
+        measurement REAL,
+        unit TEXT DEFAULT 'm',
+        well_type TEXT,
+        aquifer_type TEXT,
+        notes TEXT,
+        source_url TEXT,
+        data_quality TEXT,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# One reading per (region, district, year, month, well type, source); NULLs
+# are folded to '' / 0 so they compare equal in the unique index
+NATURAL_KEY_COLUMNS = ('region', 'district', 'year', 'month', 'well_type', 'source_url')
+NATURAL_KEY = ("region, COALESCE(district, ''), year, COALESCE(month, 0), "
+               "COALESCE(well_type, ''), COALESCE(source_url, '')")
+
+
+def upsert_records_sql(columns: Sequence[str], source_sql: str = None,
+                       update_columns: Sequence[str] = None) -> str:
+    """INSERT into groundwater_records that updates the existing reading
+    with the same natural key instead of adding a duplicate
+
+    ``source_sql`` defaults to a VALUES row of ``?`` placeholders; an
+    INSERT ... SELECT must include a WHERE clause. ``update_columns``
+    defaults to every inserted column outside the key except id and
+    recorded_at. Rows whose values are unchanged are left untouched, so
+    re-imports do not bump updated_at or fire the update triggers.
+    """
+    if source_sql is None:
+        source_sql = f"VALUES ({', '.join('?' * len(columns))})"
+    if update_columns is None:
+        update_columns = [c for c in columns
+                          if c not in NATURAL_KEY_COLUMNS and c not in ('id', 'recorded_at', 'updated_at')]
+    assignments = [f"{c} = excluded.{c}" for c in update_columns] + ["updated_at = excluded.updated_at"]
+    changed = ' OR '.join(f"{c} IS NOT excluded.{c}" for c in update_columns) or '0'
+    return (f"INSERT INTO groundwater_records ({', '.join(columns)}) {source_sql} "
+            f"ON CONFLICT ({NATURAL_KEY}) DO UPDATE SET {', '.join(assignments)} "
+            f"WHERE {changed}")
+
+
+def dedupe_records(cursor, dry_run: bool = False) -> int:
+    """Delete duplicate readings, keeping the latest row of each natural key
+
+    "Latest" is the most recently updated (then recorded) row, with the
+    highest id breaking ties. Returns the number of duplicates found.
+    """
+    duplicates = f"""
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY {NATURAL_KEY}
+                ORDER BY COALESCE(updated_at, recorded_at) DESC, id DESC
+            ) AS copy
+            FROM groundwater_records
+        ) WHERE copy > 1
+    """
+    if dry_run:
+        cursor.execute(f"SELECT COUNT(*) FROM ({duplicates})")
+        return cursor.fetchone()[0]
+    cursor.execute(f"DELETE FROM groundwater_records WHERE id IN ({duplicates})")
+    return cursor.rowcount
+
+
+def _add_natural_key(cursor):
+    removed = dedupe_records(cursor)
+    if removed:
+        print(f"Removed {removed} duplicate groundwater readings")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_groundwater_natural_key "
+                   f"ON groundwater_records ({NATURAL_KEY})")
+
+
+class Migration:
+    """A single schema upgrade step.
+
+    A migration is either a list of SQL statements or a callable taking the
+    cursor, for steps that need to inspect or rewrite data.
+    """
+
+    def __init__(self, version: int, description: str,
+                 statements: Sequence[str] = (),
+                 apply: Optional[Callable] = None):
+        self.version = version
+        self.description = description
+        self.statements = list(statements)
+        self.apply = apply
+
+    def run(self, cursor):
+        for statement in self.statements:
+            cursor.execute(statement)
+        if self.apply is not None:
+            self.apply(cursor)
+
+
+# Ordered list of migrations; never edit an applied entry, append a new one
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'Indexes for region/year lookups and distinct scans', [
+        # fetch_groundwater_data: WHERE region, year ORDER BY month, recorded_at;
+        # also covers DISTINCT region and DISTINCT year WHERE region = ?
+        """CREATE INDEX IF NOT EXISTS idx_groundwater_region_year_month
+           ON groundwater_records (region, year, month, recorded_at DESC)""",
+        # fetch_groundwater_data with a district filter
+        """CREATE INDEX IF NOT EXISTS idx_groundwater_region_year_district
+           ON groundwater_records (region, year, district, month, recorded_at DESC)""",
+        # get_available_years() across all regions
+        """CREATE INDEX IF NOT EXISTS idx_groundwater_year
+           ON groundwater_records (year)""",
+    ]),
+    Migration(2, 'Collect planner statistics for the new indexes', [
+        "ANALYZE",
+    ]),
+    Migration(3, 'Checkpoints for resumable bulk loads', [
+        """CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            source TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            chunks_committed INTEGER NOT NULL DEFAULT 0,
+            rows_committed INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    Migration(4, 'Index for measurement range filters and sorts within a region/year', [
+        """CREATE INDEX IF NOT EXISTS idx_groundwater_region_year_measurement
+           ON groundwater_records (region, year, measurement)""",
+    ]),
+    Migration(5, 'Incrementally maintained statistics rollups', apply=rollups.install),
+    Migration(6, 'Watermarks for incremental IN-GRES sync', [
+        """CREATE TABLE IF NOT EXISTS sync_watermarks (
+            source TEXT PRIMARY KEY,
+            watermark TEXT,
+            last_id INTEGER,
+            rows_synced INTEGER NOT NULL DEFAULT 0,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    Migration(7, 'Catalog of per-state shards', [
+        """CREATE TABLE IF NOT EXISTS shards (
+            state TEXT PRIMARY KEY COLLATE NOCASE,
+            shard_index INTEGER UNIQUE NOT NULL,
+            file_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    Migration(8, 'Full-text index over notes and source metadata', apply=fulltext.install),
+    Migration(9, 'Deduplicate readings and enforce their natural key', apply=_add_natural_key),
+    Migration(10, 'Per-value measurement counts for median and mode', apply=rollups.install_values),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_schema_version(conn) -> int:
+    """Return the highest applied migration version (0 for a fresh database)"""
+    cursor = conn.cursor()
+    _ensure_version_table(cursor)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    return cursor.fetchone()[0]
+
+
+def run_migrations(conn, migrations: Sequence[Migration] = None) -> List[int]:
+    """Apply pending migrations in order, each in its own transaction.
+
+    Safe to call from several processes at once: the version check is
+    repeated under a write lock, so a step is only ever applied once.
+    Returns the versions applied by this call.
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+    migrations = sorted(migrations, key=lambda m: m.version)
+    applied = []
+
+    cursor = conn.cursor()
+    _ensure_version_table(cursor)
+    conn.commit()
+
+    for migration in migrations:
+        if migration.version <= get_schema_version(conn):
+            continue
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT 1 FROM schema_migrations WHERE version = ?",
+                           (migration.version,))
+            if cursor.fetchone():
+                conn.rollback()
+                continue
+
+            migration.run(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (?, ?)",
+                (migration.version, migration.description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(migration.version)
+        print(f"Applied schema migration {migration.version}: {migration.description}")
+
+    return applied
@@ -0,0 +1,213 @@
+"""
+JalDoot Query Builder
+Composes filtered, keyset-paginated SELECTs over groundwater_records
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from jaldoot.app.core import fulltext
+
+RECORD_FIELDS = [
+    'id', 'region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+    'well_type', 'aquifer_type', 'notes', 'source_url', 'data_quality', 'recorded_at'
+]
+
+METADATA_FIELDS = [
+    'region', 'state', 'district', 'latitude', 'longitude', 'population',
+    'area_sqkm', 'climate_zone', 'aquifer_types'
+]
+
+# Exportable tables: (default projection, every column a client may select)
+EXPORT_TABLES = {
+    'groundwater_records': (RECORD_FIELDS, RECORD_FIELDS + ['updated_at']),
+    'regional_metadata': (METADATA_FIELDS, ['id'] + METADATA_FIELDS + ['created_at']),
+}
+
+# Columns a client may sort by; id is always appended as the tiebreaker.
+# relevance exists only for full-text searches (see matching())
+SORTABLE_FIELDS = {'id', 'year', 'month', 'measurement', 'district', 'state', 'recorded_at', 'relevance'}
+
+
+class InvalidQuery(ValueError):
+    """Raised for unknown sort fields, malformed cursors or bad limits"""
+
+
+def encode_cursor(sort: str, descending: bool, value: Any, last_id: int) -> str:
+    """Encode the position after a row as an opaque, URL-safe token"""
+    payload = json.dumps([sort, descending, value, last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[str, bool, Any, int]:
+    """Decode a token produced by encode_cursor()"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort, descending, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort, bool(descending), value, int(last_id)
+    except Exception:
+        raise InvalidQuery("Malformed pagination cursor")
+
+
+class GroundwaterQuery:
+    """Builds a parameterized SELECT with pushed-down predicates.
+
+    Pagination uses keyset (seek) semantics on ``(sort, id)`` so each page is
+    an index range read instead of an ever-growing OFFSET scan.
+    """
+
+    def __init__(self, table: str = 'groundwater_records', fields: List[str] = None):
+        self.table = table
+        self.fields = fields or RECORD_FIELDS
+        self._where: List[str] = []
+        self._params: List[Any] = []
+        self.sort = 'id'
+        self.descending = False
+        self.page_size: Optional[int] = None
+        self._cursor: Optional[Tuple[Any, int]] = None
+        self._match: Optional[str] = None
+
+    def matching(self, text: Optional[str]) -> 'GroundwaterQuery':
+        """Keep rows whose indexed text matches every term of ``text``
+
+        Matching rows gain a ``relevance`` column (bm25, larger is better)
+        that can be selected and sorted on. Skipped when text is empty.
+        """
+        if text is None or not str(text).strip():
+            return self
+        expression = fulltext.match_expression(str(text))
+        if expression is None:
+            raise InvalidQuery("Search text has no searchable terms")
+        self._match = expression
+        return self
+
+    @property
+    def output_fields(self) -> List[str]:
+        """Selected columns, including relevance for full-text searches"""
+        return self.fields + ['relevance'] if self._match else list(self.fields)
+
+    def _source(self) -> Tuple[str, List[Any]]:
+        """FROM target; full-text searches read the FTS matches joined to the table"""
+        if self._match is None:
+            return self.table, []
+        # CROSS JOIN keeps the FTS matches as the outer loop, so the planner
+        # never probes the index once per row of a region/year range
+        return (f"(SELECT {self.table}.*, m.relevance FROM ({fulltext.matching_ids_sql()}) m "
+                f"CROSS JOIN {self.table} ON {self.table}.id = m.id) AS {self.table}"), [self._match]
+
+    def equals(self, column: str, value: Any, ignore_case: bool = False) -> 'GroundwaterQuery':
+        """Add ``column = value``; skipped when value is None or empty"""
+        if value is None or value == '':
+            return self
+        if ignore_case:
+            self._where.append(f"LOWER({column}) = LOWER(?)")
+        else:
+            self._where.append(f"{column} = ?")
+        self._params.append(value)
+        return self
+
+    def between(self, column: str, low: Any = None, high: Any = None) -> 'GroundwaterQuery':
+        """Add inclusive lower and/or upper bounds on a column"""
+        if low is not None:
+            self._where.append(f"{column} >= ?")
+            self._params.append(low)
+        if high is not None:
+            self._where.append(f"{column} <= ?")
+            self._params.append(high)
+        return self
+
+    def where(self, clause: str, *params) -> 'GroundwaterQuery':
+        """Add a raw predicate with its parameters"""
+        self._where.append(clause)
+        self._params.extend(params)
+        return self
+
+    def order_by(self, sort: str = 'id', descending: bool = False) -> 'GroundwaterQuery':
+        if sort not in SORTABLE_FIELDS:
+            raise InvalidQuery(f"Cannot sort by '{sort}'; choose one of {sorted(SORTABLE_FIELDS)}")
+        self.sort = sort
+        self.descending = descending
+        return self
+
+    def limit(self, page_size: int) -> 'GroundwaterQuery':
+        if page_size is None or int(page_size) < 1:
+            raise InvalidQuery("limit must be a positive integer")
+        self.page_size = int(page_size)
+        return self
+
+    def after(self, token: Optional[str]) -> 'GroundwaterQuery':
+        """Resume after the row encoded in a cursor from a previous page"""
+        if not token:
+            return self
+        sort, descending, value, last_id = decode_cursor(token)
+        if sort != self.sort or descending != self.descending:
+            raise InvalidQuery("Cursor was issued for a different sort order")
+        self._cursor = (value, last_id)
+        return self
+
+    @property
+    def position(self) -> Optional[Tuple[Any, int]]:
+        """(sort value, id) of the row the cursor resumes after, if any"""
+        return self._cursor
+    
+    def _seek_predicate(self) -> Tuple[Optional[str], List[Any]]:
+        if self._cursor is None:
+            return None, []
+        value, last_id = self._cursor
+        col = self.sort
+        if col == 'id':
+            return ("id < ?", [last_id]) if self.descending else ("id > ?", [last_id])
+
+        # SQLite sorts NULLs first ascending and last descending
+        if self.descending:
+            if value is None:
+                return f"({col} IS NULL AND id < ?)", [last_id]
+            return (f"({col} < ? OR ({col} = ? AND id < ?) OR {col} IS NULL)",
+                    [value, value, last_id])
+        if value is None:
+            return f"(({col} IS NULL AND id > ?) OR {col} IS NOT NULL)", [last_id]
+        return f"({col} > ? OR ({col} = ? AND id > ?))", [value, value, last_id]
+
+    def _where_sql(self, include_seek: bool) -> Tuple[str, List[Any]]:
+        clauses = list(self._where)
+        params = list(self._params)
+        if include_seek:
+            seek, seek_params = self._seek_predicate()
+            if seek:
+                clauses.append(seek)
+                params.extend(seek_params)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def build(self) -> Tuple[str, List[Any]]:
+        """Return the page SELECT and its parameters"""
+        if self.sort == 'relevance' and self._match is None:
+            raise InvalidQuery("Sorting by relevance requires search text")
+        source, params = self._source()
+        where_sql, where_params = self._where_sql(include_seek=True)
+        params.extend(where_params)
+        direction = 'DESC' if self.descending else 'ASC'
+        order = f"id {direction}" if self.sort == 'id' else f"{self.sort} {direction}, id {direction}"
+        sql = f"SELECT {', '.join(self.output_fields)} FROM {source}{where_sql} ORDER BY {order}"
+        if self.page_size is not None:
+            # Fetch one extra row to learn whether another page exists
+            sql += " LIMIT ?"
+            params.append(self.page_size + 1)
+        return sql, params
+
+    def build_count(self) -> Tuple[str, List[Any]]:
+        """Return a COUNT(*) over the same filters, ignoring pagination"""
+        source, params = self._source()
+        where_sql, where_params = self._where_sql(include_seek=False)
+        return f"SELECT COUNT(*) FROM {source}{where_sql}", params + where_params
+
+    def paginate(self, rows: List[Dict]) -> Dict[str, Any]:
+        """Trim the look-ahead row and compute the cursor for the next page"""
+        has_more = self.page_size is not None and len(rows) > self.page_size
+        if has_more:
+            rows = rows[:self.page_size]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(self.sort, self.descending, last[self.sort], last['id'])
+        return {'rows': rows, 'has_more': has_more, 'next_cursor': next_cursor}
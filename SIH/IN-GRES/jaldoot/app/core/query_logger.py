@@ -0,0 +1,158 @@
+"""
+JalDoot Query Log Writer
+Write-behind, batched persistence of query_history entries
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+_STOP = object()
+
+
+class QueryLogWriter:
+    """Buffers query-log rows in a bounded queue and writes them in batches.
+
+    Rows are flushed with a single ``executemany`` transaction whenever
+    ``batch_size`` rows are buffered or ``flush_interval`` seconds have passed
+    since the first buffered row. When the queue is full new rows are dropped
+    and counted rather than blocking the request thread.
+    """
+
+    INSERT_SQL = """
+        INSERT INTO query_history
+        (user_query, language, response, region, year, response_time)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, connection_factory: Callable[[], Any], max_queue: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 1.0):
+        self.connection_factory = connection_factory
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+        }
+
+    def log(self, row: Tuple):
+        """Queue one query_history row without touching the database"""
+        if self._closed:
+            self._count('dropped')
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            self._count('enqueued')
+        except queue.Full:
+            self._count('dropped')
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='query-log-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self):
+        """Write whatever is still buffered; used on shutdown"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                continue
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with self.connection_factory() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(self.INSERT_SQL, batch)
+                conn.commit()
+            with self._stats_lock:
+                self._stats['written'] += len(batch)
+                self._stats['batches'] += 1
+        except Exception as e:
+            print(f"Query log flush failed, discarding {len(batch)} entries: {e}")
+            with self._stats_lock:
+                self._stats['failed'] += len(batch)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting rows and flush everything buffered so far"""
+        if self._closed:
+            return
+        self._closed = True
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            # The writer is draining, so room for the sentinel frees up quickly
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return throughput, drop and backlog counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+        })
+        return stats
@@ -0,0 +1,205 @@
+"""
+JalDoot Render Engine
+Renders charts in a pool of worker processes
+
+pyplot keeps global state and rasterizing holds the GIL, so drawing from
+Flask request threads is both unsafe and serialized. The engine hands each
+chart to a worker process that has already imported matplotlib/seaborn and
+applied the style. Every job has a timeout and the number of queued jobs is
+bounded: when either is hit the caller gets None and shows a fallback image
+instead of waiting. Workers stuck on timed-out jobs are replaced by
+recycling the pool once they could otherwise block every slot.
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from jaldoot.app.core.runtime_config import setting
+
+# Recycle each worker after this many charts to bound matplotlib memory growth
+MAX_TASKS_PER_WORKER = 500
+
+_worker_service = None
+
+
+def _warm_worker():
+    """Pool initializer: import the plotting stack and draw once"""
+    global _worker_service
+    from jaldoot.app.core.chart_cache import ChartCache
+    from jaldoot.app.core.visualization_service import VisualizationService
+
+    _worker_service = VisualizationService(cache=ChartCache(enabled=False))
+    # A throwaway render loads fonts and the Agg canvas before the first job
+    _worker_service.render_chart('no_data', {'message': ''}, {'format': 'png', 'dpi': 10})
+
+
+def _render_job(chart_type: str, inputs: Dict[str, Any], options: Dict[str, Any]) -> Tuple[bytes, float]:
+    return _worker_service.render_chart(chart_type, inputs, options)
+
+
+class RenderJob:
+    """A submitted chart; wait() returns (bytes, encode seconds) or None"""
+
+    def __init__(self, engine: 'RenderEngine', chart_type: str, result, generation: int, job_id: int):
+        self.engine = engine
+        self.chart_type = chart_type
+        self.result = result
+        self.generation = generation
+        self.job_id = job_id
+        self.started = time.perf_counter()
+
+    def wait(self, timeout: float = None) -> Optional[Tuple[bytes, float]]:
+        """Block up to ``timeout`` (default: the engine's) for the rendered chart"""
+        timeout = self.engine.timeout if timeout is None else timeout
+        try:
+            rendered = self.result.get(timeout)
+        except multiprocessing.TimeoutError:
+            print(f"Chart render timed out after {timeout:.1f}s: {self.chart_type}")
+            self.engine._timed_out(self.generation, self.job_id)
+            return None
+        except Exception as e:
+            print(f"Chart render failed: {self.chart_type}: {e}")
+            return None
+
+        self.engine._record_time(time.perf_counter() - self.started)
+        return rendered
+
+
+class RenderEngine:
+    """Process pool with per-job timeouts and a bounded queue"""
+
+    def __init__(self, workers: int = 2, timeout: float = 20.0, max_pending: int = None,
+                 start_method: str = 'spawn'):
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.max_pending = max(1, int(max_pending or self.workers * 4))
+        self.start_method = start_method
+
+        self._pool = None
+        self._generation = 0
+        self._pending = 0
+        self._stuck = set()
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {
+            'jobs': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'restarts': 0,
+            'render_seconds': 0.0,
+        }
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._pool = context.Pool(self.workers, initializer=_warm_worker,
+                                      maxtasksperchild=MAX_TASKS_PER_WORKER)
+        return self._pool
+
+    def _finish(self, generation: int, job_id: int, failed: bool):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending -= 1
+            self._stuck.discard(job_id)
+            self._stats['failed' if failed else 'completed'] += 1
+
+    def submit(self, chart_type: str, inputs: Dict[str, Any],
+               options: Dict[str, Any]) -> Optional[RenderJob]:
+        """Queue a chart without waiting; None when the queue is full"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                return None
+            pool = self._ensure_pool()
+            generation = self._generation
+            job_id = next(self._job_ids)
+            self._pending += 1
+            self._stats['jobs'] += 1
+
+        try:
+            result = pool.apply_async(
+                _render_job, (chart_type, inputs, options),
+                callback=lambda _: self._finish(generation, job_id, False),
+                error_callback=lambda _: self._finish(generation, job_id, True)
+            )
+        except ValueError:
+            # Pool was terminated by a concurrent recycle
+            self._finish(generation, job_id, True)
+            return None
+        return RenderJob(self, chart_type, result, generation, job_id)
+
+    def render(self, chart_type: str, inputs: Dict[str, Any],
+               options: Dict[str, Any]) -> Optional[Tuple[bytes, float]]:
+        """Encoded chart and its encode seconds, or None if it failed, timed out or the queue is full"""
+        job = self.submit(chart_type, inputs, options)
+        return job.wait() if job else None
+
+    def _record_time(self, seconds: float):
+        with self._lock:
+            self._stats['render_seconds'] += seconds
+
+    def _timed_out(self, generation: int, job_id: int):
+        with self._lock:
+            self._stats['timeouts'] += 1
+            if generation != self._generation:
+                return
+            self._stuck.add(job_id)
+            if len(self._stuck) < self.workers:
+                return
+            # Every worker may be busy with a job nobody waits for: start over
+            pool, self._pool = self._pool, None
+            self._generation += 1
+            self._pending = 0
+            self._stuck.clear()
+            self._stats['restarts'] += 1
+        pool.terminate()
+
+    def close(self):
+        """Terminate the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._generation += 1
+            self._pending = 0
+            self._stuck.clear()
+        if pool is not None:
+            pool.terminate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'workers': self.workers,
+                'running': self._pool is not None,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'timeout': self.timeout,
+            })
+        return stats
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_render_engine() -> Optional[RenderEngine]:
+    """Return the process-wide render engine, or None when CHART_RENDER_WORKERS=0"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            workers = setting('CHART_RENDER_WORKERS', 2, int)
+            if workers <= 0:
+                return None
+            _shared_engine = RenderEngine(
+                workers=workers,
+                timeout=setting('CHART_RENDER_TIMEOUT', 20.0, float),
+                max_pending=setting('CHART_RENDER_QUEUE_DEPTH', 0, int) or None
+            )
+            atexit.register(_shared_engine.close)
+        return _shared_engine
@@ -0,0 +1,391 @@
+"""
+JalDoot Aggregate Rollups
+Incrementally maintained region/year/month statistics for groundwater_records
+
+Rollups are keyed by (region, year, state, district, month) and hold count,
+sum, sum of squares, min and max of the measurement plus per-category record
+counts. A second table keeps the number of readings per distinct measurement
+in each group, from which the median and mode are read. Triggers keep them
+current on every insert, update and delete, so the statistics endpoints
+answer in O(groups + distinct values) rather than O(rows). NULL district and
+month are stored as '' and 0 so they take part in the primary key, and NULL
+categories are counted as 'Unknown' (a None key could not be serialized
+next to string keys in a sorted JSON response).
+"""
+
+import math
+import statistics
+from typing import Any, Dict, Optional
+
+CATEGORY_DIMENSIONS = ('well_type', 'aquifer_type', 'data_quality')
+KEY_COLUMNS = 'region, year, state, district, month'
+
+CREATE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS groundwater_rollups (
+        region TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        district TEXT NOT NULL DEFAULT '',
+        month INTEGER NOT NULL DEFAULT 0,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        measurement_count INTEGER NOT NULL DEFAULT 0,
+        measurement_sum REAL NOT NULL DEFAULT 0,
+        measurement_sumsq REAL NOT NULL DEFAULT 0,
+        measurement_min REAL,
+        measurement_max REAL,
+        PRIMARY KEY (region, year, state, district, month)
+    )""",
+    """CREATE TABLE IF NOT EXISTS groundwater_rollup_categories (
+        region TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        district TEXT NOT NULL DEFAULT '',
+        month INTEGER NOT NULL DEFAULT 0,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (region, year, state, district, month, dimension, value)
+    )""",
+]
+
+
+# Readings per distinct measurement; latest_recorded_at preserves the
+# order fetch_groundwater_data returns rows in, which breaks mode ties
+CREATE_VALUES_TABLE = """CREATE TABLE IF NOT EXISTS groundwater_rollup_values (
+        region TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        district TEXT NOT NULL DEFAULT '',
+        month INTEGER NOT NULL DEFAULT 0,
+        measurement REAL NOT NULL,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        latest_recorded_at TIMESTAMP,
+        PRIMARY KEY (region, year, state, district, month, measurement)
+    )"""
+
+
+def _key_values(ref: str) -> str:
+    return (f"{ref}.region, {ref}.year, {ref}.state, "
+            f"COALESCE({ref}.district, ''), COALESCE({ref}.month, 0)")
+
+
+def _key_match(ref: str) -> str:
+    return (f"region = {ref}.region AND year = {ref}.year AND state = {ref}.state "
+            f"AND district = COALESCE({ref}.district, '') AND month = COALESCE({ref}.month, 0)")
+
+
+def _add_row_sql(ref: str) -> str:
+    """Statements folding row ``ref`` (NEW/OLD) into its rollup group"""
+    statements = [f"""
+        INSERT INTO groundwater_rollups ({KEY_COLUMNS}, record_count, measurement_count,
+            measurement_sum, measurement_sumsq, measurement_min, measurement_max)
+        VALUES ({_key_values(ref)}, 1, {ref}.measurement IS NOT NULL,
+            COALESCE({ref}.measurement, 0), COALESCE({ref}.measurement * {ref}.measurement, 0),
+            {ref}.measurement, {ref}.measurement)
+        ON CONFLICT ({KEY_COLUMNS}) DO UPDATE SET
+            record_count = record_count + 1,
+            measurement_count = measurement_count + excluded.measurement_count,
+            measurement_sum = measurement_sum + excluded.measurement_sum,
+            measurement_sumsq = measurement_sumsq + excluded.measurement_sumsq,
+            measurement_min = MIN(COALESCE(measurement_min, excluded.measurement_min),
+                                  COALESCE(excluded.measurement_min, measurement_min)),
+            measurement_max = MAX(COALESCE(measurement_max, excluded.measurement_max),
+                                  COALESCE(excluded.measurement_max, measurement_max));"""]
+    for dimension in CATEGORY_DIMENSIONS:
+        statements.append(f"""
+        INSERT INTO groundwater_rollup_categories ({KEY_COLUMNS}, dimension, value, record_count)
+        VALUES ({_key_values(ref)}, '{dimension}', COALESCE({ref}.{dimension}, 'Unknown'), 1)
+        ON CONFLICT ({KEY_COLUMNS}, dimension, value) DO UPDATE SET
+            record_count = record_count + 1;""")
+    return "".join(statements)
+
+
+def _group_filter(ref: str) -> str:
+    """Rows ``r`` of groundwater_records in the same rollup group as ``ref``"""
+    return (f"r.region = {ref}.region AND r.year = {ref}.year AND r.state = {ref}.state "
+            f"AND COALESCE(r.district, '') = COALESCE({ref}.district, '') "
+            f"AND COALESCE(r.month, 0) = COALESCE({ref}.month, 0)")
+
+
+def _remove_row_sql(ref: str) -> str:
+    """Statements taking row ``ref`` back out of its rollup group"""
+    group_filter = _group_filter(ref)
+    statements = [f"""
+        UPDATE groundwater_rollups SET
+            record_count = record_count - 1,
+            measurement_count = measurement_count - ({ref}.measurement IS NOT NULL),
+            measurement_sum = measurement_sum - COALESCE({ref}.measurement, 0),
+            measurement_sumsq = measurement_sumsq - COALESCE({ref}.measurement * {ref}.measurement, 0)
+        WHERE {_key_match(ref)};""", f"""
+        UPDATE groundwater_rollups SET
+            measurement_min = (SELECT MIN(r.measurement) FROM groundwater_records r WHERE {group_filter}),
+            measurement_max = (SELECT MAX(r.measurement) FROM groundwater_records r WHERE {group_filter})
+        WHERE {_key_match(ref)} AND {ref}.measurement IS NOT NULL
+            AND ({ref}.measurement <= measurement_min OR {ref}.measurement >= measurement_max);""", f"""
+        DELETE FROM groundwater_rollups WHERE {_key_match(ref)} AND record_count <= 0;"""]
+    for dimension in CATEGORY_DIMENSIONS:
+        match = f"{_key_match(ref)} AND dimension = '{dimension}' AND value = COALESCE({ref}.{dimension}, 'Unknown')"
+        statements.append(f"""
+        UPDATE groundwater_rollup_categories SET record_count = record_count - 1 WHERE {match};
+        DELETE FROM groundwater_rollup_categories WHERE {match} AND record_count <= 0;""")
+    return "".join(statements)
+
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_insert
+        AFTER INSERT ON groundwater_records BEGIN {_add_row_sql('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_delete
+        AFTER DELETE ON groundwater_records BEGIN {_remove_row_sql('OLD')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_update
+        AFTER UPDATE OF region, year, state, district, month, measurement,
+                        well_type, aquifer_type, data_quality
+        ON groundwater_records BEGIN {_remove_row_sql('OLD')}{_add_row_sql('NEW')}
+    END""",
+]
+
+
+def _add_value_sql(ref: str) -> str:
+    """Statement counting row ``ref``'s measurement in its group"""
+    return f"""
+        INSERT INTO groundwater_rollup_values ({KEY_COLUMNS}, measurement, record_count, latest_recorded_at)
+        SELECT {_key_values(ref)}, {ref}.measurement, 1, {ref}.recorded_at
+        WHERE {ref}.measurement IS NOT NULL
+        ON CONFLICT ({KEY_COLUMNS}, measurement) DO UPDATE SET
+            record_count = record_count + 1,
+            latest_recorded_at = MAX(COALESCE(latest_recorded_at, excluded.latest_recorded_at),
+                                     COALESCE(excluded.latest_recorded_at, latest_recorded_at));"""
+
+
+def _remove_value_sql(ref: str) -> str:
+    """Statements uncounting row ``ref``'s measurement"""
+    match = f"{_key_match(ref)} AND measurement = {ref}.measurement"
+    return f"""
+        UPDATE groundwater_rollup_values SET record_count = record_count - 1 WHERE {match};
+        UPDATE groundwater_rollup_values SET
+            latest_recorded_at = (SELECT MAX(r.recorded_at) FROM groundwater_records r
+                                  WHERE {_group_filter(ref)} AND r.measurement = {ref}.measurement)
+        WHERE {match} AND {ref}.recorded_at >= latest_recorded_at;
+        DELETE FROM groundwater_rollup_values WHERE {match} AND record_count <= 0;"""
+
+
+CREATE_VALUE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_value_insert
+        AFTER INSERT ON groundwater_records BEGIN {_add_value_sql('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_value_delete
+        AFTER DELETE ON groundwater_records BEGIN {_remove_value_sql('OLD')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_groundwater_rollup_value_update
+        AFTER UPDATE OF region, year, state, district, month, measurement, recorded_at
+        ON groundwater_records BEGIN {_remove_value_sql('OLD')}{_add_value_sql('NEW')}
+    END""",
+]
+
+
+def _rebuild_groups(cursor):
+    cursor.execute("DELETE FROM groundwater_rollups")
+    cursor.execute("DELETE FROM groundwater_rollup_categories")
+    cursor.execute(f"""
+        INSERT INTO groundwater_rollups ({KEY_COLUMNS}, record_count, measurement_count,
+            measurement_sum, measurement_sumsq, measurement_min, measurement_max)
+        SELECT region, year, state, COALESCE(district, ''), COALESCE(month, 0),
+               COUNT(*), COUNT(measurement), COALESCE(SUM(measurement), 0),
+               COALESCE(SUM(measurement * measurement), 0), MIN(measurement), MAX(measurement)
+        FROM groundwater_records
+        GROUP BY region, year, state, COALESCE(district, ''), COALESCE(month, 0)
+    """)
+    for dimension in CATEGORY_DIMENSIONS:
+        cursor.execute(f"""
+            INSERT INTO groundwater_rollup_categories ({KEY_COLUMNS}, dimension, value, record_count)
+            SELECT region, year, state, COALESCE(district, ''), COALESCE(month, 0),
+                   '{dimension}', COALESCE({dimension}, 'Unknown'), COUNT(*)
+            FROM groundwater_records
+            GROUP BY region, year, state, COALESCE(district, ''), COALESCE(month, 0),
+                     COALESCE({dimension}, 'Unknown')
+        """)
+
+
+def _rebuild_values(cursor):
+    cursor.execute("DELETE FROM groundwater_rollup_values")
+    cursor.execute(f"""
+        INSERT INTO groundwater_rollup_values ({KEY_COLUMNS}, measurement, record_count, latest_recorded_at)
+        SELECT region, year, state, COALESCE(district, ''), COALESCE(month, 0),
+               measurement, COUNT(*), MAX(recorded_at)
+        FROM groundwater_records
+        WHERE measurement IS NOT NULL
+        GROUP BY region, year, state, COALESCE(district, ''), COALESCE(month, 0), measurement
+    """)
+
+
+def rebuild(cursor):
+    """Recompute every rollup from groundwater_records (repair)"""
+    _rebuild_groups(cursor)
+    _rebuild_values(cursor)
+
+
+def install(cursor):
+    """Create rollup tables and triggers, then populate them from existing rows"""
+    for statement in CREATE_TABLES + CREATE_TRIGGERS:
+        cursor.execute(statement)
+    _rebuild_groups(cursor)
+
+
+def install_values(cursor):
+    """Create the per-value counts and their triggers, then populate them"""
+    for statement in [CREATE_VALUES_TABLE] + CREATE_VALUE_TRIGGERS:
+        cursor.execute(statement)
+    _rebuild_values(cursor)
+
+
+def _occurs_before(a, b) -> bool:
+    """Whether (month, recorded_at) ``a`` comes first in ORDER BY month, recorded_at DESC"""
+    return a[0] < b[0] or (a[0] == b[0] and (a[1] or '') > (b[1] or ''))
+
+
+def _order_statistics(rows):
+    """Median and mode from (measurement, month, count, latest_recorded_at) rows
+
+    The mode matches statistics.mode over fetch_groundwater_data's rows
+    (ORDER BY month, recorded_at DESC): among the most frequent values the
+    one occurring first wins. It is None when no value repeats.
+    """
+    counts = {}
+    first_seen = {}
+    for measurement, month, count, recorded_at in rows:
+        counts[measurement] = counts.get(measurement, 0) + count
+        seen = first_seen.get(measurement)
+        if seen is None or _occurs_before((month, recorded_at), seen):
+            first_seen[measurement] = (month, recorded_at)
+
+    n = sum(counts.values())
+    targets = [(n - 1) // 2, n // 2]
+    middle = []
+    position = 0
+    for measurement in sorted(counts):
+        position += counts[measurement]
+        while targets and targets[0] < position:
+            middle.append(measurement)
+            targets.pop(0)
+
+    mode = None
+    top = max(counts.values())
+    if top > 1:
+        for measurement in sorted(counts):
+            if counts[measurement] == top and (
+                    mode is None or _occurs_before(first_seen[measurement], first_seen[mode])):
+                mode = measurement
+    return sum(middle) / len(middle), mode
+
+
+def region_statistics(conn, region: str, year: int, district: str = None) -> Optional[Dict[str, Any]]:
+    """Summary statistics and category distributions for a region/year.
+
+    Count, mean, min, max, std_dev and variance come straight from the
+    rollups; median and mode from the per-value counts, so the cost grows
+    with the number of distinct measurements rather than readings.
+    Returns None when there are no records.
+    """
+    cursor = conn.cursor()
+    group_where = "region = ? AND year = ?"
+    params = [region, year]
+    if district:
+        group_where += " AND district = ?"
+        params.append(district)
+
+    cursor.execute(f"""
+        SELECT SUM(record_count), SUM(measurement_count), SUM(measurement_sum),
+               SUM(measurement_sumsq), MIN(measurement_min), MAX(measurement_max)
+        FROM groundwater_rollups WHERE {group_where}
+    """, params)
+    records, n, total, total_sq, low, high = cursor.fetchone()
+    if not records:
+        return None
+
+    cursor.execute(f"""
+        SELECT dimension, value, SUM(record_count)
+        FROM groundwater_rollup_categories WHERE {group_where}
+        GROUP BY dimension, value
+    """, params)
+    distributions = {dimension: {} for dimension in CATEGORY_DIMENSIONS}
+    for dimension, value, count in cursor.fetchall():
+        distributions[dimension][value] = count
+
+    result = {
+        'record_count': records,
+        'statistics': None,
+        'distributions': {
+            'well_types': distributions['well_type'],
+            'aquifer_types': distributions['aquifer_type'],
+            'data_quality': distributions['data_quality'],
+        }
+    }
+    if not n:
+        return result
+
+    mean = total / n
+    variance = max(total_sq - total * total / n, 0.0) / (n - 1) if n > 1 else 0
+
+    cursor.execute(f"""
+        SELECT measurement, month, record_count, latest_recorded_at
+        FROM groundwater_rollup_values WHERE {group_where}
+    """, params)
+    median, mode = _order_statistics(cursor.fetchall())
+
+    result['statistics'] = {
+        'count': n,
+        'mean': mean,
+        'median': median,
+        'mode': mode,
+        'min': low,
+        'max': high,
+        'std_dev': math.sqrt(variance),
+        'variance': variance
+    }
+    return result
+
+
+def statistics_from_records(records) -> Optional[Dict[str, Any]]:
+    """The region_statistics() result computed from fetched record dicts
+
+    For records that did not come from the local store (IN-GRES), whose
+    rows the rollups do not cover. Given rows in fetch_groundwater_data
+    order, the values match what the rollups would report for them.
+    """
+    if not records:
+        return None
+
+    distributions = {dimension: {} for dimension in CATEGORY_DIMENSIONS}
+    for record in records:
+        for dimension in CATEGORY_DIMENSIONS:
+            value = record.get(dimension)
+            value = 'Unknown' if value is None else value
+            distributions[dimension][value] = distributions[dimension].get(value, 0) + 1
+
+    result = {
+        'record_count': len(records),
+        'statistics': None,
+        'distributions': {
+            'well_types': distributions['well_type'],
+            'aquifer_types': distributions['aquifer_type'],
+            'data_quality': distributions['data_quality'],
+        }
+    }
+    measurements = [record['measurement'] for record in records if record['measurement'] is not None]
+    if not measurements:
+        return result
+
+    n = len(measurements)
+    variance = statistics.variance(measurements) if n > 1 else 0
+    result['statistics'] = {
+        'count': n,
+        'mean': statistics.mean(measurements),
+        'median': statistics.median(measurements),
+        'mode': statistics.mode(measurements) if len(set(measurements)) < n else None,
+        'min': min(measurements),
+        'max': max(measurements),
+        'std_dev': math.sqrt(variance),
+        'variance': variance
+    }
+    return result
@@ -0,0 +1,33 @@
+"""
+JalDoot Runtime Configuration
+Settings lookup shared by the core services
+
+create_app() loads the selected Config class into app.config and hands it
+to configure(). Services read their settings through setting(), which
+prefers an explicitly passed mapping, then the configured one, and falls
+back to the environment for code running outside the app (manage.py).
+"""
+
+import os
+from typing import Any, Callable, Mapping, Optional
+
+_active: Mapping[str, Any] = {}
+
+
+def configure(config: Mapping[str, Any]):
+    """Make ``config`` (usually app.config) the default source for settings"""
+    global _active
+    _active = dict(config)
+
+
+def setting(name: str, default: Any = None, cast: Callable = None,
+            config: Optional[Mapping[str, Any]] = None) -> Any:
+    """Value of setting ``name``, converted with ``cast`` when given"""
+    value = (config if config is not None else _active).get(name)
+    if value is None:
+        value = os.getenv(name)
+    if value is None:
+        return default
+    if cast is bool:
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    return cast(value) if cast else value
@@ -0,0 +1,194 @@
+"""
+JalDoot Shard Router
+Per-state SQLite shards for groundwater_records with parallel fan-out
+
+Each state's records live in their own database file, so loading or
+vacuuming one state never blocks readers of another. The main database
+keeps the shard catalog (migration 7) along with regional metadata and query
+history. Shard N allocates record ids from N << SHARD_ID_BITS, which keeps
+ids unique across shards and lets keyset cursors span them.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from jaldoot.app.core.connection_pool import ConnectionPool
+
+SHARD_ID_BITS = 40
+
+# Minimum seconds between region-map refreshes triggered by lookups of unknown regions
+REGION_REFRESH_INTERVAL = 5.0
+
+
+def shard_file_name(state: str) -> str:
+    """Stable, filesystem-safe file name for a state's shard"""
+    slug = re.sub(r'[^a-z0-9]+', '_', state.strip().lower()).strip('_')
+    return f"{slug or 'state'}.db"
+
+
+class Shard:
+    """One state's database file and its connection pool"""
+
+    def __init__(self, state: str, index: int, path: str, pool: ConnectionPool):
+        self.state = state
+        self.index = index
+        self.path = path
+        self.pool = pool
+
+
+class ShardRouter:
+    """Maps states and regions to shards and fans queries out across them"""
+
+    def __init__(self, catalog_pool: ConnectionPool, shard_dir: str,
+                 init_shard: Callable[[Any], None], pool_settings: Dict[str, float] = None,
+                 max_workers: int = 4):
+        self.catalog_pool = catalog_pool
+        self.shard_dir = shard_dir
+        self.init_shard = init_shard
+        self.pool_settings = pool_settings or {'size': 2}
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)),
+                                           thread_name_prefix='shard')
+
+        self._lock = threading.RLock()
+        self._shards: Dict[str, Shard] = {}
+        self._region_shard: Dict[str, Shard] = {}
+        self._regions_refreshed_at = 0.0
+
+        os.makedirs(shard_dir, exist_ok=True)
+        self.reload_catalog()
+
+    def _open_shard(self, state: str, index: int, file_name: str) -> Shard:
+        path = os.path.join(self.shard_dir, file_name)
+        pool = ConnectionPool(
+            f'shard:{state}',
+            lambda: sqlite3.connect(path, check_same_thread=False),
+            **self.pool_settings
+        )
+        return Shard(state, index, path, pool)
+
+    def reload_catalog(self):
+        """Pick up shards added by other processes"""
+        with self.catalog_pool.acquire() as conn:
+            rows = conn.execute("SELECT state, shard_index, file_name FROM shards ORDER BY shard_index").fetchall()
+        with self._lock:
+            for state, index, file_name in rows:
+                if state.lower() not in self._shards:
+                    self._shards[state.lower()] = self._open_shard(state, index, file_name)
+
+    def ensure_shard(self, state: str) -> Shard:
+        """Return the shard for ``state``, creating its database if needed"""
+        with self._lock:
+            shard = self.shard_for_state(state)
+            if shard is not None:
+                return shard
+
+            with self.catalog_pool.acquire() as conn:
+                index = conn.execute("SELECT COALESCE(MAX(shard_index), 0) + 1 FROM shards").fetchone()[0]
+                file_name = shard_file_name(state)
+                shard = self._open_shard(state, index, file_name)
+
+                with shard.pool.acquire() as shard_conn:
+                    self.init_shard(shard_conn)
+                    # AUTOINCREMENT continues from the shard's id range
+                    shard_conn.execute("""
+                        INSERT INTO sqlite_sequence (name, seq)
+                        SELECT 'groundwater_records', ?
+                        WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'groundwater_records')
+                    """, (index << SHARD_ID_BITS,))
+                    shard_conn.commit()
+
+                conn.execute("INSERT INTO shards (state, shard_index, file_name) VALUES (?, ?, ?)",
+                             (state, index, file_name))
+                conn.commit()
+
+            self._shards[state.lower()] = shard
+            return shard
+
+    @property
+    def shards(self) -> List[Shard]:
+        with self._lock:
+            return sorted(self._shards.values(), key=lambda shard: shard.index)
+
+    def shard_for_state(self, state: str) -> Optional[Shard]:
+        if not state:
+            return None
+        return self._shards.get(state.strip().lower())
+
+    def shard_for_region(self, region: str) -> Optional[Shard]:
+        """Shard holding ``region``'s records (None if no shard has it)"""
+        shard = self._region_shard.get(region)
+        if shard is None and time.monotonic() - self._regions_refreshed_at >= REGION_REFRESH_INTERVAL:
+            self.refresh_regions()
+            shard = self._region_shard.get(region)
+        return shard
+
+    def refresh_regions(self):
+        """Rebuild the region -> shard map from every shard"""
+        self.reload_catalog()
+
+        def regions(shard):
+            with shard.pool.acquire() as conn:
+                return shard, [row[0] for row in
+                               conn.execute("SELECT DISTINCT region FROM groundwater_records").fetchall()]
+
+        region_shard = {}
+        for shard, names in self.fan_out(regions, refresh=False):
+            for name in names:
+                region_shard[name] = shard
+        self._region_shard = region_shard
+        self._regions_refreshed_at = time.monotonic()
+
+    def fan_out(self, fn: Callable[[Shard], Any], shards: List[Shard] = None,
+                refresh: bool = True) -> List[Any]:
+        """Run ``fn`` on each shard concurrently; results come back in shard order"""
+        if shards is None:
+            if refresh:
+                self.reload_catalog()
+            shards = self.shards
+        if len(shards) == 1:
+            return [fn(shards[0])]
+        return list(self.executor.map(fn, shards))
+
+    def vacuum(self, state: str = None) -> List[str]:
+        """VACUUM and ANALYZE one shard (or each in turn) without touching the others"""
+        self.reload_catalog()
+        if state:
+            shard = self.shard_for_state(state)
+            if shard is None:
+                raise ValueError(f"No shard for state '{state}'")
+            targets = [shard]
+        else:
+            targets = self.shards
+
+        for shard in targets:
+            conn = sqlite3.connect(shard.path, isolation_level=None)
+            try:
+                conn.execute("VACUUM")
+                conn.execute("ANALYZE")
+            finally:
+                conn.close()
+        return [shard.state for shard in targets]
+
+    def close_all(self):
+        self.executor.shutdown(wait=False)
+        for shard in self.shards:
+            shard.pool.close_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Shard files, sizes and pool statistics for monitoring"""
+        return {
+            'shard_dir': self.shard_dir,
+            'known_regions': len(self._region_shard),
+            'shards': [{
+                'state': shard.state,
+                'index': shard.index,
+                'file': os.path.basename(shard.path),
+                'size_bytes': os.path.getsize(shard.path) if os.path.exists(shard.path) else 0,
+                'pool': shard.pool.get_stats(),
+            } for shard in self.shards]
+        }
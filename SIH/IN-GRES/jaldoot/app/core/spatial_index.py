@@ -0,0 +1,275 @@
+"""
+JalDoot Spatial Index
+Nearest-region, radius and bounding-box lookups over regional_metadata
+
+Coordinates are mapped onto the unit sphere and held in a NumPy KD-tree, so
+straight-line (chord) distance orders points exactly as great-circle
+distance does and no haversine is needed during the search. Leaves hold
+small buckets of points that are scanned vectorized. Bounding-box queries
+use the latitude-sorted order (a B-tree in all but name) and filter by
+longitude. Like the column store, the index is a snapshot: writers call
+invalidate() and the next lookup rebuilds it.
+"""
+
+import heapq
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Points per leaf; small enough to keep scans cheap, large enough to keep the tree shallow
+LEAF_SIZE = 16
+
+LOAD_SQL = """
+    SELECT region, state, district, latitude, longitude
+    FROM regional_metadata
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+
+def to_unit_vectors(latitude, longitude) -> np.ndarray:
+    """(lat, lon) in degrees -> points on the unit sphere"""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+def chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def validate_point(latitude: float, longitude: float) -> Tuple[float, float]:
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90.0 <= latitude <= 90.0) or not (-180.0 <= longitude <= 180.0):
+        raise ValueError("latitude must be within [-90, 90] and longitude within [-180, 180]")
+    return latitude, longitude
+
+
+class _KDTree:
+    """Static KD-tree over 3-D points stored in flat node arrays"""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.leaf_size = max(1, int(leaf_size))
+        self.order = np.arange(len(points))
+        self.split_dim: List[int] = []
+        self.split_value: List[float] = []
+        self.children: List[Tuple[int, int]] = []
+        self.bounds: List[Tuple[int, int]] = []
+        if len(points):
+            self._build(points, 0, len(points))
+        # Points in leaf order, so a leaf is one contiguous slice
+        self.points = points[self.order]
+
+    def _build(self, points: np.ndarray, start: int, stop: int) -> int:
+        node = len(self.bounds)
+        self.bounds.append((start, stop))
+        self.split_dim.append(-1)
+        self.split_value.append(0.0)
+        self.children.append((-1, -1))
+        if stop - start <= self.leaf_size:
+            return node
+
+        members = self.order[start:stop]
+        spread = points[members].max(axis=0) - points[members].min(axis=0)
+        dim = int(np.argmax(spread))
+        mid = (stop - start) // 2
+        partitioned = members[np.argpartition(points[members, dim], mid)]
+        self.order[start:stop] = partitioned
+
+        self.split_dim[node] = dim
+        self.split_value[node] = float(points[partitioned[mid], dim])
+        left = self._build(points, start, start + mid)
+        right = self._build(points, start + mid, stop)
+        self.children[node] = (left, right)
+        return node
+
+    def nearest(self, target: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices (into the original points) and chord distances of the k nearest"""
+        if not self.bounds or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance², position)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            dim = self.split_dim[node]
+            if dim < 0:
+                start, stop = self.bounds[node]
+                deltas = self.points[start:stop] - target
+                distances = np.einsum('ij,ij->i', deltas, deltas)
+                for position, distance in zip(range(start, stop), distances.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, position))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, position))
+                continue
+            diff = target[dim] - self.split_value[node]
+            near, far = self.children[node] if diff < 0 else self.children[node][::-1]
+            # Far side first so the near side is popped (and searched) next
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+
+        best.sort(key=lambda item: (-item[0], item[1]))
+        positions = np.array([position for _, position in best], dtype=np.int64)
+        distances = np.sqrt(np.array([-distance for distance, _ in best]))
+        return self.order[positions], distances
+
+    def within(self, target: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and chord distances of every point within ``radius``"""
+        if not self.bounds:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        limit = radius * radius
+        positions, distances = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            dim = self.split_dim[node]
+            if dim < 0:
+                start, stop = self.bounds[node]
+                deltas = self.points[start:stop] - target
+                squared = np.einsum('ij,ij->i', deltas, deltas)
+                hits = np.flatnonzero(squared <= limit)
+                positions.append(hits + start)
+                distances.append(squared[hits])
+                continue
+            diff = target[dim] - self.split_value[node]
+            left, right = self.children[node]
+            if diff < 0 or diff * diff <= limit:
+                stack.append(left)
+            if diff >= 0 or diff * diff <= limit:
+                stack.append(right)
+
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        distances = np.sqrt(np.concatenate(distances)) if distances else np.empty(0)
+        order = np.lexsort((positions, distances))
+        return self.order[positions[order]], distances[order]
+
+
+class _Snapshot:
+    """Region coordinates plus the KD-tree and latitude order built over them"""
+
+    def __init__(self, rows: List[tuple]):
+        self.regions = [row[0] for row in rows]
+        self.states = [row[1] for row in rows]
+        self.districts = [row[2] for row in rows]
+        self.latitudes = np.array([row[3] for row in rows], dtype=np.float64)
+        self.longitudes = np.array([row[4] for row in rows], dtype=np.float64)
+        self.tree = _KDTree(to_unit_vectors(self.latitudes, self.longitudes))
+        self.by_latitude = np.argsort(self.latitudes, kind='stable')
+        self.sorted_latitudes = self.latitudes[self.by_latitude]
+        self.loaded_at = time.time()
+
+    def entry(self, index: int, distance_km: float = None) -> Dict[str, Any]:
+        entry = {
+            'region': self.regions[index],
+            'state': self.states[index],
+            'district': self.districts[index],
+            'latitude': float(self.latitudes[index]),
+            'longitude': float(self.longitudes[index]),
+        }
+        if distance_km is not None:
+            entry['distance_km'] = round(float(distance_km), 3)
+        return entry
+
+
+class SpatialIndex:
+    """Lazily (re)built spatial index over regional_metadata coordinates"""
+
+    def __init__(self, connection_factory, ttl: float = 3600):
+        self.connection_factory = connection_factory
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'queries': 0, 'last_build_seconds': None}
+
+    def load(self) -> _Snapshot:
+        started = time.perf_counter()
+        generation = self._generation
+        with self.connection_factory() as conn:
+            cursor = conn.cursor()
+            cursor.execute(LOAD_SQL)
+            rows = cursor.fetchall()
+
+        snapshot = _Snapshot(rows)
+        if generation == self._generation:
+            self._snapshot = snapshot
+        self._stats['builds'] += 1
+        self._stats['last_build_seconds'] = time.perf_counter() - started
+        return snapshot
+
+    def invalidate(self):
+        """Drop the index after metadata changes; the next lookup rebuilds it"""
+        self._generation += 1
+        self._snapshot = None
+
+    def snapshot(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - snapshot.loaded_at < self.ttl:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.time() - snapshot.loaded_at >= self.ttl:
+                snapshot = self.load()
+            return snapshot
+
+    def nearest(self, latitude: float, longitude: float, limit: int = 5) -> List[Dict[str, Any]]:
+        """The ``limit`` regions closest to a point, nearest first"""
+        snap = self.snapshot()
+        target = to_unit_vectors(*validate_point(latitude, longitude))
+        indices, chords = snap.tree.nearest(target, int(limit))
+        self._stats['queries'] += 1
+        return [snap.entry(i, d) for i, d in zip(indices.tolist(), chord_to_km(chords).tolist())]
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Dict[str, Any]]:
+        """Regions within ``radius_km`` of a point, nearest first"""
+        if radius_km < 0:
+            raise ValueError("radius_km must not be negative")
+        snap = self.snapshot()
+        target = to_unit_vectors(*validate_point(latitude, longitude))
+        indices, chords = snap.tree.within(target, km_to_chord(float(radius_km)))
+        self._stats['queries'] += 1
+        return [snap.entry(i, d) for i, d in zip(indices.tolist(), chord_to_km(chords).tolist())]
+
+    def within_bbox(self, min_latitude: float, min_longitude: float,
+                    max_latitude: float, max_longitude: float) -> List[Dict[str, Any]]:
+        """Regions inside a bounding box, ordered by latitude
+
+        A box with ``min_longitude > max_longitude`` wraps across the
+        antimeridian.
+        """
+        min_latitude, min_longitude = validate_point(min_latitude, min_longitude)
+        max_latitude, max_longitude = validate_point(max_latitude, max_longitude)
+        if min_latitude > max_latitude:
+            raise ValueError("min_latitude must not exceed max_latitude")
+        snap = self.snapshot()
+        start = np.searchsorted(snap.sorted_latitudes, min_latitude, side='left')
+        stop = np.searchsorted(snap.sorted_latitudes, max_latitude, side='right')
+        candidates = snap.by_latitude[start:stop]
+        longitudes = snap.longitudes[candidates]
+        if min_longitude <= max_longitude:
+            mask = (longitudes >= min_longitude) & (longitudes <= max_longitude)
+        else:
+            mask = (longitudes >= min_longitude) | (longitudes <= max_longitude)
+        self._stats['queries'] += 1
+        return [snap.entry(i) for i in candidates[mask].tolist()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        stats = dict(self._stats)
+        stats.update({
+            'loaded': snap is not None,
+            'regions': len(snap.regions) if snap else 0,
+            'tree_nodes': len(snap.tree.bounds) if snap else 0,
+        })
+        return stats
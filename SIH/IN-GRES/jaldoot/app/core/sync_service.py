@@ -0,0 +1,250 @@
+"""
+JalDoot IN-GRES Sync Service
+Incremental delta sync from IN-GRES into the local SQLite mirror
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from jaldoot.app.core.migrations import NATURAL_KEY_COLUMNS, upsert_records_sql
+
+SYNC_COLUMNS = [
+    'id', 'region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+    'well_type', 'aquifer_type', 'notes', 'source_url', 'data_quality',
+    'recorded_at', 'updated_at'
+]
+
+METADATA_COLUMNS = [
+    'region', 'state', 'district', 'latitude', 'longitude', 'population',
+    'area_sqkm', 'climate_zone', 'aquifer_types'
+]
+
+# Rows change when updated_at moves; recorded_at covers rows never updated
+CHANGE_TS = "COALESCE(updated_at, recorded_at)"
+
+
+def _upsert_sql(table: str, columns, key: str) -> str:
+    updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != key)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}")
+
+
+class IngresSyncService:
+    """Pulls rows changed since the last watermark and upserts them locally.
+
+    The source is any DB-API connection factory using ``?`` parameters: pyodbc
+    for IN-GRES in production, or sqlite3 pointed at another file for testing.
+    An optional circuit breaker skips runs while the source is unreachable.
+    Rows stream through ``fetchmany`` and every batch is committed together
+    with the advanced watermark ``(change timestamp, id)``, so an interrupted
+    sync continues exactly where it stopped. Deletions in IN-GRES are not
+    propagated.
+
+    With a ``ShardRouter`` as ``shards``, each batch is split by state and
+    upserted into the state shards before the watermark in the main database
+    advances. A batch interrupted between the two is pulled again on the next
+    run, and the upserts make that harmless.
+    """
+
+    def __init__(self, source_factory: Callable[[], Any], target_db_path: str,
+                 source_name: str = 'ingres', batch_size: int = 5000, breaker=None,
+                 shards=None):
+        self.source_factory = source_factory
+        self.breaker = breaker
+        self.shards = shards
+        self.target_db_path = target_db_path
+        self.source_name = source_name
+        self.batch_size = max(1, int(batch_size))
+
+        self._scheduler = None
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def get_watermark(self, target) -> Optional[tuple]:
+        row = target.execute(
+            "SELECT watermark, last_id FROM sync_watermarks WHERE source = ?",
+            (self.source_name,)
+        ).fetchone()
+        return (row[0], row[1]) if row and row[0] is not None else None
+
+    def _changed_rows_query(self, watermark: Optional[tuple]):
+        sql = f"SELECT {', '.join(SYNC_COLUMNS)}, {CHANGE_TS} FROM groundwater_records"
+        params = []
+        if watermark:
+            # Keyset on (timestamp, id) so rows sharing a timestamp are not lost
+            sql += f" WHERE {CHANGE_TS} > ? OR ({CHANGE_TS} = ? AND id > ?)"
+            params = [watermark[0], watermark[0], watermark[1]]
+        sql += f" ORDER BY {CHANGE_TS}, id"
+        return sql, params
+
+    def sync_records(self, progress: bool = False) -> Dict[str, Any]:
+        """Copy every groundwater record changed since the last run"""
+        started = time.perf_counter()
+        stats = {'rows': 0, 'batches': 0}
+
+        target = sqlite3.connect(self.target_db_path, isolation_level=None)
+        source = self.source_factory()
+        try:
+            watermark = self.get_watermark(target)
+            stats['from_watermark'] = stats['to_watermark'] = watermark[0] if watermark else None
+
+            cursor = source.cursor()
+            cursor.arraysize = self.batch_size
+            sql, params = self._changed_rows_query(watermark)
+            cursor.execute(sql, params)
+
+            # Rows are matched on their natural key, not the IN-GRES id, so a
+            # reading that was also bulk loaded is updated rather than duplicated
+            columns = SYNC_COLUMNS[1:]
+            upsert = upsert_records_sql(
+                columns, update_columns=[c for c in columns if c != 'updated_at'
+                                         and c not in NATURAL_KEY_COLUMNS]
+            )
+            while True:
+                batch = cursor.fetchmany(self.batch_size)
+                if not batch:
+                    break
+
+                rows = [tuple(row[1:-1]) for row in batch]
+                last_ts, last_id = str(batch[-1][-1]), batch[-1][0]
+
+                if self.shards is not None:
+                    self._upsert_into_shards(upsert, rows)
+
+                target.execute("BEGIN IMMEDIATE")
+                try:
+                    if self.shards is None:
+                        target.executemany(upsert, rows)
+                    target.execute("""
+                        INSERT INTO sync_watermarks (source, watermark, last_id, rows_synced, synced_at)
+                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT(source) DO UPDATE SET
+                            watermark = excluded.watermark,
+                            last_id = excluded.last_id,
+                            rows_synced = rows_synced + excluded.rows_synced,
+                            synced_at = excluded.synced_at
+                    """, (self.source_name, last_ts, last_id, len(rows)))
+                    target.execute("COMMIT")
+                except Exception:
+                    target.execute("ROLLBACK")
+                    raise
+
+                stats['rows'] += len(rows)
+                stats['batches'] += 1
+                stats['to_watermark'] = last_ts
+                if progress:
+                    print(f"synced {stats['rows']} rows (watermark {last_ts})")
+        finally:
+            source.close()
+            target.close()
+            if self.shards is not None and stats['rows']:
+                self.shards.refresh_regions()
+
+        stats['elapsed_seconds'] = time.perf_counter() - started
+        return stats
+
+    def _upsert_into_shards(self, upsert: str, rows):
+        """Write one batch to the shards of the states it touches"""
+        state_index = SYNC_COLUMNS[1:].index('state')
+        by_state: Dict[str, list] = {}
+        for row in rows:
+            by_state.setdefault(row[state_index], []).append(row)
+
+        for state, state_rows in by_state.items():
+            shard = self.shards.ensure_shard(state)
+            conn = sqlite3.connect(shard.path, isolation_level=None)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(upsert, state_rows)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+
+    def sync_metadata(self) -> int:
+        """Refresh regional_metadata; the table is small, so copy it whole"""
+        source = self.source_factory()
+        try:
+            cursor = source.cursor()
+            cursor.execute(f"SELECT {', '.join(METADATA_COLUMNS)} FROM regional_metadata")
+            rows = [tuple(row) for row in cursor.fetchall()]
+        finally:
+            source.close()
+
+        target = sqlite3.connect(self.target_db_path)
+        try:
+            target.executemany(_upsert_sql('regional_metadata', METADATA_COLUMNS, 'region'), rows)
+            target.commit()
+        finally:
+            target.close()
+        return len(rows)
+
+    def run_once(self, progress: bool = False) -> Dict[str, Any]:
+        """Run one full sync pass (records, then metadata)"""
+        with self._run_lock:
+            if self.breaker is not None and not self.breaker.allow_request():
+                result = {'rows': 0, 'metadata_rows': 0, 'skipped': 'circuit open',
+                          'finished_at': time.time()}
+                self.last_result = result
+                return result
+            try:
+                result = self.sync_records(progress=progress)
+                result['metadata_rows'] = self.sync_metadata()
+            except Exception as e:
+                if self.breaker is not None:
+                    self.breaker.record_failure(e)
+                raise
+            if self.breaker is not None:
+                self.breaker.record_success()
+            result['finished_at'] = time.time()
+            self.last_result = result
+            return result
+
+    def start_scheduler(self, interval: float, on_synced: Callable[[Dict], None] = None):
+        """Run sync every ``interval`` seconds in a daemon thread"""
+        if self._scheduler is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    result = self.run_once()
+                    if on_synced and (result['rows'] or result['metadata_rows']):
+                        on_synced(result)
+                except Exception as e:
+                    print(f"IN-GRES sync failed: {e}")
+                    self.last_result = {'error': str(e), 'finished_at': time.time()}
+                self._stop.wait(interval)
+
+        self._scheduler = threading.Thread(target=loop, name='ingres-sync', daemon=True)
+        self._scheduler.start()
+
+    def stop_scheduler(self):
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return the persisted watermark and the outcome of the last run"""
+        target = sqlite3.connect(self.target_db_path)
+        try:
+            row = target.execute("""
+                SELECT watermark, last_id, rows_synced, synced_at
+                FROM sync_watermarks WHERE source = ?
+            """, (self.source_name,)).fetchone()
+        finally:
+            target.close()
+        return {
+            'source': self.source_name,
+            'watermark': row[0] if row else None,
+            'last_id': row[1] if row else None,
+            'rows_synced': row[2] if row else 0,
+            'synced_at': row[3] if row else None,
+            'scheduled': self._scheduler is not None and self._scheduler.is_alive(),
+            'last_result': self.last_result,
+        }
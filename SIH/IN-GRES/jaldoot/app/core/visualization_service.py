@@ -1,6 +1,11 @@
 """
 JalDoot Visualization Service
 Create charts and graphs for groundwater data
+
+Charts are built in two steps. Preparing reduces the input rows to the
+few values a chart plots (monthly means, category counts, statistics) in
+the request thread; drawing turns those values into an encoded image in a
+render worker. The prepared values also key the render cache.
 """
 
 import matplotlib.pyplot as plt
@@ -10,19 +15,156 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 import base64
+import functools
 import io
+import threading
+import time
 from datetime import datetime
 
+from matplotlib.backend_bases import FigureCanvasBase
+
+from jaldoot.app.core.chart_cache import MIME_TYPES, ChartCache, chart_key, get_chart_cache, is_chart_key
+from jaldoot.app.core.render_engine import RenderEngine, get_render_engine
+from jaldoot.app.core.runtime_config import setting
+
+# Charts accept record dicts, a DataFrame, or a dict of column arrays
+GroundwaterData = Union[List[Dict], pd.DataFrame, Dict[str, np.ndarray]]
+
+# A prepared chart: (chart type, the values it plots)
+ChartRequest = Tuple[str, Dict[str, Any]]
+
 # Set style for better looking plots
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
+# Drawing functions by chart type, so worker processes can render by name
+_DRAWERS = {}
+
+# pyplot state is global; serializes drawing when no worker pool is used
+_RENDER_LOCK = threading.Lock()
+
+# Encoded fallback images by (format, dpi)
+_FALLBACK_IMAGES = {}
+FALLBACK_MESSAGE = "Chart unavailable, please try again"
+
+# Render profiles: resolution, figure scale and encoding per use. The
+# thumbnail profile targets sub-50KB charts for slow mobile connections.
+RENDER_PROFILES = {
+    'thumbnail': {'format': 'webp', 'dpi': 60, 'scale': 0.75, 'pil_kwargs': {'quality': 75, 'method': 6}},
+    'screen': {'format': 'png', 'dpi': 100, 'scale': 1.0, 'pil_kwargs': {'optimize': True}},
+    'print': {'format': 'png', 'dpi': 300, 'scale': 1.0, 'pil_kwargs': {'optimize': True}},
+}
+DEFAULT_PROFILE = 'screen'
+
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def drawer(chart_type: str):
+    """Register a method that draws ``chart_type`` from its prepared values"""
+    def decorator(draw):
+        _DRAWERS[chart_type] = draw
+        return draw
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _supports_format(fmt: str) -> bool:
+    """Whether matplotlib (and Pillow, for WebP) can encode ``fmt`` here"""
+    if fmt not in FigureCanvasBase.get_supported_filetypes():
+        return False
+    if fmt == 'webp':
+        try:
+            from PIL import features
+        except ImportError:
+            return False
+        return bool(features.check('webp'))
+    return True
+
+
+def render_options(profile: str = None, fmt: str = None) -> Dict[str, Any]:
+    """Encoding settings for a render profile, optionally overriding its format
+    
+    Raises ValueError for an unknown profile or format. WebP falls back to
+    optimized PNG where this matplotlib/Pillow build cannot write it.
+    """
+    profile = profile or DEFAULT_PROFILE
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile: {profile}")
+    options = dict(RENDER_PROFILES[profile], profile=profile)
+    if fmt:
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Unsupported chart format: {fmt}")
+        options['format'] = fmt
+    if options['format'] == 'webp' and not _supports_format('webp'):
+        options['format'] = 'png'
+    # Pillow settings only apply to the format they were chosen for
+    if options['format'] != RENDER_PROFILES[profile]['format']:
+        options['pil_kwargs'] = {'optimize': True} if options['format'] == 'png' else None
+    return options
+
+
+def _no_data(message: str) -> ChartRequest:
+    return 'no_data', {'message': message}
+
+
+def _labelled(series: pd.Series) -> Dict[str, list]:
+    """Index and values of an aggregate as plain lists"""
+    return {'labels': series.index.tolist(), 'values': series.values.tolist()}
+
+
+class ChartData:
+    """Input rows plus the aggregates charts share, each computed at most once"""
+    
+    def __init__(self, data: GroundwaterData):
+        self.empty = VisualizationService._is_empty(data)
+        self.frame = None if self.empty else VisualizationService._to_frame(data)
+        self._value_counts = {}
+    
+    @classmethod
+    def of(cls, data: Union['ChartData', GroundwaterData]) -> 'ChartData':
+        return data if isinstance(data, ChartData) else cls(data)
+    
+    @functools.cached_property
+    def monthly_mean(self) -> Optional[pd.Series]:
+        """Mean measurement per month, or None without monthly data"""
+        df = self.frame
+        if 'month' in df.columns and df['month'].notna().any():
+            return df.groupby('month')['measurement'].mean()
+        return None
+    
+    @functools.cached_property
+    def regional_mean(self) -> pd.Series:
+        return self.frame.groupby('region')['measurement'].mean().sort_values(ascending=True)
+    
+    @functools.cached_property
+    def summary(self) -> Dict[str, float]:
+        measurement = self.frame['measurement']
+        return {
+            'Mean': measurement.mean(),
+            'Median': measurement.median(),
+            'Min': measurement.min(),
+            'Max': measurement.max(),
+            'Std Dev': measurement.std()
+        }
+    
+    def value_counts(self, column: str) -> Optional[pd.Series]:
+        """Counts per value of a column, or None when it has no values"""
+        if column not in self._value_counts:
+            df = self.frame
+            if column not in df.columns or df[column].isna().all():
+                self._value_counts[column] = None
+            else:
+                self._value_counts[column] = df[column].value_counts()
+        return self._value_counts[column]
+
+
 class VisualizationService:
     """Service for creating groundwater data visualizations"""
     
-    def __init__(self):
+    def __init__(self, cache: ChartCache = None, engine: RenderEngine = None):
         self.colors = {
             'primary': '#2E86AB',
             'secondary': '#A23B72',
@@ -32,33 +174,135 @@ class VisualizationService:
             'info': '#06FFA5'
         }
         
+        # Render profile used when a request does not pick one
+        self.default_profile = setting('CHART_RENDER_PROFILE', DEFAULT_PROFILE)
+        # Dashboards link charts under this prefix unless images are inlined
+        self.chart_url_prefix = setting('CHART_URL_PREFIX', '/charts').rstrip('/')
+        self.inline_images = setting('CHART_INLINE_IMAGES', False, bool)
+        self.cache = cache or get_chart_cache()
+        # None renders through the shared worker pool (or in-process if disabled)
+        self.engine = engine
+        
         # Set matplotlib to use a non-interactive backend
         plt.switch_backend('Agg')
     
-    def create_groundwater_level_chart(self, data: List[Dict], region: str, year: int) -> str:
+    def create_groundwater_level_chart(self, data: GroundwaterData, region: str, year: int,
+                                       profile: str = None, fmt: str = None) -> str:
         """Create a line chart showing groundwater levels over time"""
-        if not data:
-            return self._create_no_data_chart("No groundwater data available")
-        
-        # Convert data to DataFrame
-        df = pd.DataFrame(data)
-        
+        chart = self._prepare_groundwater_levels(ChartData.of(data), region, year)
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def create_regional_comparison_chart(self, data: GroundwaterData,
+                                         profile: str = None, fmt: str = None) -> str:
+        """Create a bar chart comparing groundwater levels across regions"""
+        chart = self._prepare_regional_comparison(ChartData.of(data))
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def create_aquifer_type_chart(self, data: GroundwaterData,
+                                  profile: str = None, fmt: str = None) -> str:
+        """Create a pie chart showing distribution by aquifer type"""
+        chart = self._prepare_aquifer_types(ChartData.of(data))
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def create_well_type_chart(self, data: GroundwaterData,
+                               profile: str = None, fmt: str = None) -> str:
+        """Create a bar chart showing distribution by well type"""
+        chart = self._prepare_well_types(ChartData.of(data))
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def create_data_quality_chart(self, data: GroundwaterData,
+                                  profile: str = None, fmt: str = None) -> str:
+        """Create a chart showing data quality distribution"""
+        chart = self._prepare_data_quality(ChartData.of(data))
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def create_summary_statistics_chart(self, data: GroundwaterData, statistics: Dict = None,
+                                        profile: str = None, fmt: str = None) -> str:
+        """Create a chart showing summary statistics
+        
+        Pass precomputed ``statistics`` (e.g. from the rollup tables) to skip
+        recomputing them from the raw rows.
+        """
+        chart = self._prepare_summary_stats(ChartData.of(data), statistics)
+        return self._render_one(chart, self.options_for(profile, fmt))
+    
+    def options_for(self, profile: str = None, fmt: str = None) -> Dict[str, Any]:
+        """Encoding settings for a request; ValueError for unknown profiles/formats"""
+        return render_options(profile or self.default_profile, fmt)
+    
+    def _prepare_groundwater_levels(self, chart_data: ChartData, region: str, year: int) -> ChartRequest:
+        if chart_data.empty:
+            return _no_data("No groundwater data available")
+        monthly = chart_data.monthly_mean
+        return 'groundwater_levels', {
+            'region': region,
+            'year': year,
+            'measurements': chart_data.frame['measurement'].tolist(),
+            'months': monthly.index.tolist() if monthly is not None else None,
+            'monthly_means': monthly.values.tolist() if monthly is not None else None,
+        }
+    
+    def _prepare_regional_comparison(self, chart_data: ChartData) -> ChartRequest:
+        if chart_data.empty:
+            return _no_data("No regional data available")
+        return 'regional_comparison', _labelled(chart_data.regional_mean)
+    
+    def _prepare_aquifer_types(self, chart_data: ChartData) -> ChartRequest:
+        if chart_data.empty:
+            return _no_data("No aquifer data available")
+        counts = chart_data.value_counts('aquifer_type')
+        if counts is None:
+            return _no_data("No aquifer type information available")
+        return 'aquifer_types', _labelled(counts)
+    
+    def _prepare_well_types(self, chart_data: ChartData) -> ChartRequest:
+        if chart_data.empty:
+            return _no_data("No well type data available")
+        counts = chart_data.value_counts('well_type')
+        if counts is None:
+            return _no_data("No well type information available")
+        return 'well_types', _labelled(counts)
+    
+    def _prepare_data_quality(self, chart_data: ChartData) -> ChartRequest:
+        if chart_data.empty:
+            return _no_data("No data quality information available")
+        counts = chart_data.value_counts('data_quality')
+        if counts is None:
+            return _no_data("No data quality information available")
+        return 'data_quality', _labelled(counts)
+    
+    def _prepare_summary_stats(self, chart_data: ChartData, statistics: Dict = None) -> ChartRequest:
+        if statistics:
+            stats = {
+                'Mean': statistics['mean'],
+                'Median': statistics['median'],
+                'Min': statistics['min'],
+                'Max': statistics['max'],
+                'Std Dev': statistics['std_dev']
+            }
+        elif chart_data.empty:
+            return _no_data("No data available for statistics")
+        else:
+            stats = chart_data.summary
+        return 'summary_stats', {'labels': list(stats), 'values': [float(v) for v in stats.values()]}
+    
+    @drawer('groundwater_levels')
+    def _draw_groundwater_levels(self, region: str, year: int, measurements: List[float],
+                                 months: List = None, monthly_means: List[float] = None):
         # Create the plot
         fig, ax = plt.subplots(figsize=(12, 6))
         
         # Plot groundwater levels
-        if 'month' in df.columns and df['month'].notna().any():
+        if months is not None:
             # Monthly data
-            monthly_data = df.groupby('month')['measurement'].mean()
-            ax.plot(monthly_data.index, monthly_data.values, 
+            ax.plot(months, monthly_means,
                    marker='o', linewidth=2, markersize=8, color=self.colors['primary'])
             ax.set_xlabel('Month')
             ax.set_xticks(range(1, 13))
-            ax.set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                              'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+            ax.set_xticklabels(MONTH_LABELS)
         else:
             # Single data point or no monthly data
-            ax.bar(range(len(df)), df['measurement'], color=self.colors['primary'], alpha=0.7)
+            ax.bar(range(len(measurements)), measurements, color=self.colors['primary'], alpha=0.7)
             ax.set_xlabel('Data Points')
         
         ax.set_ylabel('Groundwater Level (m)')
@@ -66,60 +310,40 @@ class VisualizationService:
         ax.grid(True, alpha=0.3)
         
         # Add value labels on points
-        for i, v in enumerate(df['measurement']):
-            ax.annotate(f'{v:.1f}m', (i, v), textcoords="offset points", 
+        for i, v in enumerate(measurements):
+            ax.annotate(f'{v:.1f}m', (i, v), textcoords="offset points",
                        xytext=(0,10), ha='center')
         
-        return self._fig_to_base64(fig)
+        return fig
     
-    def create_regional_comparison_chart(self, data: List[Dict]) -> str:
-        """Create a bar chart comparing groundwater levels across regions"""
-        if not data:
-            return self._create_no_data_chart("No regional data available")
-        
-        df = pd.DataFrame(data)
-        
-        # Group by region and calculate average
-        regional_avg = df.groupby('region')['measurement'].mean().sort_values(ascending=True)
-        
+    @drawer('regional_comparison')
+    def _draw_regional_comparison(self, labels: List[str], values: List[float]):
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        bars = ax.barh(regional_avg.index, regional_avg.values, 
-                      color=self.colors['primary'], alpha=0.8)
+        bars = ax.barh(labels, values, color=self.colors['primary'], alpha=0.8)
         
         ax.set_xlabel('Average Groundwater Level (m)')
-        ax.set_title('Groundwater Levels Comparison Across Regions', 
+        ax.set_title('Groundwater Levels Comparison Across Regions',
                     fontsize=16, fontweight='bold')
         ax.grid(True, alpha=0.3, axis='x')
         
         # Add value labels
-        for i, v in enumerate(regional_avg.values):
+        for i, v in enumerate(values):
             ax.text(v + 0.1, i, f'{v:.1f}m', va='center', fontweight='bold')
         
-        return self._fig_to_base64(fig)
+        return fig
     
-    def create_aquifer_type_chart(self, data: List[Dict]) -> str:
-        """Create a pie chart showing distribution by aquifer type"""
-        if not data:
-            return self._create_no_data_chart("No aquifer data available")
-        
-        df = pd.DataFrame(data)
-        
-        if 'aquifer_type' not in df.columns or df['aquifer_type'].isna().all():
-            return self._create_no_data_chart("No aquifer type information available")
-        
-        # Count aquifer types
-        aquifer_counts = df['aquifer_type'].value_counts()
-        
+    @drawer('aquifer_types')
+    def _draw_aquifer_types(self, labels: List[str], values: List[int]):
         fig, ax = plt.subplots(figsize=(10, 8))
         
-        colors = [self.colors['primary'], self.colors['secondary'], 
+        colors = [self.colors['primary'], self.colors['secondary'],
                  self.colors['accent'], self.colors['success']]
         
-        wedges, texts, autotexts = ax.pie(aquifer_counts.values, 
-                                         labels=aquifer_counts.index,
+        wedges, texts, autotexts = ax.pie(values,
+                                         labels=labels,
                                          autopct='%1.1f%%',
-                                         colors=colors[:len(aquifer_counts)],
+                                         colors=colors[:len(values)],
                                          startangle=90)
         
         ax.set_title('Distribution by Aquifer Type', fontsize=16, fontweight='bold')
@@ -129,50 +353,24 @@ class VisualizationService:
             autotext.set_color('white')
             autotext.set_fontweight('bold')
         
-        return self._fig_to_base64(fig)
+        return fig
     
-    def create_well_type_chart(self, data: List[Dict]) -> str:
-        """Create a bar chart showing distribution by well type"""
-        if not data:
-            return self._create_no_data_chart("No well type data available")
-        
-        df = pd.DataFrame(data)
-        
-        if 'well_type' not in df.columns or df['well_type'].isna().all():
-            return self._create_no_data_chart("No well type information available")
-        
-        well_counts = df['well_type'].value_counts()
-        
+    @drawer('well_types')
+    def _draw_well_types(self, labels: List[str], values: List[int]):
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        bars = ax.bar(well_counts.index, well_counts.values, 
-                     color=self.colors['secondary'], alpha=0.8)
+        bars = ax.bar(labels, values, color=self.colors['secondary'], alpha=0.8)
         
         ax.set_xlabel('Well Type')
         ax.set_ylabel('Number of Wells')
         ax.set_title('Distribution by Well Type', fontsize=16, fontweight='bold')
         ax.grid(True, alpha=0.3, axis='y')
         
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                   f'{int(height)}', ha='center', va='bottom', fontweight='bold')
-        
-        return self._fig_to_base64(fig)
+        self._label_bars(ax, bars, lambda height: f'{int(height)}')
+        return fig
     
-    def create_data_quality_chart(self, data: List[Dict]) -> str:
-        """Create a chart showing data quality distribution"""
-        if not data:
-            return self._create_no_data_chart("No data quality information available")
-        
-        df = pd.DataFrame(data)
-        
-        if 'data_quality' not in df.columns or df['data_quality'].isna().all():
-            return self._create_no_data_chart("No data quality information available")
-        
-        quality_counts = df['data_quality'].value_counts()
-        
+    @drawer('data_quality')
+    def _draw_data_quality(self, labels: List[str], values: List[int]):
         # Define colors for quality levels
         quality_colors = {
             'High': self.colors['success'],
@@ -180,31 +378,59 @@ class VisualizationService:
             'Low': self.colors['info']
         }
         
-        colors = [quality_colors.get(q, self.colors['primary']) for q in quality_counts.index]
+        colors = [quality_colors.get(q, self.colors['primary']) for q in labels]
         
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        bars = ax.bar(quality_counts.index, quality_counts.values, color=colors, alpha=0.8)
+        bars = ax.bar(labels, values, color=colors, alpha=0.8)
         
         ax.set_xlabel('Data Quality')
         ax.set_ylabel('Number of Records')
         ax.set_title('Data Quality Distribution', fontsize=16, fontweight='bold')
         ax.grid(True, alpha=0.3, axis='y')
         
-        # Add value labels on bars
+        self._label_bars(ax, bars, lambda height: f'{int(height)}')
+        return fig
+    
+    @drawer('summary_stats')
+    def _draw_summary_stats(self, labels: List[str], values: List[float]):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        
+        bars = ax.bar(labels, values, color=self.colors['primary'], alpha=0.8)
+        
+        ax.set_ylabel('Groundwater Level (m)')
+        ax.set_title('Summary Statistics', fontsize=16, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y')
+        
+        self._label_bars(ax, bars, lambda height: f'{height:.2f}m')
+        return fig
+    
+    @drawer('no_data')
+    def _no_data_figure(self, message: str, title: str = 'No Data Available'):
+        """Draw a figure showing no data message"""
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.text(0.5, 0.5, message, ha='center', va='center',
+               fontsize=16, fontweight='bold', transform=ax.transAxes)
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis('off')
+        ax.set_title(title, fontsize=18, fontweight='bold')
+        
+        return fig
+    
+    @staticmethod
+    def _label_bars(ax, bars, label):
+        """Add value labels on bars"""
         for bar in bars:
             height = bar.get_height()
             ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                   f'{int(height)}', ha='center', va='bottom', fontweight='bold')
-        
-        return self._fig_to_base64(fig)
+                   label(height), ha='center', va='bottom', fontweight='bold')
     
-    def create_interactive_plotly_chart(self, data: List[Dict], region: str, year: int) -> str:
+    def create_interactive_plotly_chart(self, data: GroundwaterData, region: str, year: int) -> str:
         """Create an interactive Plotly chart"""
-        if not data:
-            return self._create_no_data_chart("No data available for interactive chart")
-        
-        df = pd.DataFrame(data)
+        chart_data = ChartData.of(data)
+        if chart_data.empty:
+            return self._render_one(_no_data("No data available for interactive chart"), self.options_for())
         
         # Create subplots
         fig = make_subplots(
@@ -215,8 +441,8 @@ class VisualizationService:
         )
         
         # Groundwater levels over time
-        if 'month' in df.columns and df['month'].notna().any():
-            monthly_data = df.groupby('month')['measurement'].mean()
+        monthly_data = chart_data.monthly_mean
+        if monthly_data is not None:
             fig.add_trace(
                 go.Scatter(x=monthly_data.index, y=monthly_data.values,
                           mode='lines+markers', name='Groundwater Level',
@@ -225,8 +451,8 @@ class VisualizationService:
             )
         
         # Aquifer types pie chart
-        if 'aquifer_type' in df.columns and df['aquifer_type'].notna().any():
-            aquifer_counts = df['aquifer_type'].value_counts()
+        aquifer_counts = chart_data.value_counts('aquifer_type')
+        if aquifer_counts is not None:
             fig.add_trace(
                 go.Pie(labels=aquifer_counts.index, values=aquifer_counts.values,
                       name="Aquifer Types"),
@@ -234,8 +460,8 @@ class VisualizationService:
             )
         
         # Well types bar chart
-        if 'well_type' in df.columns and df['well_type'].notna().any():
-            well_counts = df['well_type'].value_counts()
+        well_counts = chart_data.value_counts('well_type')
+        if well_counts is not None:
             fig.add_trace(
                 go.Bar(x=well_counts.index, y=well_counts.values,
                       name="Well Types", marker_color=self.colors['secondary']),
@@ -243,8 +469,8 @@ class VisualizationService:
             )
         
         # Data quality bar chart
-        if 'data_quality' in df.columns and df['data_quality'].notna().any():
-            quality_counts = df['data_quality'].value_counts()
+        quality_counts = chart_data.value_counts('data_quality')
+        if quality_counts is not None:
             fig.add_trace(
                 go.Bar(x=quality_counts.index, y=quality_counts.values,
                       name="Data Quality", marker_color=self.colors['accent']),
@@ -259,73 +485,237 @@ class VisualizationService:
         
         return fig.to_html(include_plotlyjs='cdn')
     
-    def create_summary_statistics_chart(self, data: List[Dict]) -> str:
-        """Create a chart showing summary statistics"""
-        if not data:
-            return self._create_no_data_chart("No data available for statistics")
-        
-        df = pd.DataFrame(data)
-        
-        # Calculate statistics
-        stats = {
-            'Mean': df['measurement'].mean(),
-            'Median': df['measurement'].median(),
-            'Min': df['measurement'].min(),
-            'Max': df['measurement'].max(),
-            'Std Dev': df['measurement'].std()
-        }
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        bars = ax.bar(stats.keys(), stats.values(), 
-                     color=self.colors['primary'], alpha=0.8)
-        
-        ax.set_ylabel('Groundwater Level (m)')
-        ax.set_title('Summary Statistics', fontsize=16, fontweight='bold')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                   f'{height:.2f}m', ha='center', va='bottom', fontweight='bold')
-        
-        return self._fig_to_base64(fig)
+    @staticmethod
+    def _to_frame(data: GroundwaterData) -> pd.DataFrame:
+        """Return data as a DataFrame, reusing it when it already is one"""
+        if isinstance(data, pd.DataFrame):
+            return data
+        return pd.DataFrame(data)
+    
+    @staticmethod
+    def _is_empty(data: GroundwaterData) -> bool:
+        """Check for no rows across all supported input shapes"""
+        if data is None:
+            return True
+        if isinstance(data, pd.DataFrame):
+            return data.empty
+        if isinstance(data, dict):
+            return not data or len(next(iter(data.values()))) == 0
+        return len(data) == 0
     
     def _create_no_data_chart(self, message: str) -> str:
         """Create a chart showing no data message"""
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.text(0.5, 0.5, message, ha='center', va='center', 
-               fontsize=16, fontweight='bold', transform=ax.transAxes)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-        ax.set_title('No Data Available', fontsize=18, fontweight='bold')
+        return self._render_one(_no_data(message), self.options_for())
+    
+    def _render_one(self, chart: ChartRequest, options: Dict[str, Any]) -> str:
+        rendered = self._render_many({'chart': chart}, options)['chart']
+        return self._data_uri(options['format'], rendered['image'])
+    
+    def _render_many(self, charts: Dict[str, ChartRequest], options: Dict[str, Any],
+                     while_rendering=None) -> Dict[str, Dict[str, Any]]:
+        """Render several prepared charts concurrently
+        
+        Cache hits are answered immediately and every miss is queued on the
+        worker pool before waiting on any of them, so the batch takes about
+        as long as its slowest chart. ``while_rendering`` is called while the
+        workers draw. Each chart maps to its cache ``key``, encoded ``image``,
+        whether it was ``cached``, its ``encode_seconds`` (None for cache
+        hits) and whether it is ``available``. A chart that fails, times out
+        or finds the queue full gets the fallback image, which is not cached
+        so the next request retries.
+        """
+        engine = self.engine or get_render_engine()
+        keys = {name: chart_key(chart_type, inputs, options)
+                for name, (chart_type, inputs) in charts.items()}
+        for name, key in keys.items():
+            self.cache.remember(key, *charts[name], options)
+        images = {name: self.cache.get(key) for name, key in keys.items()}
+        rendered = {name: {'key': keys[name], 'image': image, 'cached': True,
+                           'encode_seconds': None, 'available': True}
+                    for name, image in images.items() if image is not None}
+        
+        misses = [name for name, image in images.items() if image is None]
+        jobs = {}
+        if engine is not None:
+            jobs = {name: engine.submit(*charts[name], options) for name in misses}
+        if while_rendering is not None:
+            while_rendering()
+        
+        deadline = time.monotonic() + engine.timeout if engine is not None else None
+        for name in misses:
+            if engine is None:
+                result = self._render_inline(*charts[name], options)
+            elif jobs[name] is not None:
+                result = jobs[name].wait(max(0.0, deadline - time.monotonic()))
+            else:
+                result = None
+            
+            if result is None:
+                image, encode_seconds = self._fallback_image(options), None
+            else:
+                image, encode_seconds = result
+                self.cache.put(keys[name], image)
+            rendered[name] = {'key': keys[name], 'image': image, 'cached': False,
+                              'encode_seconds': encode_seconds, 'available': result is not None}
+        
+        return {name: rendered[name] for name in charts}
+    
+    def _render_inline(self, chart_type: str, inputs: Dict[str, Any],
+                       options: Dict[str, Any]) -> Optional[Tuple[bytes, float]]:
+        with _RENDER_LOCK:
+            try:
+                return self.render_chart(chart_type, inputs, options)
+            except Exception as e:
+                print(f"Error rendering {chart_type} chart: {e}")
+                return None
+    
+    def render_chart(self, chart_type: str, inputs: Dict[str, Any],
+                     options: Dict[str, Any]) -> Tuple[bytes, float]:
+        """Draw and encode one prepared chart in this process (worker entry point)
         
-        return self._fig_to_base64(fig)
+        Returns the encoded image and the seconds spent encoding it.
+        """
+        return self._encode_figure(_DRAWERS[chart_type](self, **inputs), options)
+    
+    def get_chart(self, key: str) -> Optional[bytes]:
+        """Encoded chart for a key issued in a dashboard, or None if unknown
+        
+        An image no longer in the cache is drawn again from its recorded
+        inputs. Raises RuntimeError when that render fails or times out.
+        """
+        if not is_chart_key(key):
+            return None
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+        recipe = self.cache.recipe(key)
+        if recipe is None:
+            return None
+        chart_type, inputs, options = recipe
+        rendered = self._render_many({'chart': (chart_type, inputs)}, options)['chart']
+        if not rendered['available']:
+            raise RuntimeError(f"Chart {key} could not be rendered")
+        return rendered['image']
+    
+    def _fallback_image(self, options: Dict[str, Any]) -> bytes:
+        """Placeholder shown when a chart could not be rendered, drawn once per profile"""
+        key = (options['format'], options['dpi'], options.get('scale', 1.0))
+        image = _FALLBACK_IMAGES.get(key)
+        if image is None:
+            with _RENDER_LOCK:
+                fig = self._no_data_figure(FALLBACK_MESSAGE, title='Chart Unavailable')
+                image = _FALLBACK_IMAGES[key] = self._encode_figure(fig, options)[0]
+        return image
     
-    def _fig_to_base64(self, fig) -> str:
-        """Convert matplotlib figure to base64 string"""
+    @staticmethod
+    def _encode_figure(fig, options: Dict[str, Any]) -> Tuple[bytes, float]:
+        """Encode a matplotlib figure and close it, timing the encode"""
         buffer = io.BytesIO()
-        fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close(fig)
-        
-        return f"data:image/png;base64,{image_base64}"
+        scale = options.get('scale', 1.0)
+        started = time.perf_counter()
+        try:
+            if scale != 1.0:
+                width, height = fig.get_size_inches()
+                fig.set_size_inches(width * scale, height * scale)
+            savefig_kwargs = {'format': options['format'], 'dpi': options['dpi'], 'bbox_inches': 'tight'}
+            if options.get('pil_kwargs'):
+                savefig_kwargs['pil_kwargs'] = options['pil_kwargs']
+            fig.savefig(buffer, **savefig_kwargs)
+        finally:
+            plt.close(fig)
+        return buffer.getvalue(), time.perf_counter() - started
+    
+    @staticmethod
+    def _render_report(options: Dict[str, Any], rendered: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Profile, format and per-chart encoded size/encode time for a response"""
+        charts = {}
+        for name, chart in rendered.items():
+            seconds = chart['encode_seconds']
+            charts[name] = {
+                'bytes': len(chart['image']),
+                'encode_ms': round(seconds * 1000, 2) if seconds is not None else None,
+                'cached': chart['cached'],
+            }
+        return {
+            'profile': options['profile'],
+            'format': options['format'],
+            'dpi': options['dpi'],
+            'total_bytes': sum(chart['bytes'] for chart in charts.values()),
+            'charts': charts,
+        }
     
-    def create_comprehensive_dashboard(self, data: List[Dict], region: str, year: int) -> Dict[str, str]:
-        """Create a comprehensive dashboard with multiple visualizations"""
+    def _chart_ref(self, options: Dict[str, Any], chart: Dict[str, Any]) -> str:
+        """URL of a rendered chart, or a data URI when inlining or for the fallback"""
+        if self.inline_images or not chart['available']:
+            return self._data_uri(options['format'], chart['image'])
+        return f"{self.chart_url_prefix}/{chart['key']}"
+    
+    @staticmethod
+    def _data_uri(fmt: str, image: bytes) -> str:
+        return f"data:{MIME_TYPES[fmt]};base64,{base64.b64encode(image).decode()}"
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Chart render cache hit/miss counters and memory use"""
+        return self.cache.get_stats()
+    
+    def get_render_stats(self) -> Dict[str, Any]:
+        """Worker pool job, timeout and queue counters"""
+        engine = self.engine or get_render_engine()
+        if engine is None:
+            return {'workers': 0, 'running': False}
+        return engine.get_stats()
+    
+    def create_comprehensive_dashboard(self, data: GroundwaterData, region: str, year: int,
+                                       statistics: Dict = None, profile: str = None,
+                                       fmt: str = None) -> Dict[str, Any]:
+        """Create a comprehensive dashboard with multiple visualizations
+        
+        The rows are converted and aggregated once, then the five images are
+        rendered concurrently while the Plotly chart is built. Charts that
+        fail or time out show the fallback image and are listed under
+        ``unavailable``. Images are returned as ``/charts/<key>`` URLs (see
+        get_chart) unless CHART_INLINE_IMAGES is set; the fallback is always
+        inlined so it is never cached under a chart's URL. ``render``
+        reports the profile, format and each image's encoded size and encode
+        time.
+        
+        Raises ValueError for an unknown ``profile`` or ``fmt``.
+        """
+        options = self.options_for(profile, fmt)
         dashboard = {}
         
         try:
-            dashboard['groundwater_levels'] = self.create_groundwater_level_chart(data, region, year)
-            dashboard['aquifer_types'] = self.create_aquifer_type_chart(data)
-            dashboard['well_types'] = self.create_well_type_chart(data)
-            dashboard['data_quality'] = self.create_data_quality_chart(data)
-            dashboard['summary_stats'] = self.create_summary_statistics_chart(data)
-            dashboard['interactive'] = self.create_interactive_plotly_chart(data, region, year)
+            chart_data = ChartData(data)
+            charts = {
+                'groundwater_levels': self._prepare_groundwater_levels(chart_data, region, year),
+                'aquifer_types': self._prepare_aquifer_types(chart_data),
+                'well_types': self._prepare_well_types(chart_data),
+                'data_quality': self._prepare_data_quality(chart_data),
+                'summary_stats': self._prepare_summary_stats(chart_data, statistics),
+            }
             
+            def build_interactive():
+                try:
+                    dashboard['interactive'] = self.create_interactive_plotly_chart(chart_data, region, year)
+                except Exception as e:
+                    print(f"Error creating interactive chart: {e}")
+            
+            # The empty-data Plotly fallback is itself a rendered image
+            if chart_data.empty:
+                charts['interactive'] = _no_data("No data available for interactive chart")
+                build_interactive = None
+            
+            rendered = self._render_many(charts, options, while_rendering=build_interactive)
+            for name, chart in rendered.items():
+                dashboard[name] = self._chart_ref(options, chart)
+            dashboard['render'] = self._render_report(options, rendered)
+            
+            unavailable = [name for name, chart in rendered.items() if not chart['available']]
+            if 'interactive' not in dashboard:
+                unavailable.append('interactive')
+            if unavailable:
+                dashboard['unavailable'] = unavailable
+        
         except Exception as e:
             print(f"Error creating dashboard: {e}")
             dashboard['error'] = f"Error creating visualizations: {str(e)}"
@@ -3,16 +3,18 @@ JalDoot API Routes
 REST API endpoints for groundwater data
 """
 
-from flask import Blueprint, request, jsonify
-from jaldoot.app.core.groundwater_service import GroundwaterService
+from flask import Blueprint, Response, request, jsonify
+from jaldoot.app.core.groundwater_service import get_groundwater_service
 from jaldoot.app.core.language_service import LanguageService
 from jaldoot.app.core.visualization_service import VisualizationService
+from jaldoot.app.core.query_builder import InvalidQuery
+from jaldoot.app.core.exporters import EXPORT_FORMATS, TEXT_FORMATS, iter_export
 import time
 
 api_bp = Blueprint('api', __name__)
 
 # Initialize services
-groundwater_service = GroundwaterService()
+groundwater_service = get_groundwater_service()
 language_service = LanguageService()
 visualization_service = VisualizationService()
 
@@ -26,9 +28,39 @@ def health_check():
         'timestamp': time.time()
     })
 
+@api_bp.route('/metrics')
+def service_metrics():
+    """Runtime metrics for monitoring"""
+    try:
+        return jsonify({
+            'success': True,
+            'connection_pools': groundwater_service.get_pool_stats(),
+            'schema_version': groundwater_service.get_schema_version(),
+            'cache': groundwater_service.get_cache_stats(),
+            'column_store': groundwater_service.get_column_store_stats(),
+            'spatial_index': groundwater_service.get_spatial_index_stats(),
+            'query_log': groundwater_service.get_query_log_stats(),
+            'ingres': groundwater_service.get_ingres_status(),
+            'ingres_sync': groundwater_service.get_sync_status(),
+            'analytics': groundwater_service.get_analytics_status(),
+            'shards': groundwater_service.get_shard_stats(),
+            'chart_cache': visualization_service.get_cache_stats(),
+            'chart_render': visualization_service.get_render_stats(),
+            'timestamp': time.time()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/groundwater/search', methods=['POST'])
 def search_groundwater():
-    """Search groundwater data with advanced filters"""
+    """Search groundwater data with advanced filters
+    
+    Filters are evaluated in SQL and results are paginated: pass the returned
+    ``next_cursor`` as ``cursor`` to get the next page of ``limit`` rows.
+    ``text`` searches notes and source metadata; such results are ranked by
+    relevance unless another ``sort`` is given.
+    """
     try:
         data = request.get_json()
         
@@ -40,35 +72,36 @@ def search_groundwater():
         aquifer_type = data.get('aquifer_type')
         min_level = data.get('min_level')
         max_level = data.get('max_level')
-        
-        # Fetch data
-        if region and year:
-            groundwater_data = groundwater_service.fetch_groundwater_data(region, year, district)
-        else:
-            return jsonify({'error': 'Region and year are required'}), 400
-        
-        # Apply filters
-        filtered_data = groundwater_data
-        
-        if state:
-            filtered_data = [d for d in filtered_data if d.get('state', '').lower() == state.lower()]
-        
-        if well_type:
-            filtered_data = [d for d in filtered_data if d.get('well_type', '').lower() == well_type.lower()]
-        
-        if aquifer_type:
-            filtered_data = [d for d in filtered_data if d.get('aquifer_type', '').lower() == aquifer_type.lower()]
-        
-        if min_level is not None:
-            filtered_data = [d for d in filtered_data if d.get('measurement', 0) >= min_level]
-        
-        if max_level is not None:
-            filtered_data = [d for d in filtered_data if d.get('measurement', float('inf')) <= max_level]
+        text = (data.get('text') or '').strip()
+        
+        if not (region and year) and not text:
+            return jsonify({'error': 'Region and year, or search text, are required'}), 400
+        
+        # Full-text results default to best match first
+        default_sort, default_order = ('relevance', 'desc') if text else ('id', 'asc')
+        
+        try:
+            result = groundwater_service.search_groundwater_data(
+                region=region, year=year, district=district, state=state,
+                well_type=well_type, aquifer_type=aquifer_type,
+                min_level=min_level, max_level=max_level,
+                sort=data.get('sort', default_sort),
+                descending=str(data.get('order', default_order)).lower() == 'desc',
+                limit=data.get('limit', 100),
+                cursor=data.get('cursor'),
+                include_total=bool(data.get('include_total', False)),
+                text=text or None
+            )
+        except (InvalidQuery, TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'data': filtered_data,
-            'total_records': len(filtered_data),
+            'data': result['data'],
+            'count': len(result['data']),
+            'total_records': result['total_records'],
+            'next_cursor': result['next_cursor'],
+            'has_more': result['has_more'],
             'filters_applied': {
                 'region': region,
                 'year': year,
@@ -77,29 +110,79 @@ def search_groundwater():
                 'well_type': well_type,
                 'aquifer_type': aquifer_type,
                 'min_level': min_level,
-                'max_level': max_level
+                'max_level': max_level,
+                'text': text or None
             }
         })
         
     except Exception as e:
         return jsonify({'error': f'Search failed: {str(e)}'}), 500
 
+def _float_arg(name: str, required: bool = False):
+    """Read a float query parameter, rejecting malformed or missing values"""
+    value = request.args.get(name)
+    if value in (None, ''):
+        if required:
+            raise ValueError(f"{name} is required")
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+def _int_arg(name: str):
+    """Read an optional integer query parameter, rejecting malformed values"""
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+@api_bp.route('/groundwater/export', methods=['GET'])
+def export_groundwater_data():
+    """Stream groundwater records or regional metadata for download
+    
+    Query parameters: format (ndjson|csv|arrow|parquet), table
+    (groundwater_records|regional_metadata), columns (comma separated),
+    region, state, district, year, min_year, max_year, gzip (true|false,
+    text formats only). Rows are read from the database in batches and
+    written out as they arrive.
+    """
+    fmt = request.args.get('format', 'ndjson').lower()
+    table = request.args.get('table', 'groundwater_records')
+    columns = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()]
+    compress = request.args.get('gzip', 'false').lower() == 'true' and fmt in TEXT_FORMATS
+    
+    try:
+        columns, batches = groundwater_service.iter_table_rows(
+            table=table,
+            columns=columns or None,
+            region=request.args.get('region'),
+            state=request.args.get('state'),
+            district=request.args.get('district'),
+            year=_int_arg('year'),
+            min_year=_int_arg('min_year'),
+            max_year=_int_arg('max_year')
+        )
+        chunks = iter_export(columns, batches, fmt, compress=compress)
+    except (InvalidQuery, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f"{table}.{fmt}" + ('.gz' if compress else '')
+    return Response(
+        chunks,
+        mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
 @api_bp.route('/groundwater/regions', methods=['GET'])
 def get_all_regions():
     """Get all available regions with metadata"""
     try:
-        regions = groundwater_service.get_available_regions()
-        regions_with_metadata = []
-        
-        for region in regions:
-            metadata = groundwater_service.get_regional_metadata(region)
-            years = groundwater_service.get_available_years(region)
-            
-            regions_with_metadata.append({
-                'region': region,
-                'metadata': metadata,
-                'available_years': years
-            })
+        # One grouped query instead of two lookups per region
+        regions_with_metadata = groundwater_service.get_regions_overview()
         
         return jsonify({
             'success': True,
@@ -110,62 +193,58 @@ def get_all_regions():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/regions/nearest', methods=['GET'])
+def get_nearest_regions():
+    """Regions closest to lat/lon, nearest first (limit, default 5)"""
+    try:
+        regions = groundwater_service.find_nearest_regions(
+            _float_arg('lat', required=True), _float_arg('lon', required=True),
+            limit=min(_int_arg('limit') or 5, 100)
+        )
+        return jsonify({'success': True, 'regions': regions})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/regions/within', methods=['GET'])
+def get_regions_within():
+    """Regions within radius_km of lat/lon, or inside min_lat/min_lon/max_lat/max_lon"""
+    try:
+        if request.args.get('radius_km') is not None:
+            regions = groundwater_service.find_regions_within(
+                _float_arg('lat', required=True), _float_arg('lon', required=True),
+                _float_arg('radius_km', required=True)
+            )
+        else:
+            regions = groundwater_service.find_regions_in_bbox(
+                _float_arg('min_lat', required=True), _float_arg('min_lon', required=True),
+                _float_arg('max_lat', required=True), _float_arg('max_lon', required=True)
+            )
+        return jsonify({'success': True, 'regions': regions, 'count': len(regions)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/groundwater/statistics/<region>/<int:year>')
 def get_region_statistics(region, year):
     """Get statistical analysis for a region and year"""
     try:
-        data = groundwater_service.fetch_groundwater_data(region, year)
+        result = groundwater_service.get_region_statistics(region, year, request.args.get('district'))
         
-        if not data:
+        if not result:
             return jsonify({'error': 'No data found'}), 404
         
-        # Calculate statistics
-        measurements = [d['measurement'] for d in data if d['measurement'] is not None]
-        
-        if not measurements:
+        if not result['statistics']:
             return jsonify({'error': 'No measurements available'}), 404
         
-        import statistics
-        
-        stats = {
-            'count': len(measurements),
-            'mean': statistics.mean(measurements),
-            'median': statistics.median(measurements),
-            'mode': statistics.mode(measurements) if len(set(measurements)) < len(measurements) else None,
-            'min': min(measurements),
-            'max': max(measurements),
-            'std_dev': statistics.stdev(measurements) if len(measurements) > 1 else 0,
-            'variance': statistics.variance(measurements) if len(measurements) > 1 else 0
-        }
-        
-        # Additional analysis
-        well_types = {}
-        aquifer_types = {}
-        data_quality = {}
-        
-        for record in data:
-            # Well type distribution
-            well_type = record.get('well_type', 'Unknown')
-            well_types[well_type] = well_types.get(well_type, 0) + 1
-            
-            # Aquifer type distribution
-            aquifer_type = record.get('aquifer_type', 'Unknown')
-            aquifer_types[aquifer_type] = aquifer_types.get(aquifer_type, 0) + 1
-            
-            # Data quality distribution
-            quality = record.get('data_quality', 'Unknown')
-            data_quality[quality] = data_quality.get(quality, 0) + 1
-        
         return jsonify({
             'success': True,
             'region': region,
             'year': year,
-            'statistics': stats,
-            'distributions': {
-                'well_types': well_types,
-                'aquifer_types': aquifer_types,
-                'data_quality': data_quality
-            }
+            'statistics': result['statistics'],
+            'distributions': result['distributions']
         })
         
     except Exception as e:
@@ -180,31 +259,45 @@ def create_chart(chart_type):
         year = data.get('year')
         chart_data = data.get('data', [])
         
+        if not chart_data and chart_type == 'regional_comparison':
+            # One row per region carrying its average, aggregated server-side
+            chart_data = [{'region': row['region'], 'measurement': row['average']}
+                          for row in groundwater_service.get_regional_comparison(year=year)
+                          if row['average'] is not None]
+        
         if not chart_data:
             return jsonify({'error': 'No data provided'}), 400
         
+        # Render profile (thumbnail/screen/print) and optional format override
+        render = {'profile': data.get('profile'), 'fmt': data.get('format')}
+        options = visualization_service.options_for(**render)
+        
         # Create chart based on type
         if chart_type == 'groundwater_levels':
-            chart = visualization_service.create_groundwater_level_chart(chart_data, region, year)
+            chart = visualization_service.create_groundwater_level_chart(chart_data, region, year, **render)
         elif chart_type == 'regional_comparison':
-            chart = visualization_service.create_regional_comparison_chart(chart_data)
+            chart = visualization_service.create_regional_comparison_chart(chart_data, **render)
         elif chart_type == 'aquifer_types':
-            chart = visualization_service.create_aquifer_type_chart(chart_data)
+            chart = visualization_service.create_aquifer_type_chart(chart_data, **render)
         elif chart_type == 'well_types':
-            chart = visualization_service.create_well_type_chart(chart_data)
+            chart = visualization_service.create_well_type_chart(chart_data, **render)
         elif chart_type == 'data_quality':
-            chart = visualization_service.create_data_quality_chart(chart_data)
+            chart = visualization_service.create_data_quality_chart(chart_data, **render)
         elif chart_type == 'summary_stats':
-            chart = visualization_service.create_summary_statistics_chart(chart_data)
+            chart = visualization_service.create_summary_statistics_chart(chart_data, **render)
         else:
             return jsonify({'error': 'Invalid chart type'}), 400
         
         return jsonify({
             'success': True,
             'chart_type': chart_type,
-            'chart_data': chart
+            'chart_data': chart,
+            'profile': options['profile'],
+            'format': options['format']
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Chart creation failed: {str(e)}'}), 500
 
@@ -221,7 +314,8 @@ def create_dashboard():
             return jsonify({'error': 'No data provided'}), 400
         
         dashboard = visualization_service.create_comprehensive_dashboard(
-            chart_data, region, year
+            chart_data, region, year,
+            profile=data.get('profile'), fmt=data.get('format')
         )
         
         return jsonify({
@@ -229,6 +323,8 @@ def create_dashboard():
             'dashboard': dashboard
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Dashboard creation failed: {str(e)}'}), 500
 
@@ -322,6 +418,41 @@ def search_ingres_platform():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/analytics/regional-comparison', methods=['GET'])
+def get_regional_comparison():
+    """Measurement summary per region, optionally for one year and/or state"""
+    try:
+        comparison = groundwater_service.get_regional_comparison(
+            year=_int_arg('year'), state=request.args.get('state')
+        )
+        return jsonify({'success': True, 'regions': comparison})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/analytics/trends', methods=['GET'])
+def get_yearly_trends():
+    """Measurement summary per region and year"""
+    try:
+        trends = groundwater_service.get_yearly_trends(
+            region=request.args.get('region'), state=request.args.get('state')
+        )
+        return jsonify({'success': True, 'trends': trends})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/analytics/states', methods=['GET'])
+def get_state_rollups():
+    """Record counts and measurement summary per state and year"""
+    try:
+        states = groundwater_service.get_state_rollups(year=_int_arg('year'))
+        return jsonify({'success': True, 'states': states})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/analytics/queries', methods=['GET'])
 def get_query_analytics():
     """Get analytics about user queries"""
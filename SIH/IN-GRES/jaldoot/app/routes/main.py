@@ -3,8 +3,9 @@ JalDoot Main Routes
 Main web interface routes
 """
 
-from flask import Blueprint, render_template, request, jsonify, session
-from jaldoot.app.core.groundwater_service import GroundwaterService
+from flask import Blueprint, Response, render_template, request, jsonify, session
+from jaldoot.app.core.chart_cache import mime_type
+from jaldoot.app.core.groundwater_service import get_groundwater_service
 from jaldoot.app.core.language_service import LanguageService
 from jaldoot.app.core.visualization_service import VisualizationService
 from jaldoot.app.core.voice_service import VoiceService
@@ -13,7 +14,7 @@ import time
 main_bp = Blueprint('main', __name__)
 
 # Initialize services
-groundwater_service = GroundwaterService()
+groundwater_service = get_groundwater_service()
 language_service = LanguageService()
 visualization_service = VisualizationService()
 voice_service = VoiceService()
@@ -45,6 +46,12 @@ def query_groundwater():
         if not user_query:
             return jsonify({'error': 'Query is required'}), 400
         
+        # Chart render profile (thumbnail/screen/print) and optional format override
+        try:
+            visualization_service.options_for(data.get('profile'), data.get('format'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         start_time = time.time()
         
         # Detect language if not specified
@@ -68,6 +75,18 @@ def query_groundwater():
                     region = available_region
                     break
         
+        # Fall back to the nearest monitored region to the user's coordinates
+        nearest_region = None
+        if not region and data.get('latitude') is not None and data.get('longitude') is not None:
+            try:
+                nearest_region = groundwater_service.resolve_nearest_region(
+                    data['latitude'], data['longitude']
+                )
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': f'Invalid coordinates: {str(e)}'}), 400
+            if nearest_region:
+                region = nearest_region['region']
+        
         if not region:
             return jsonify({
                 'error': 'Please specify a region or location in your query',
@@ -91,9 +110,17 @@ def query_groundwater():
         # Get regional metadata
         regional_metadata = groundwater_service.get_regional_metadata(region)
         
+        # Summary statistics come precomputed from the rollup tables (or from
+        # the fetched rows when IN-GRES served them)
+        region_statistics = groundwater_service.get_region_statistics(
+            region, year, location_info.get('district')
+        )
+        
         # Create visualizations
         dashboard_charts = visualization_service.create_comprehensive_dashboard(
-            groundwater_data, region, year
+            groundwater_data, region, year,
+            statistics=region_statistics['statistics'] if region_statistics else None,
+            profile=data.get('profile'), fmt=data.get('format')
         )
         
         # Generate AI response
@@ -113,6 +140,7 @@ def query_groundwater():
             'query': user_query,
             'language': language,
             'region': region,
+            'nearest_region': nearest_region,
             'year': year,
             'data': groundwater_data,
             'metadata': regional_metadata,
@@ -124,6 +152,29 @@ def query_groundwater():
     except Exception as e:
         return jsonify({'error': f'Query processing failed: {str(e)}'}), 500
 
+# Same prefix the dashboards build chart URLs from (CHART_URL_PREFIX)
+@main_bp.route(f'{visualization_service.chart_url_prefix}/<key>')
+def chart_image(key):
+    """Rendered chart bytes by content address, cacheable forever"""
+    # The key is a hash of everything that determines the image
+    if request.if_none_match.contains(key):
+        response = Response(status=304)
+    else:
+        try:
+            image = visualization_service.get_chart(key)
+        except RuntimeError as e:
+            response = jsonify({'error': str(e)})
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+        if image is None:
+            return jsonify({'error': 'Chart not found'}), 404
+        response = Response(image, mimetype=mime_type(key))
+    
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @main_bp.route('/voice/process', methods=['POST'])
 def process_voice():
     """Process voice input"""
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+JalDoot Analytics Benchmark
+Compares the SQLite and DuckDB backends on cross-region aggregate queries
+over a generated groundwater_records table (10M rows by default)
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jaldoot.app.core import analytics
+
+COLUMNS = ['id', 'region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+           'well_type', 'aquifer_type', 'data_quality', 'recorded_at']
+
+WELL_TYPES = ['Borewell', 'Dug Well', 'Tube Well']
+AQUIFER_TYPES = ['Alluvial', 'Hard Rock', 'Basalt', 'Sandstone']
+DATA_QUALITY = ['High', 'Medium', 'Low']
+
+
+def generate(db_path: str, rows: int, regions: int = 200, states: int = 20, chunk: int = 500000):
+    """Write ``rows`` synthetic records into a bare groundwater_records table"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("""
+        CREATE TABLE groundwater_records (
+            id INTEGER PRIMARY KEY, region TEXT NOT NULL, district TEXT, state TEXT NOT NULL,
+            year INTEGER NOT NULL, month INTEGER, measurement REAL, unit TEXT,
+            well_type TEXT, aquifer_type TEXT, notes TEXT, source_url TEXT,
+            data_quality TEXT, recorded_at TIMESTAMP, updated_at TIMESTAMP
+        )
+    """)
+    rng = np.random.default_rng(42)
+    region_state = [f"State {i % states}" for i in range(regions)]
+    insert = f"INSERT INTO groundwater_records ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        region_idx = rng.integers(0, regions, n)
+        years = rng.integers(2000, 2025, n)
+        months = rng.integers(1, 13, n)
+        levels = np.round(rng.gamma(2.0, 8.0, n), 2)
+        well = rng.integers(0, len(WELL_TYPES), n)
+        aquifer = rng.integers(0, len(AQUIFER_TYPES), n)
+        quality = rng.integers(0, len(DATA_QUALITY), n)
+        batch = [
+            (start + i + 1, f"Region {r}", f"District {r}-{r % 7}", region_state[r], int(y), int(m),
+             float(v), 'm', WELL_TYPES[w], AQUIFER_TYPES[a], DATA_QUALITY[q], f"{y}-{m:02d}-15 00:00:00")
+            for i, (r, y, m, v, w, a, q) in enumerate(zip(region_idx.tolist(), years.tolist(), months.tolist(),
+                                                         levels.tolist(), well.tolist(), aquifer.tolist(),
+                                                         quality.tolist()))
+        ]
+        conn.executemany(insert, batch)
+        conn.commit()
+        print(f"  generated {start + n:,} / {rows:,} rows")
+
+    # The same region/year index the application creates
+    conn.execute("CREATE INDEX idx_groundwater_region_year_month ON groundwater_records (region, year, month)")
+    conn.commit()
+    conn.close()
+
+
+def row_source(db_path: str):
+    """(columns, batches) over the generated table, for the Parquet mirror"""
+    def batches():
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM groundwater_records ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(100000)
+            if not rows:
+                break
+            yield rows
+        conn.close()
+    return lambda: (COLUMNS, batches())
+
+
+def time_query(run, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite vs DuckDB aggregate benchmark")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Rows to generate (default: 10M)")
+    parser.add_argument('--db', help="Reuse or create the dataset at this path")
+    parser.add_argument('--source', choices=analytics.ANALYTICS_SOURCES, default='auto',
+                        help="How DuckDB reads the data (default: auto)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per query; the median is reported")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='jaldoot-bench-'), 'groundwater.db')
+    if not os.path.exists(db_path):
+        print(f"📦 Generating {args.rows:,} rows in {db_path}")
+        started = time.perf_counter()
+        generate(db_path, args.rows)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    engine = analytics.AnalyticsEngine(db_path, row_source=row_source(db_path), source=args.source)
+    if engine.source == 'parquet':
+        print(f"🪵 Parquet mirror written in {engine.refresh_mirror():.1f}s "
+              f"({os.path.getsize(engine.parquet_path) / 1e6:,.0f} MB)")
+
+    sqlite_conn = sqlite3.connect(db_path)
+
+    def on_sqlite(sql, params):
+        return sqlite_conn.execute(sql, params).fetchall()
+
+    queries = {
+        'regional comparison': analytics.regional_comparison_sql(),
+        'regional comparison (2020)': analytics.regional_comparison_sql(year=2020),
+        'yearly trends': analytics.yearly_trends_sql(),
+        'yearly trends (one state)': analytics.yearly_trends_sql(state='State 3'),
+        'state rollup': analytics.state_rollup_sql(),
+    }
+
+    print("=" * 72)
+    print(f"{'query':<30}{'sqlite (s)':>12}{'duckdb (s)':>12}{'speedup':>10}")
+    print("-" * 72)
+    for name, (sql, params) in queries.items():
+        sqlite_time = time_query(lambda: on_sqlite(sql, params), args.repeat)
+        duckdb_time = time_query(lambda: engine.query(sql, params), args.repeat)
+        print(f"{name:<30}{sqlite_time:>12.3f}{duckdb_time:>12.3f}{sqlite_time / duckdb_time:>9.1f}x")
+    print("=" * 72)
+    print(f"DuckDB source: {engine.source}; dataset: {db_path}")
+
+    sqlite_conn.close()
+    engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,25 @@ class Config:
     INGRES_BASE_URL = os.getenv('INGRES_BASE_URL', 'https://ingres.iith.ac.in')
     INGRES_API_KEY = os.getenv('INGRES_API_KEY')
     
+    # Connection Pool Configuration (DB_POOL_* for SQLite, INGRES_POOL_* for IN-GRES)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = float(os.getenv('DB_POOL_RECYCLE', '3600'))
+    DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
+    INGRES_POOL_SIZE = int(os.getenv('INGRES_POOL_SIZE', '5'))
+    STREAM_ARRAYSIZE = int(os.getenv('STREAM_ARRAYSIZE', '1000'))
+    
+    # IN-GRES Circuit Breaker Configuration
+    INGRES_CONNECT_TIMEOUT = int(os.getenv('INGRES_CONNECT_TIMEOUT', '5'))
+    INGRES_BREAKER_FAILURE_THRESHOLD = int(os.getenv('INGRES_BREAKER_FAILURE_THRESHOLD', '3'))
+    INGRES_BREAKER_RECOVERY_TIMEOUT = float(os.getenv('INGRES_BREAKER_RECOVERY_TIMEOUT', '30'))
+    INGRES_BREAKER_HALF_OPEN_CALLS = int(os.getenv('INGRES_BREAKER_HALF_OPEN_CALLS', '1'))
+    
+    # IN-GRES Delta Sync Configuration (INGRES_SYNC_INTERVAL=0 disables the scheduler)
+    INGRES_SYNC_INTERVAL = float(os.getenv('INGRES_SYNC_INTERVAL', '0'))
+    INGRES_SYNC_BATCH_SIZE = int(os.getenv('INGRES_SYNC_BATCH_SIZE', '5000'))
+    INGRES_SERVE_FROM_MIRROR = os.getenv('INGRES_SERVE_FROM_MIRROR', 'False').lower() == 'true'
+    
     # Voice Configuration
     VOICE_ENABLED = os.getenv('VOICE_ENABLED', 'True').lower() == 'true'
     VOICE_LANGUAGE = os.getenv('VOICE_LANGUAGE', 'en')
@@ -54,11 +73,51 @@ class Config:
     MAX_QUERY_LENGTH = int(os.getenv('MAX_QUERY_LENGTH', '1000'))
     CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
     CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+    COLUMN_STORE_ENABLED = os.getenv('COLUMN_STORE_ENABLED', 'False').lower() == 'true'
+    COLUMN_STORE_TTL = float(os.getenv('COLUMN_STORE_TTL', '3600'))
+    SPATIAL_INDEX_TTL = float(os.getenv('SPATIAL_INDEX_TTL', '3600'))
+    
+    # Analytics Configuration (ANALYTICS_BACKEND=duckdb routes aggregate queries to DuckDB)
+    ANALYTICS_BACKEND = os.getenv('ANALYTICS_BACKEND', 'sqlite')
+    ANALYTICS_SOURCE = os.getenv('ANALYTICS_SOURCE', 'auto')
+    ANALYTICS_PARQUET_PATH = os.getenv('ANALYTICS_PARQUET_PATH')
+    
+    # Sharding Configuration (one SQLite file of groundwater_records per state)
+    SHARDING_ENABLED = os.getenv('SHARDING_ENABLED', 'False').lower() == 'true'
+    SHARD_DIR = os.getenv('SHARD_DIR')
+    SHARD_POOL_SIZE = int(os.getenv('SHARD_POOL_SIZE', '2'))
+    SHARD_FANOUT_WORKERS = int(os.getenv('SHARD_FANOUT_WORKERS', '4'))
+    QUERY_LOG_QUEUE_SIZE = int(os.getenv('QUERY_LOG_QUEUE_SIZE', '10000'))
+    QUERY_LOG_BATCH_SIZE = int(os.getenv('QUERY_LOG_BATCH_SIZE', '100'))
+    QUERY_LOG_FLUSH_INTERVAL = float(os.getenv('QUERY_LOG_FLUSH_INTERVAL', '1.0'))
+    
+    # Chart Render Cache (rendered images keyed by a hash of their inputs)
+    CHART_CACHE_ENABLED = os.getenv('CHART_CACHE_ENABLED', 'True').lower() == 'true'
+    CHART_CACHE_MAX_BYTES = int(os.getenv('CHART_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    CHART_CACHE_DIR = os.getenv('CHART_CACHE_DIR')
+    CHART_CACHE_DISK_MAX_BYTES = int(os.getenv('CHART_CACHE_DISK_MAX_BYTES', str(512 * 1024 * 1024)))
+    CHART_CACHE_MAX_RECIPES = int(os.getenv('CHART_CACHE_MAX_RECIPES', '4096'))
+    
+    # Chart URLs (dashboards link /charts/<hash>.<fmt> instead of inlining base64)
+    CHART_URL_PREFIX = os.getenv('CHART_URL_PREFIX', '/charts')
+    CHART_INLINE_IMAGES = os.getenv('CHART_INLINE_IMAGES', 'False').lower() == 'true'
+    
+    # Chart Rendering (worker processes; 0 draws in the request thread)
+    CHART_RENDER_WORKERS = int(os.getenv('CHART_RENDER_WORKERS', '2'))
+    CHART_RENDER_TIMEOUT = float(os.getenv('CHART_RENDER_TIMEOUT', '20'))
+    CHART_RENDER_QUEUE_DEPTH = int(os.getenv('CHART_RENDER_QUEUE_DEPTH', '0'))
+    # Default render profile: thumbnail (small WebP), screen (PNG) or print (300 DPI PNG)
+    CHART_RENDER_PROFILE = os.getenv('CHART_RENDER_PROFILE', 'screen')
     
     # Development Configuration
     MOCK_OPENAI = os.getenv('MOCK_OPENAI', 'False').lower() == 'true'
     MOCK_INGRES = os.getenv('MOCK_INGRES', 'False').lower() == 'true'
     DEBUG_MODE = os.getenv('DEBUG_MODE', 'True').lower() == 'true'
+    
+    @classmethod
+    def validate(cls):
+        """Raise ValueError for settings this configuration requires"""
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -72,8 +131,11 @@ class ProductionConfig(Config):
     
     # Override with production settings
     SECRET_KEY = os.getenv('SECRET_KEY')  # Must be set in production
-    if not SECRET_KEY:
-        raise ValueError("SECRET_KEY must be set in production")
+    
+    @classmethod
+    def validate(cls):
+        if not cls.SECRET_KEY:
+            raise ValueError("SECRET_KEY must be set in production")
 
 class TestingConfig(Config):
     """Testing configuration"""
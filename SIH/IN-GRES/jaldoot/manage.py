@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+JalDoot Management Commands
+Maintenance and data-loading tasks for the groundwater database
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def cmd_ingest(service, args):
+    """Bulk load an IN-GRES export into groundwater_records"""
+    stats = service.bulk_load(
+        args.path,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        resume=not args.no_resume,
+        rejects_path=args.rejects,
+        state=args.state
+    )
+    print("=" * 60)
+    print(f"📥 Loaded {stats['rows_inserted']:,} rows from {stats['source']}")
+    print(f"🚫 Rejected rows: {stats['rows_rejected']:,}")
+    print(f"♻️  Already stored, unchanged: {stats['rows_unchanged']:,}")
+    if args.state:
+        print(f"🗺️  Rows for other states skipped: {stats['rows_filtered']:,}")
+    print(f"📦 Chunks committed: {stats['chunks_committed']} "
+          f"(skipped {stats['chunks_skipped']} already loaded)")
+    print(f"⚡ Throughput: {stats['rows_per_second']:,.0f} rows/s "
+          f"in {stats['elapsed_seconds']:.1f}s")
+
+
+def cmd_rebuild_rollups(service, args):
+    """Recompute the statistics rollup tables from groundwater_records"""
+    service.rebuild_rollups()
+    print("📊 Statistics rollups rebuilt")
+
+
+def cmd_rebuild_search_index(service, args):
+    """Re-index notes and source metadata for full-text search"""
+    started = time.perf_counter()
+    service.rebuild_search_index()
+    print(f"🔎 Full-text index rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+def cmd_dedupe(service, args):
+    """Remove duplicate readings, keeping the latest row per natural key"""
+    counts = service.dedupe(dry_run=args.dry_run)
+    for name, count in counts.items():
+        print(f"  {name}: {count:,}")
+    verb = "Found" if args.dry_run else "Removed"
+    print(f"🧽 {verb} {sum(counts.values()):,} duplicate readings")
+
+
+def cmd_vacuum(service, args):
+    """VACUUM and ANALYZE the database, or one state's shard when sharded"""
+    started = time.perf_counter()
+    vacuumed = service.vacuum(state=args.state)
+    print(f"🧹 Vacuumed {', '.join(vacuumed) or 'nothing'} in {time.perf_counter() - started:.1f}s")
+
+
+def cmd_shard_split(service, args):
+    """Move records from the main database into per-state shards"""
+    copied = service.split_into_shards(delete=args.delete)
+    for state, rows in copied.items():
+        print(f"  {state}: {rows:,} rows")
+    print(f"🗂️  Copied {sum(copied.values()):,} rows into {len(copied)} shards"
+          + (" and removed them from the main database" if args.delete else ""))
+
+
+def cmd_sync(service, args):
+    """Pull rows changed in IN-GRES since the last sync into the local mirror"""
+    source_factory = None
+    if args.source_sqlite:
+        source_factory = lambda: sqlite3.connect(args.source_sqlite)
+
+    while True:
+        result = service.sync_from_ingres(source_factory=source_factory, progress=True)
+        if result.get('skipped'):
+            print(f"⏸️  Sync skipped: {result['skipped']}")
+        else:
+            print(f"🔄 Synced {result['rows']:,} records and {result['metadata_rows']} regions "
+                  f"in {result['elapsed_seconds']:.1f}s (watermark {result['to_watermark']})")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+def cmd_export(service, args):
+    """Export groundwater records or regional metadata to a file"""
+    from jaldoot.app.core.exporters import iter_export
+
+    path = args.output
+    compress = path.endswith('.gz')
+    fmt = args.format or os.path.splitext(path[:-3] if compress else path)[1].lstrip('.')
+    if fmt == 'jsonl':
+        fmt = 'ndjson'
+    columns, batches = service.iter_table_rows(
+        table=args.table,
+        columns=args.columns.split(',') if args.columns else None,
+        region=args.region, state=args.state, district=args.district,
+        min_year=args.min_year, max_year=args.max_year,
+        batch_size=args.batch_size
+    )
+    chunks = iter_export(columns, batches, fmt, compress=compress)
+    with open(path, 'wb') as out:
+        for chunk in chunks:
+            out.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    print(f"📤 Exported {args.table} to {path} ({os.path.getsize(path):,} bytes)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="JalDoot management commands")
+    parser.add_argument('--db', help="SQLite database path (default: GROUNDWATER_DB_PATH)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help=cmd_ingest.__doc__)
+    ingest.add_argument('path', help="CSV, JSON-lines or Parquet file")
+    ingest.add_argument('--format', choices=['csv', 'jsonl', 'parquet'],
+                        help="Input format (default: from file extension)")
+    ingest.add_argument('--chunk-size', type=int, default=50000,
+                        help="Rows per chunk/transaction (default: 50000)")
+    ingest.add_argument('--no-resume', action='store_true',
+                        help="Ignore any checkpoint and load the whole file")
+    ingest.add_argument('--rejects', help="Write rows that fail validation to this CSV")
+    ingest.add_argument('--state', help="Load only this state's rows (required when sharded)")
+    ingest.set_defaults(func=cmd_ingest)
+
+    rebuild_rollups = subparsers.add_parser('rebuild-rollups', help=cmd_rebuild_rollups.__doc__)
+    rebuild_rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    rebuild_search_index = subparsers.add_parser('rebuild-search-index', help=cmd_rebuild_search_index.__doc__)
+    rebuild_search_index.set_defaults(func=cmd_rebuild_search_index)
+
+    dedupe = subparsers.add_parser('dedupe', help=cmd_dedupe.__doc__)
+    dedupe.add_argument('--dry-run', action='store_true', help="Only count the duplicates")
+    dedupe.set_defaults(func=cmd_dedupe)
+
+    vacuum = subparsers.add_parser('vacuum', help=cmd_vacuum.__doc__)
+    vacuum.add_argument('--state', help="Only this state's shard (default: every shard in turn)")
+    vacuum.set_defaults(func=cmd_vacuum)
+
+    shard_split = subparsers.add_parser('shard-split', help=cmd_shard_split.__doc__)
+    shard_split.add_argument('--delete', action='store_true',
+                             help="Remove the copied rows from the main database")
+    shard_split.set_defaults(func=cmd_shard_split)
+
+    sync = subparsers.add_parser('sync', help=cmd_sync.__doc__)
+    sync.add_argument('--source-sqlite',
+                      help="Sync from this SQLite database instead of IN-GRES (testing)")
+    sync.add_argument('--interval', type=float, default=0,
+                      help="Repeat every N seconds until interrupted (default: run once)")
+    sync.set_defaults(func=cmd_sync)
+
+
+    export = subparsers.add_parser('export', help=cmd_export.__doc__)
+    export.add_argument('output', help="Output file (.parquet, .arrow, .ndjson, .csv; add .gz to gzip text)")
+    export.add_argument('--format', choices=['ndjson', 'csv', 'arrow', 'parquet'],
+                        help="Output format (default: from file extension)")
+    export.add_argument('--table', default='groundwater_records',
+                        choices=['groundwater_records', 'regional_metadata'])
+    export.add_argument('--columns', help="Comma-separated columns to export")
+    export.add_argument('--region')
+    export.add_argument('--state')
+    export.add_argument('--district')
+    export.add_argument('--min-year', type=int)
+    export.add_argument('--max-year', type=int)
+    export.add_argument('--batch-size', type=int, help="Rows per fetchmany() batch")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main():
+    """Management entry point"""
+    args = build_parser().parse_args()
+
+    from jaldoot.app.core.groundwater_service import GroundwaterService
+    service = GroundwaterService(sqlite_db_path=args.db)
+
+    try:
+        args.func(service, args)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; rerun the same command to resume")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}")
+        sys.exit(1)
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -199,8 +199,12 @@ function createChartContainer(title, chartData) {
     const cardBody = document.createElement('div');
     cardBody.className = 'card-body';
     
+    // chartData is a /charts/<hash> URL (or a data URI for unavailable charts)
     const img = document.createElement('img');
     img.src = chartData;
+    img.alt = title;
+    img.loading = 'lazy';
+    img.decoding = 'async';
     img.className = 'img-fluid';
     img.style.width = '100%';
     img.style.height = 'auto';
@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the JalDoot test suite
+"""
+
+import sqlite3
+
+import pytest
+
+from jaldoot.app.core.groundwater_service import GroundwaterService
+from jaldoot.app.core.migrations import upsert_records_sql
+
+RECORD_COLUMNS = ['region', 'district', 'state', 'year', 'month', 'measurement', 'unit',
+                  'well_type', 'aquifer_type', 'notes', 'source_url', 'data_quality']
+
+
+def record(region, state, measurement, district=None, year=2024, month=1, well_type='Borewell',
+           source_url=None):
+    """Row in RECORD_COLUMNS order; the source URL keeps readings distinct by default"""
+    source_url = source_url or f'https://example.org/{region}/{district}/{year}/{month}/{measurement}'
+    return (region, district, state, year, month, measurement, 'm', well_type, 'Alluvial',
+            None, source_url, 'High')
+
+
+def insert_records(db_path, rows):
+    """Upsert rows straight into a database file, bypassing the service"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(upsert_records_sql(RECORD_COLUMNS), rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def service(tmp_path):
+    """GroundwaterService on a fresh database seeded with the sample records"""
+    svc = GroundwaterService(str(tmp_path / 'groundwater.db'), config={})
+    yield svc
+    svc.close()
+
+
+@pytest.fixture
+def sharded_service(tmp_path):
+    """GroundwaterService with per-state shards and no records yet"""
+    svc = GroundwaterService(str(tmp_path / 'groundwater.db'), config={
+        'SHARDING_ENABLED': True,
+        'SHARD_DIR': str(tmp_path / 'shards'),
+    })
+    yield svc
+    svc.close()
@@ -0,0 +1,131 @@
+"""
+Chunked bulk loads: validation, rejects, checkpoints and resume
+"""
+
+import csv
+import sqlite3
+
+import pytest
+
+from jaldoot.app.core.bulk_loader import BulkLoader, BulkLoadError
+
+HEADER = ['region', 'district', 'state', 'year', 'month', 'measurement', 'well_type', 'source_url']
+
+
+def write_export(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def export_rows():
+    """Ten readings in chunks of three; rows 2 and 8 are invalid"""
+    rows = []
+    for i in range(10):
+        rows.append(['Testpur', 'North', 'Teststate', 2024, i % 12 + 1, 5.0 + i, 'Borewell',
+                     f'https://example.org/{i}'])
+    rows[2][3] = 'not a year'
+    rows[8][4] = 13
+    return rows
+
+
+def loaded_measurements(service):
+    with service.sqlite_pool.acquire() as conn:
+        return sorted(row[0] for row in conn.execute(
+            "SELECT measurement FROM groundwater_records WHERE region = 'Testpur'"))
+
+
+def read_rejects(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_load_validates_and_writes_rejects(service, tmp_path):
+    export = str(tmp_path / 'export.csv')
+    rejects = str(tmp_path / 'rejects.csv')
+    write_export(export, export_rows())
+
+    stats = service.bulk_load(export, chunk_size=3, rejects_path=rejects, progress=False)
+
+    assert stats['chunks_committed'] == 4
+    assert stats['rows_inserted'] == 8
+    assert stats['rows_rejected'] == 2
+    assert loaded_measurements(service) == [5.0 + i for i in range(10) if i not in (2, 8)]
+    rejected = read_rejects(rejects)
+    assert len(rejected) == 3 and rejected[0][0] == 'region'
+    assert service.get_region_statistics('Testpur', 2024)['record_count'] == 8
+
+
+def test_interrupted_load_resumes_after_last_committed_chunk(service, tmp_path, monkeypatch):
+    export = str(tmp_path / 'export.csv')
+    rejects = str(tmp_path / 'rejects.csv')
+    write_export(export, export_rows())
+
+    # Fail while validating the third chunk, after two have committed
+    validate = BulkLoader.validate_chunk
+    calls = []
+
+    def failing_validate(self, df):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        return validate(self, df)
+
+    monkeypatch.setattr(BulkLoader, 'validate_chunk', failing_validate)
+    with pytest.raises(RuntimeError):
+        service.bulk_load(export, chunk_size=3, rejects_path=rejects, progress=False)
+    # Rows 0-5 are committed, less the invalid row 2
+    assert len(loaded_measurements(service)) == 5
+    assert len(read_rejects(rejects)) == 2
+    monkeypatch.setattr(BulkLoader, 'validate_chunk', validate)
+
+    stats = service.bulk_load(export, chunk_size=3, rejects_path=rejects, progress=False)
+
+    assert stats['chunks_skipped'] == 2
+    assert stats['chunks_committed'] == 2
+    assert loaded_measurements(service) == [5.0 + i for i in range(10) if i not in (2, 8)]
+    # The resumed run appends row 8 to the rejects of the first run under one header
+    rejected = read_rejects(rejects)
+    assert [row[0] for row in rejected].count('region') == 1
+    assert len(rejected) == 3
+
+
+def test_finished_load_is_not_repeated(service, tmp_path):
+    export = str(tmp_path / 'export.csv')
+    write_export(export, export_rows())
+    service.bulk_load(export, chunk_size=3, progress=False)
+
+    stats = service.bulk_load(export, chunk_size=3, progress=False)
+    assert stats['chunks_skipped'] == 4
+    assert stats['rows_inserted'] == 0
+
+    # Without resume the whole file is read again and every reading is unchanged
+    stats = service.bulk_load(export, chunk_size=3, resume=False, progress=False)
+    assert stats['rows_inserted'] == 8
+    assert stats['rows_unchanged'] == 8
+    assert len(loaded_measurements(service)) == 8
+
+
+def test_load_restores_connection_pragmas(service, tmp_path):
+    export = str(tmp_path / 'export.csv')
+    write_export(export, export_rows())
+
+    def journal_mode():
+        conn = sqlite3.connect(service.sqlite_db_path)
+        try:
+            return conn.execute("PRAGMA journal_mode").fetchone()[0]
+        finally:
+            conn.close()
+
+    before = journal_mode()
+    service.bulk_load(export, chunk_size=3, progress=False)
+    assert journal_mode() == before
+
+
+def test_missing_required_columns_is_an_error(service, tmp_path):
+    export = str(tmp_path / 'export.csv')
+    with open(export, 'w') as f:
+        f.write("district,year\nNorth,2024\n")
+    with pytest.raises(BulkLoadError):
+        service.bulk_load(export, progress=False)
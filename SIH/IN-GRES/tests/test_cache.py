@@ -0,0 +1,41 @@
+"""
+Read-through result cache
+"""
+
+from jaldoot.app.core.cache import TTLCache
+
+
+def test_get_or_load_caches_result():
+    cache = TTLCache(max_entries=2)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_load('key', loader) == 'value'
+    assert cache.get_or_load('key', loader) == 'value'
+    assert len(calls) == 1
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = TTLCache()
+
+    def stale_loader():
+        # A concurrent write invalidates the cache while this read is running
+        cache.invalidate()
+        return 'before write'
+
+    assert cache.get_or_load('key', stale_loader) == 'before write'
+    assert cache.get_or_load('key', lambda: 'after write') == 'after write'
+    assert cache.get_stats()['stale_loads'] == 1
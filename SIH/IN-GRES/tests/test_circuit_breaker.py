@@ -0,0 +1,218 @@
+"""
+Circuit breaker states and the IN-GRES connection path, against a stub driver
+"""
+
+import sqlite3
+
+import pytest
+
+from jaldoot.app.core import groundwater_service
+from jaldoot.app.core.circuit_breaker import CircuitBreaker, BreakerConnection, CLOSED, OPEN, HALF_OPEN
+from jaldoot.app.core.connection_pool import ConnectionPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class StubDriverError(Exception):
+    pass
+
+
+class StubCursor:
+    def __init__(self, driver, cursor):
+        self._driver = driver
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        if not self._driver.up:
+            raise StubDriverError("communication link failure")
+        self._driver.statements += 1
+        self._cursor.execute(sql, params)
+        return self
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class StubConnection:
+    def __init__(self, driver):
+        self._driver = driver
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+
+    def cursor(self):
+        return StubCursor(self._driver, self._conn.cursor())
+
+    # IN-GRES connections run with autocommit, so these never reach the server
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+class StubDriver:
+    """Stands in for pyodbc: connects and statements fail while ``up`` is False"""
+
+    def __init__(self):
+        self.up = True
+        self.connects = 0
+        self.statements = 0
+
+    def connect(self):
+        self.connects += 1
+        if not self.up:
+            raise StubDriverError("login timeout expired")
+        return StubConnection(self)
+
+
+def test_breaker_cycles_closed_open_half_open_closed():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=10, clock=clock)
+
+    assert breaker.allow_request()
+    breaker.record_failure(StubDriverError('down'))
+    assert breaker.state == CLOSED
+    breaker.record_failure(StubDriverError('down'))
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    clock.advance(10)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    # Only one probe at a time
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.get_state()['rejected'] == 2
+
+
+def test_half_open_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.advance(10)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.get_state()['times_opened'] == 2
+
+
+def test_cancelled_probe_frees_the_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.advance(10)
+    assert breaker.allow_request()
+    breaker.cancel_request()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+@pytest.fixture
+def ingres(service):
+    """Wire the service's IN-GRES path to a stub driver and a fake clock"""
+    driver = StubDriver()
+    clock = FakeClock()
+    service._connect_ingres = driver.connect
+    service.ingres_breaker = CircuitBreaker('ingres', failure_threshold=2,
+                                            recovery_timeout=30, clock=clock)
+    service.ingres_pool = ConnectionPool('ingres', service._connect_ingres_pooled, size=2,
+                                         health_check_interval=3600)
+    service.serve_from_mirror = False
+    return driver, clock
+
+
+def is_ingres(conn):
+    return isinstance(conn.raw, BreakerConnection)
+
+
+def test_unreachable_ingres_falls_back_and_stops_connecting(service, ingres):
+    driver, clock = ingres
+    driver.up = False
+
+    for _ in range(2):
+        conn = service.get_connection()
+        assert not is_ingres(conn)
+        conn.close()
+    assert service.ingres_breaker.state == OPEN
+
+    # While open the driver is not even tried
+    conn = service.get_connection()
+    assert not is_ingres(conn)
+    conn.close()
+    assert driver.connects == 2
+
+    driver.up = True
+    clock.advance(30)
+    conn = service.get_connection()
+    assert is_ingres(conn)
+    conn.close()
+    assert service.ingres_breaker.state == CLOSED
+
+
+def test_query_failures_reach_the_breaker(service, ingres):
+    driver, _ = ingres
+    with service.get_connection() as conn:
+        assert is_ingres(conn)
+        driver.up = False
+        for _ in range(2):
+            with pytest.raises(StubDriverError):
+                conn.cursor().execute("SELECT 1")
+    assert service.ingres_breaker.state == OPEN
+
+    conn = service.get_connection()
+    assert not is_ingres(conn)
+    conn.close()
+
+
+def test_reused_idle_connection_does_not_close_breaker_without_round_trip(service, ingres):
+    driver, clock = ingres
+    # Leave one healthy-looking idle connection in the pool
+    service.get_connection().close()
+    assert driver.connects == 1
+
+    driver.up = False
+    service.ingres_breaker.record_failure()
+    service.ingres_breaker.record_failure()
+    clock.advance(30)
+    assert service.ingres_breaker.state == HALF_OPEN
+
+    # The idle connection is handed out without a health ping, so the probe
+    # statement is what decides, and it fails
+    conn = service.get_connection()
+    assert not is_ingres(conn)
+    conn.close()
+    assert service.ingres_breaker.state == OPEN
+
+    driver.up = True
+    clock.advance(30)
+    statements = driver.statements
+    conn = service.get_connection()
+    assert is_ingres(conn)
+    conn.close()
+    assert driver.statements > statements
+    assert service.ingres_breaker.state == CLOSED
+
+
+def test_statement_errors_do_not_open_breaker(service, ingres, monkeypatch):
+    monkeypatch.setattr(groundwater_service, 'INGRES_STATEMENT_ERRORS', (sqlite3.OperationalError,))
+    with service.get_connection() as conn:
+        assert is_ingres(conn)
+        for _ in range(3):
+            with pytest.raises(sqlite3.OperationalError):
+                conn.cursor().execute("SELECT * FROM no_such_table")
+    assert service.ingres_breaker.state == CLOSED
@@ -0,0 +1,148 @@
+"""
+Connection pool checkout, health checks and transaction handling
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from jaldoot.app.core.connection_pool import ConnectionPool, PoolTimeout
+
+
+class HangingCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, params=()):
+        if self._conn.hang is not None:
+            self._conn.hang.wait(5)
+        if self._conn.broken:
+            raise sqlite3.OperationalError("connection lost")
+        return self
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    """Connection whose health ping can be made to hang or fail"""
+
+    def __init__(self):
+        self.hang = None
+        self.broken = False
+        self.closed = False
+
+    def cursor(self):
+        return HangingCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def acquire_in_thread(pool):
+    """Check out a connection on a new thread and keep it checked out"""
+    result = {}
+
+    def run():
+        try:
+            result['conn'] = pool.acquire()
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, result
+
+
+def test_thread_reuses_its_connection():
+    pool = ConnectionPool('test', StubConnection, size=2)
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is outer
+    inner.close()
+    outer.close()
+    assert pool.get_stats()['thread_reused'] == 1
+    assert pool.get_stats()['idle'] == 1
+
+
+def test_only_outermost_exit_ends_the_transaction(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    pool = ConnectionPool('test', lambda: sqlite3.connect(path, check_same_thread=False), size=1)
+    with pool.acquire() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire() as outer:
+            outer.execute("INSERT INTO t VALUES (1)")
+            with pool.acquire() as inner:
+                inner.execute("INSERT INTO t VALUES (2)")
+            # The inner exit must not have committed the outer work
+            assert outer.in_transaction
+            raise RuntimeError("abort")
+
+    with pool.acquire() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    with pool.acquire() as outer:
+        with pytest.raises(ValueError):
+            with pool.acquire() as inner:
+                inner.execute("INSERT INTO t VALUES (3)")
+                raise ValueError("inner failure")
+        assert outer.in_transaction
+        outer.execute("INSERT INTO t VALUES (4)")
+
+    with pool.acquire() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+
+
+def test_exhausted_pool_times_out():
+    pool = ConnectionPool('test', StubConnection, size=1, timeout=0.05)
+    pool.acquire()
+    thread, result = acquire_in_thread(pool)
+    thread.join(2)
+    assert isinstance(result['error'], PoolTimeout)
+
+
+def test_failed_health_check_replaces_connection():
+    pool = ConnectionPool('test', StubConnection, size=1, health_check_interval=0)
+    conn = pool.acquire()
+    stale = conn.raw
+    conn.close()
+    stale.broken = True
+
+    conn = pool.acquire()
+    assert conn.raw is not stale
+    assert stale.closed
+    assert pool.get_stats()['health_check_failures'] == 1
+    conn.close()
+
+
+def test_hung_health_check_does_not_block_other_threads():
+    pool = ConnectionPool('test', StubConnection, size=2, health_check_interval=0)
+    conn = pool.acquire()
+    hung = conn.raw
+    conn.close()
+    hung.hang = threading.Event()
+
+    pinging, _ = acquire_in_thread(pool)
+    try:
+        # The first thread is stuck pinging the idle connection; a second
+        # thread still gets a fresh one and stats remain readable
+        other, result = acquire_in_thread(pool)
+        other.join(1)
+        assert not other.is_alive()
+        assert result['conn'].raw is not hung
+        assert pool.get_stats()['in_use'] == 2
+    finally:
+        hung.hang.set()
+        pinging.join(2)
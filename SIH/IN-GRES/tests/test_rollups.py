@@ -0,0 +1,137 @@
+"""
+Rollup statistics against the statistics module, and the IN-GRES fallback
+"""
+
+import math
+import random
+import sqlite3
+import statistics
+
+import pytest
+
+from jaldoot.app.core import rollups
+from jaldoot.app.core.connection_pool import ConnectionPool
+from jaldoot.app.core.groundwater_service import GroundwaterService
+
+from conftest import RECORD_COLUMNS, insert_records, record
+
+INSERT_SQL = (f"INSERT INTO groundwater_records ({', '.join(RECORD_COLUMNS)}, recorded_at) "
+              f"VALUES ({', '.join('?' * (len(RECORD_COLUMNS) + 1))})")
+
+
+def random_rows(rng, count):
+    """Readings for one region/year with repeats, NULLs and distinct (month, recorded_at)"""
+    rows = []
+    for i in range(count):
+        measurement = rng.choice([None, round(rng.uniform(2, 30), 1), rng.choice([5.0, 7.5, 9.0])])
+        rows.append(('Testpur', rng.choice(['North', 'South', None]), 'Teststate', 2024,
+                     rng.randint(1, 12), measurement, 'm',
+                     rng.choice(['Borewell', 'Dug Well', None]), 'Alluvial', None,
+                     f'https://example.org/{i}', rng.choice(['High', 'Low', None]),
+                     f'2024-01-01 00:{i // 60:02d}:{i % 60:02d}'))
+    return rows
+
+
+def expected_statistics(service, district=None):
+    rows = service.fetch_groundwater_data('Testpur', 2024, district)
+    measurements = [r['measurement'] for r in rows if r['measurement'] is not None]
+    return rows, measurements
+
+
+def assert_matches_statistics_module(service, district=None):
+    rows, measurements = expected_statistics(service, district)
+    result = service.get_region_statistics('Testpur', 2024, district)
+    if not rows:
+        assert result is None
+        return
+    assert result['record_count'] == len(rows)
+    from_rows = rollups.statistics_from_records(rows)
+    assert result['distributions'] == from_rows['distributions']
+    assert result['statistics'] == (pytest.approx(from_rows['statistics'])
+                                    if from_rows['statistics'] else None)
+    if not measurements:
+        assert result['statistics'] is None
+        return
+
+    stats = result['statistics']
+    assert stats['count'] == len(measurements)
+    assert stats['mean'] == pytest.approx(statistics.mean(measurements))
+    assert stats['median'] == pytest.approx(statistics.median(measurements))
+    expected_mode = (statistics.mode(measurements)
+                     if len(set(measurements)) < len(measurements) else None)
+    assert stats['mode'] == expected_mode
+    assert stats['min'] == min(measurements)
+    assert stats['max'] == max(measurements)
+    if len(measurements) > 1:
+        assert stats['variance'] == pytest.approx(statistics.variance(measurements))
+        assert stats['std_dev'] == pytest.approx(statistics.stdev(measurements))
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_rollups_track_inserts_updates_and_deletes(service, seed):
+    rng = random.Random(seed)
+    with service.sqlite_pool.acquire() as conn:
+        conn.executemany(INSERT_SQL, random_rows(rng, 60))
+    service.invalidate_cache()
+    assert_matches_statistics_module(service)
+    assert_matches_statistics_module(service, 'North')
+
+    with service.sqlite_pool.acquire() as conn:
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM groundwater_records WHERE region = 'Testpur'")]
+        for record_id in rng.sample(ids, 15):
+            conn.execute("UPDATE groundwater_records SET measurement = ?, month = ?, well_type = ? "
+                         "WHERE id = ?", (rng.choice([None, 5.0, 11.1]), rng.randint(1, 12),
+                                          rng.choice(['Borewell', None]), record_id))
+        for record_id in rng.sample(ids, 10):
+            conn.execute("DELETE FROM groundwater_records WHERE id = ?", (record_id,))
+    service.invalidate_cache()
+    assert_matches_statistics_module(service)
+
+    # Rebuilt sums differ from the incremental ones only by float rounding
+    before = service.get_region_statistics('Testpur', 2024)
+    service.rebuild_rollups()
+    after = service.get_region_statistics('Testpur', 2024)
+    assert after['distributions'] == before['distributions']
+    assert after['statistics'] == pytest.approx(before['statistics'])
+
+
+def test_null_categories_are_counted_as_unknown(service):
+    insert_records(service.sqlite_db_path, [
+        record('Testpur', 'Teststate', 4.0, well_type=None),
+        record('Testpur', 'Teststate', 5.0),
+    ])
+    service.invalidate_cache()
+    distributions = service.get_region_statistics('Testpur', 2024)['distributions']
+    assert distributions['well_types'] == {'Borewell': 1, 'Unknown': 1}
+
+
+def test_region_without_measurements_has_no_statistics(service):
+    insert_records(service.sqlite_db_path, [record('Testpur', 'Teststate', None)])
+    service.invalidate_cache()
+    result = service.get_region_statistics('Testpur', 2024)
+    assert result['record_count'] == 1
+    assert result['statistics'] is None
+    assert service.get_region_statistics('Nowhere', 2024) is None
+
+
+def test_statistics_follow_ingres_rows_unless_serving_from_mirror(service, tmp_path):
+    # A second database plays IN-GRES, holding one reading the mirror lacks
+    upstream = GroundwaterService(str(tmp_path / 'ingres.db'), config={})
+    upstream.close()
+    insert_records(upstream.sqlite_db_path, [record('Ropar', 'Punjab', 30.0)])
+    service.ingres_pool = ConnectionPool(
+        'ingres', lambda: sqlite3.connect(upstream.sqlite_db_path, check_same_thread=False))
+    service.serve_from_mirror = False
+
+    rows = service.fetch_groundwater_data('Ropar', 2024)
+    result = service.get_region_statistics('Ropar', 2024)
+    assert len(rows) == 3
+    assert result['statistics']['count'] == 3
+    assert result['statistics']['max'] == 30.0
+
+    service.serve_from_mirror = True
+    service.invalidate_cache()
+    assert len(service.fetch_groundwater_data('Ropar', 2024)) == 2
+    assert service.get_region_statistics('Ropar', 2024)['statistics']['count'] == 2
+    assert math.isclose(service.get_region_statistics('Ropar', 2024)['statistics']['max'], 12.3)
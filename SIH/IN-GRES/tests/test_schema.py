@@ -0,0 +1,113 @@
+"""
+Schema migrations, the natural-key upsert and duplicate removal
+"""
+
+import sqlite3
+
+from jaldoot.app.core.groundwater_service import GroundwaterService
+from jaldoot.app.core.migrations import (GROUNDWATER_RECORDS_TABLE, MIGRATIONS, get_schema_version,
+                                        run_migrations)
+
+from conftest import RECORD_COLUMNS, insert_records, record
+
+LATEST_VERSION = max(migration.version for migration in MIGRATIONS)
+
+
+def count_records(service, **where):
+    sql = "SELECT COUNT(*) FROM groundwater_records"
+    if where:
+        sql += " WHERE " + " AND ".join(f"{column} = ?" for column in where)
+    with service.sqlite_pool.acquire() as conn:
+        return conn.execute(sql, list(where.values())).fetchone()[0]
+
+
+def test_fresh_database_is_migrated_and_seeded(service):
+    assert service.get_schema_version() == LATEST_VERSION
+    assert count_records(service) > 0
+    assert 'Ropar' in service.get_available_regions()
+
+
+def test_restart_on_existing_database_keeps_data(service):
+    records = count_records(service)
+    restarted = GroundwaterService(service.sqlite_db_path, config={})
+    try:
+        assert restarted.get_schema_version() == LATEST_VERSION
+        assert count_records(restarted) == records
+    finally:
+        restarted.close()
+
+
+def test_upgrade_removes_duplicates_before_adding_natural_key(tmp_path):
+    # A pre-migration database that already holds the same reading twice
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.execute(GROUNDWATER_RECORDS_TABLE)
+    conn.executemany(
+        f"INSERT INTO groundwater_records ({', '.join(RECORD_COLUMNS)}, updated_at) "
+        f"VALUES ({', '.join('?' * (len(RECORD_COLUMNS) + 1))})",
+        [record('Testpur', 'Teststate', 4.0, district=None, source_url='u') + ('2024-01-01',),
+         record('Testpur', 'Teststate', 6.0, district='', source_url='u') + ('2024-02-01',),
+         record('Testpur', 'Teststate', 8.0, source_url='other') + ('2024-01-01',)])
+    conn.commit()
+    conn.close()
+
+    upgraded = GroundwaterService(path, config={})
+    try:
+        assert upgraded.get_schema_version() == LATEST_VERSION
+        with upgraded.sqlite_pool.acquire() as conn:
+            rows = conn.execute("SELECT measurement FROM groundwater_records "
+                                "WHERE region = 'Testpur' ORDER BY measurement").fetchall()
+        # The most recently updated copy survives
+        assert rows == [(6.0,), (8.0,)]
+    finally:
+        upgraded.close()
+
+
+def test_reloading_a_reading_updates_it_in_place(service):
+    insert_records(service.sqlite_db_path, [record('Testpur', 'Teststate', 4.0, source_url='u')])
+    insert_records(service.sqlite_db_path, [record('Testpur', 'Teststate', 5.0, source_url='u')])
+    # NULL and '' district are the same key
+    insert_records(service.sqlite_db_path, [
+        record('Testpur', 'Teststate', 6.0, district='', source_url='u')])
+
+    assert count_records(service, region='Testpur') == 1
+    with service.sqlite_pool.acquire() as conn:
+        assert conn.execute("SELECT measurement FROM groundwater_records "
+                            "WHERE region = 'Testpur'").fetchone() == (6.0,)
+
+
+def test_unchanged_reload_leaves_row_untouched(service):
+    insert_records(service.sqlite_db_path, [record('Testpur', 'Teststate', 4.0, source_url='u')])
+    with service.sqlite_pool.acquire() as conn:
+        conn.execute("UPDATE groundwater_records SET updated_at = '2000-01-01' WHERE region = 'Testpur'")
+    insert_records(service.sqlite_db_path, [record('Testpur', 'Teststate', 4.0, source_url='u')])
+    with service.sqlite_pool.acquire() as conn:
+        assert conn.execute("SELECT updated_at FROM groundwater_records "
+                            "WHERE region = 'Testpur'").fetchone() == ('2000-01-01',)
+
+
+def test_dedupe_finds_rows_that_bypassed_the_natural_key(service):
+    with service.sqlite_pool.acquire() as conn:
+        conn.execute("DROP INDEX uq_groundwater_natural_key")
+    for measurement in (4.0, 5.0, 6.0):
+        with service.sqlite_pool.acquire() as conn:
+            conn.execute(f"INSERT INTO groundwater_records ({', '.join(RECORD_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))})",
+                         record('Testpur', 'Teststate', measurement, source_url='u'))
+
+    name = 'groundwater.db'
+    assert service.dedupe(dry_run=True) == {name: 2}
+    assert count_records(service, region='Testpur') == 3
+    assert service.dedupe() == {name: 2}
+    # Equal timestamps: the highest id, i.e. the last write, is kept
+    with service.sqlite_pool.acquire() as conn:
+        assert conn.execute("SELECT measurement FROM groundwater_records "
+                            "WHERE region = 'Testpur'").fetchall() == [(6.0,)]
+        assert get_schema_version(conn) == LATEST_VERSION
+    assert service.get_region_statistics('Testpur', 2024)['record_count'] == 1
+
+
+def test_run_migrations_is_idempotent(service):
+    with service.sqlite_pool.acquire() as conn:
+        assert run_migrations(conn) == []
+        assert get_schema_version(conn) == LATEST_VERSION
@@ -0,0 +1,74 @@
+"""
+Filtered search with keyset pagination, over SQL and the column store
+"""
+
+import pytest
+
+from jaldoot.app.core.groundwater_service import GroundwaterService
+from jaldoot.app.core.query_builder import InvalidQuery
+
+from conftest import insert_records, record
+
+
+@pytest.fixture(params=[False, True], ids=['sql', 'column_store'])
+def search_service(request, tmp_path):
+    svc = GroundwaterService(str(tmp_path / 'groundwater.db'),
+                             config={'COLUMN_STORE_ENABLED': request.param})
+    # Repeated values and NULLs exercise the (value, id) tie-break
+    insert_records(svc.sqlite_db_path, [
+        record('Testpur', 'Teststate', measurement, district=district, month=month)
+        for measurement, district, month in [
+            (5.0, 'North', 1), (5.0, 'South', 2), (None, 'North', 3), (7.5, None, 4),
+            (5.0, 'North', 5), (None, 'South', 6), (2.0, 'North', 7), (7.5, 'South', 8),
+        ]
+    ])
+    svc.invalidate_cache()
+    yield svc
+    svc.close()
+
+
+def all_pages(service, **kwargs):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = service.search_groundwater_data(region='Testpur', cursor=cursor, **kwargs)
+        rows.extend(page['data'])
+        pages += 1
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            return rows, pages
+        cursor = page['next_cursor']
+
+
+def sort_key(row, sort):
+    # SQLite order: NULLs first, then the value, then id
+    return (row[sort] is not None, row[sort] if row[sort] is not None else 0, row['id'])
+
+
+@pytest.mark.parametrize('sort', ['measurement', 'district', 'month', 'id'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_cover_every_row_once_in_order(search_service, sort, descending):
+    everything = search_service.search_groundwater_data(region='Testpur', limit=100)['data']
+    expected = sorted(everything, key=lambda row: sort_key(row, sort), reverse=descending)
+
+    rows, pages = all_pages(search_service, sort=sort, descending=descending, limit=3)
+
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+    assert pages == 3
+
+
+def test_filters_and_total(search_service):
+    page = search_service.search_groundwater_data(
+        region='Testpur', district='North', min_level=3, max_level=10,
+        sort='measurement', limit=1, include_total=True)
+    assert page['total_records'] == 2
+    assert [row['measurement'] for row in page['data']] == [5.0]
+    assert page['has_more']
+
+
+def test_cursor_for_another_sort_is_rejected(search_service):
+    page = search_service.search_groundwater_data(region='Testpur', sort='measurement', limit=2)
+    with pytest.raises(InvalidQuery):
+        search_service.search_groundwater_data(region='Testpur', sort='month',
+                                               cursor=page['next_cursor'])
+    with pytest.raises(InvalidQuery):
+        search_service.search_groundwater_data(region='Testpur', cursor='not-a-cursor')
@@ -0,0 +1,77 @@
+"""
+Per-state shards: splitting, fanned-out searches and routed IN-GRES sync
+"""
+
+import sqlite3
+
+from jaldoot.app.core.migrations import GROUNDWATER_RECORDS_TABLE, run_migrations
+
+from conftest import insert_records, record
+
+
+def shard_regions(service):
+    return {shard.state: sorted(row[0] for row in sqlite3.connect(shard.path).execute(
+                "SELECT region FROM groundwater_records"))
+            for shard in service.shards.shards}
+
+
+def test_split_moves_records_into_state_shards(sharded_service):
+    insert_records(sharded_service.sqlite_db_path, [
+        record('Panaji', 'Goa', 4.0),
+        record('Kochi', 'Kerala', 6.0),
+        record('Margao', 'Goa', 5.0),
+    ])
+    copied = sharded_service.split_into_shards(delete=True)
+
+    assert copied == {'Goa': 2, 'Kerala': 1}
+    assert shard_regions(sharded_service) == {'Goa': ['Margao', 'Panaji'], 'Kerala': ['Kochi']}
+    assert sorted(sharded_service.get_available_regions()) == ['Kochi', 'Margao', 'Panaji']
+
+
+def test_fanned_out_search_merges_text_sort_with_empty_and_null_values(sharded_service):
+    insert_records(sharded_service.sqlite_db_path, [
+        record('Panaji', 'Goa', 4.0, district=''),
+        record('Margao', 'Goa', 5.0, district='South Goa'),
+        record('Kochi', 'Kerala', 6.0, district='Ernakulam'),
+        record('Kollam', 'Kerala', 7.0, district=None),
+    ])
+    sharded_service.split_into_shards(delete=True)
+
+    for descending in (False, True):
+        districts, cursor = [], None
+        while True:
+            page = sharded_service.search_groundwater_data(
+                sort='district', descending=descending, limit=1, cursor=cursor)
+            districts.extend(row['district'] for row in page['data'])
+            if not page['has_more']:
+                break
+            cursor = page['next_cursor']
+        expected = [None, '', 'Ernakulam', 'South Goa']
+        assert districts == (expected[::-1] if descending else expected)
+
+
+def test_sync_writes_into_state_shards(sharded_service, tmp_path):
+    source_path = str(tmp_path / 'ingres.db')
+    source = sqlite3.connect(source_path)
+    source.execute(GROUNDWATER_RECORDS_TABLE)
+    source.execute("CREATE TABLE regional_metadata (region TEXT, state TEXT, district TEXT, "
+                   "latitude REAL, longitude REAL, population INTEGER, area_sqkm REAL, "
+                   "climate_zone TEXT, aquifer_types TEXT)")
+    run_migrations(source)
+    source.close()
+    insert_records(source_path, [
+        record('Panaji', 'Goa', 4.0),
+        record('Kochi', 'Kerala', 6.0),
+        record('Margao', 'Goa', 5.0),
+    ])
+
+    result = sharded_service.sync_from_ingres(lambda: sqlite3.connect(source_path))
+
+    assert result['rows'] == 3
+    assert shard_regions(sharded_service) == {'Goa': ['Margao', 'Panaji'], 'Kerala': ['Kochi']}
+    with sharded_service.sqlite_pool.acquire() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM groundwater_records").fetchone()[0] == 0
+    assert sharded_service.get_region_statistics('Kochi', 2024)['record_count'] == 1
+
+    # Nothing changed upstream, so the next run copies nothing
+    assert sharded_service.sync_from_ingres(lambda: sqlite3.connect(source_path))['rows'] == 0